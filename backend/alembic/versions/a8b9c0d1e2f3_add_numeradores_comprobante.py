@@ -0,0 +1,41 @@
+"""add numeradores_comprobante
+
+Revision ID: a8b9c0d1e2f3
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8b9c0d1e2f3'
+down_revision: Union[str, None] = 'f7a8b9c0d1e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'numeradores_comprobante',
+        sa.Column('tipo', postgresql.ENUM('factura', 'recibo', 'nota_credito', 'nota_debito', 'presupuesto', name='tipocomprobanteenum', create_type=False), nullable=False),
+        sa.Column('punto_venta', sa.Integer(), nullable=False),
+        sa.Column('ultimo_numero', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('tipo', 'punto_venta')
+    )
+
+    # Cada contador arranca en el último número ya emitido
+    op.execute("""
+        INSERT INTO numeradores_comprobante (tipo, punto_venta, ultimo_numero)
+        SELECT tipo, punto_venta, MAX(numero)
+        FROM comprobantes
+        GROUP BY tipo, punto_venta
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('numeradores_comprobante')
@@ -0,0 +1,36 @@
+"""add alertas dedup index
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3c4d5e6f7a8'
+down_revision: Union[str, None] = 'a2b3c4d5e6f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('alertas', sa.Column('periodica', sa.Boolean(), nullable=False, server_default='false'))
+
+    # Unicidad de las alertas generadas por tareas periódicas
+    op.create_index(
+        'uq_alertas_dedup',
+        'alertas',
+        ['usuario_id', 'tipo', 'entidad_relacionada_tipo', 'entidad_relacionada_id', 'fecha_evento'],
+        unique=True,
+        postgresql_where=sa.text('periodica'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_alertas_dedup', table_name='alertas')
+    op.drop_column('alertas', 'periodica')
@@ -0,0 +1,48 @@
+"""add facturaciones_pension
+
+Revision ID: b9c0d1e2f3a4
+Revises: a8b9c0d1e2f3
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9c0d1e2f3a4'
+down_revision: Union[str, None] = 'a8b9c0d1e2f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'facturaciones_pension',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('periodo', sa.Date(), nullable=False),
+        sa.Column('tarifa_mensual', sa.Numeric(12, 2), nullable=False),
+        sa.Column('tarifas_por_manejo', postgresql.JSONB(), nullable=True),
+        sa.Column('iva_porcentaje', sa.Numeric(5, 2), nullable=False),
+        sa.Column('dias_vencimiento', sa.Integer(), nullable=False),
+        sa.Column('estado', sa.String(20), nullable=False),
+        sa.Column('ultimo_cliente_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('comprobantes_generados', sa.Integer(), nullable=False),
+        sa.Column('total_facturado', sa.Numeric(14, 2), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('tarea_id', sa.String(50), nullable=True),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('finalizada_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['usuarios.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('periodo')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('facturaciones_pension')
@@ -0,0 +1,37 @@
+"""add keyset pagination indexes
+
+Revision ID: c4d5e6f7a8b9
+Revises: b3c4d5e6f7a8
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d5e6f7a8b9'
+down_revision: Union[str, None] = 'b3c4d5e6f7a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (índice, tabla, columnas) para los predicados (clave de orden, id) de los listados
+INDICES = [
+    ('ix_caballos_nombre_id', 'caballos', ['nombre', 'id']),
+    ('ix_pagos_created_at_id', 'pagos', ['created_at', 'id']),
+    ('ix_comprobantes_created_at_id', 'comprobantes', ['created_at', 'id']),
+    ('ix_eventos_fecha_inicio_id', 'eventos', ['fecha_inicio', 'id']),
+    ('ix_egresos_fecha_egreso_id', 'egresos', ['fecha_egreso', 'id']),
+]
+
+
+def upgrade() -> None:
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas)
+
+
+def downgrade() -> None:
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla)
@@ -0,0 +1,28 @@
+"""drop caballos qr_code
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e6f7a8b9c0'
+down_revision: Union[str, None] = 'c4d5e6f7a8b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # El QR se renderiza bajo demanda en /caballos/{id}/qr.png|svg
+    op.drop_column('caballos', 'qr_code')
+
+
+def downgrade() -> None:
+    # Los QR no se regeneran: la columna vuelve vacía
+    op.add_column('caballos', sa.Column('qr_code', sa.Text(), nullable=True))
@@ -0,0 +1,59 @@
+"""add codigo to vacunas_registros
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f7a8b9c0d1'
+down_revision: Union[str, None] = 'd5e6f7a8b9c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Copia de CODIGOS_VACUNA al momento de la migración
+CODIGOS_VACUNA = {
+    "quintuple": ("quintuple",),
+    "aie": ("aie", "anemia"),
+    "adenitis": ("adenitis",),
+    "rabia": ("rabia", "rabica"),
+    "influenza": ("influenza",),
+}
+
+
+def _codigo(tipo):
+    descompuesto = unicodedata.normalize("NFKD", (tipo or "").lower())
+    normalizado = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    for codigo, palabras in CODIGOS_VACUNA.items():
+        if any(palabra in normalizado for palabra in palabras):
+            return codigo
+    return None
+
+
+def upgrade() -> None:
+    op.add_column('vacunas_registros', sa.Column('codigo', sa.String(30), nullable=True))
+    op.create_index('ix_vacunas_registros_codigo', 'vacunas_registros', ['codigo'])
+
+    # Completar el código de los registros existentes (una UPDATE por nombre distinto)
+    conn = op.get_bind()
+    tipos = [fila[0] for fila in conn.execute(sa.text("SELECT DISTINCT tipo FROM vacunas_registros"))]
+    for tipo in tipos:
+        codigo = _codigo(tipo)
+        if codigo:
+            conn.execute(
+                sa.text("UPDATE vacunas_registros SET codigo = :codigo WHERE tipo = :tipo"),
+                {"codigo": codigo, "tipo": tipo}
+            )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vacunas_registros_codigo', table_name='vacunas_registros')
+    op.drop_column('vacunas_registros', 'codigo')
@@ -0,0 +1,87 @@
+"""add saldos_cuenta_checkpoint
+
+Revision ID: f7a8b9c0d1e2
+Revises: e6f7a8b9c0d1
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+from datetime import date, datetime
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a8b9c0d1e2'
+down_revision: Union[str, None] = 'e6f7a8b9c0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'saldos_cuenta_checkpoint',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('cliente_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('hasta', sa.DateTime(), nullable=False),
+        sa.Column('hasta_movimiento_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('saldo', sa.Numeric(12, 2), nullable=False),
+        sa.Column('total_debitos', sa.Numeric(12, 2), nullable=False),
+        sa.Column('total_creditos', sa.Numeric(12, 2), nullable=False),
+        sa.Column('cantidad_movimientos', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_saldos_cuenta_checkpoint_cliente_hasta', 'saldos_cuenta_checkpoint', ['cliente_id', 'hasta'])
+    op.create_index(
+        'ix_movimientos_cuenta_cliente_created_at_id', 'movimientos_cuenta', ['cliente_id', 'created_at', 'id']
+    )
+
+    # Hasta ahora los pagos modificaban clientes.saldo sin registrar movimientos:
+    # un movimiento de ajuste por cliente deja el ledger alineado con el saldo actual
+    conn = op.get_bind()
+    diferencias = conn.execute(sa.text("""
+        SELECT c.id, c.saldo, c.saldo - COALESCE(SUM(
+            CASE WHEN m.tipo = 'debito' THEN -m.monto ELSE m.monto END
+        ), 0) AS diferencia
+        FROM clientes c
+        LEFT JOIN movimientos_cuenta m ON m.cliente_id = c.id
+        GROUP BY c.id, c.saldo
+        HAVING c.saldo <> COALESCE(SUM(
+            CASE WHEN m.tipo = 'debito' THEN -m.monto ELSE m.monto END
+        ), 0)
+    """)).all()
+    if diferencias:
+        ahora = datetime.utcnow()
+        conn.execute(
+            sa.text("""
+                INSERT INTO movimientos_cuenta
+                    (id, cliente_id, tipo, descripcion, monto, saldo_anterior, saldo_posterior, fecha, created_at)
+                VALUES
+                    (:id, :cliente_id, :tipo, 'AJUSTE SALDO INICIAL', :monto, :saldo_anterior, :saldo, :fecha, :created_at)
+            """),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "cliente_id": cliente_id,
+                    "tipo": "credito" if diferencia > 0 else "debito",
+                    "monto": abs(diferencia),
+                    "saldo_anterior": saldo - diferencia,
+                    "saldo": saldo,
+                    "fecha": date.today(),
+                    "created_at": ahora,
+                }
+                for cliente_id, saldo, diferencia in diferencias
+            ]
+        )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM movimientos_cuenta WHERE descripcion = 'AJUSTE SALDO INICIAL'")
+    op.drop_index('ix_movimientos_cuenta_cliente_created_at_id', table_name='movimientos_cuenta')
+    op.drop_index('ix_saldos_cuenta_checkpoint_cliente_hasta', table_name='saldos_cuenta_checkpoint')
+    op.drop_table('saldos_cuenta_checkpoint')
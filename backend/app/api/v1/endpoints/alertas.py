@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from uuid import UUID
 
+from app.db.session import get_async_db
 from app.core.deps import (
     get_db,
     get_current_active_user,
@@ -21,11 +23,11 @@ router = APIRouter()
 @router.get("/", response_model=List[AlertaSchema])
 async def obtener_mis_alertas(
     solo_no_leidas: bool = Query(False),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(require_alertas_ver)
 ):
     """Obtiene las alertas del usuario actual."""
-    return alerta_service.obtener_por_usuario(
+    return await alerta_service.obtener_por_usuario(
         db,
         current_user.id,
         solo_no_leidas=solo_no_leidas
@@ -34,11 +36,11 @@ async def obtener_mis_alertas(
 
 @router.get("/no-leidas", response_model=List[AlertaSchema])
 async def obtener_alertas_no_leidas(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(require_alertas_ver)
 ):
     """Obtiene las alertas no leídas del usuario actual."""
-    return alerta_service.obtener_por_usuario(
+    return await alerta_service.obtener_por_usuario(
         db,
         current_user.id,
         solo_no_leidas=True
@@ -47,11 +49,11 @@ async def obtener_alertas_no_leidas(
 
 @router.get("/no-leidas/count", response_model=dict)
 async def contar_alertas_no_leidas(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(require_alertas_ver)
 ):
     """Cuenta las alertas no leídas del usuario actual."""
-    count = alerta_service.contar_no_leidas(db, current_user.id)
+    count = await alerta_service.contar_no_leidas(db, current_user.id)
     return {"count": count}
 
 
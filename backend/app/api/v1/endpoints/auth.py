@@ -23,7 +23,7 @@ async def register(
     """
     Registra un nuevo usuario en el sistema.
     """
-    return auth_service.crear_usuario(db, usuario_data)
+    return await auth_service.crear_usuario(db, usuario_data)
 
 
 @router.post("/login", response_model=Token)
@@ -35,7 +35,7 @@ async def login(
     Inicia sesión con email y password.
     Retorna access_token y refresh_token.
     """
-    usuario = auth_service.autenticar_usuario(db, login_data)
+    usuario = await auth_service.autenticar_usuario(db, login_data)
     tokens = auth_service.generar_tokens(usuario)
     return tokens
 
@@ -59,7 +59,7 @@ async def change_password(
     """
     Cambia la contraseña del usuario autenticado.
     """
-    return auth_service.cambiar_password(
+    return await auth_service.cambiar_password(
         db,
         current_user,
         password_data.old_password,
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Response, UploadFile, File, Form
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
+import hashlib
 
+from app.db.session import get_async_db
 from app.core.deps import get_db, get_current_active_user, require_admin
+from app.core.paginacion import DESCRIPCION_CURSOR, responder_con_cursor
 from app.models.usuario import Usuario
 from app.services import file_service
 from app.schemas.caballo import (
@@ -32,7 +36,8 @@ from app.schemas.caballo import (
     MesPlanSanitario,
     ActividadPlanSanitario,
     EstadisticasPlanSanitario,
-    ActividadPendiente
+    ActividadPendiente,
+    MatrizPlanSanitarioResponse
 )
 from app.schemas.historial_medico import HistorialMedicoSchema, HistorialMedicoCreate, HistorialMedicoUpdate
 from app.schemas.plan_alimentacion import PlanAlimentacionSchema, PlanAlimentacionCreate, PlanAlimentacionUpdate
@@ -43,15 +48,28 @@ router = APIRouter()
 
 @router.get("/", response_model=List[CaballoSchema])
 async def listar_caballos(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description=DESCRIPCION_CURSOR),
     activo_solo: bool = Query(True),
     propietario_id: Optional[UUID] = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    """Lista todos los caballos con paginación."""
-    return caballo_service.obtener_todos(
+    """Lista todos los caballos con paginación (offset o cursor)."""
+    if cursor is not None:
+        caballos, siguiente = await caballo_service.obtener_pagina(
+            db,
+            cursor=cursor,
+            limit=limit,
+            activo_solo=activo_solo,
+            propietario_id=propietario_id
+        )
+        responder_con_cursor(response, siguiente)
+        return caballos
+
+    return await caballo_service.obtener_todos(
         db,
         skip=skip,
         limit=limit,
@@ -62,7 +80,7 @@ async def listar_caballos(
 
 @router.get("/me", response_model=List[CaballoSchema])
 async def obtener_mis_caballos(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Obtiene los caballos del cliente asociado al usuario actual."""
@@ -71,7 +89,7 @@ async def obtener_mis_caballos(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No hay un cliente asociado a este usuario"
         )
-    return caballo_service.obtener_todos(
+    return await caballo_service.obtener_todos(
         db,
         propietario_id=current_user.cliente.id,
         activo_solo=False
@@ -90,6 +108,20 @@ async def buscar_caballos(
     return caballo_service.buscar(db, termino=q, skip=skip, limit=limit)
 
 
+@router.get("/plan-sanitario/matriz", response_model=MatrizPlanSanitarioResponse)
+async def obtener_matriz_plan_sanitario(
+    anio: Optional[int] = Query(None, description="Año a evaluar (por defecto año actual)"),
+    activo_solo: bool = Query(True),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_active_user)
+):
+    """
+    Matriz de cumplimiento del plan sanitario de todo el plantel.
+    Por categoría: actividades del calendario (columnas) y el estado de cada caballo en cada una.
+    """
+    return caballo_service.obtener_matriz_plan_sanitario(db, anio=anio, activo_solo=activo_solo)
+
+
 @router.post(
     "/",
     response_model=CaballoSchema,
@@ -107,11 +139,11 @@ async def crear_caballo(
 @router.get("/{caballo_id}", response_model=CaballoSchema)
 async def obtener_caballo(
     caballo_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """Obtiene un caballo específico por ID."""
-    caballo = caballo_service.obtener_por_id(db, caballo_id)
+    caballo = await caballo_service.obtener_detalle(db, caballo_id)
     if not caballo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -287,11 +319,19 @@ async def actualizar_plan_alimentacion(
 @router.get("/{caballo_id}/completo", response_model=CaballoCompleto)
 async def obtener_caballo_completo(
     caballo_id: UUID,
+    include: Optional[str] = Query(
+        None,
+        description="Secciones a incluir separadas por coma (fotos,vacunas,herrajes,antiparasitarios). Por defecto todas."
+    ),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    """Obtiene un caballo con todas sus relaciones (fotos, vacunas, herrajes, antiparasitarios)."""
-    caballo = caballo_service.obtener_por_id(db, caballo_id)
+    """Obtiene un caballo con sus relaciones (fotos, vacunas, herrajes, antiparasitarios)."""
+    incluir = None
+    if include is not None:
+        incluir = [seccion.strip() for seccion in include.split(",") if seccion.strip()]
+
+    caballo = caballo_service.obtener_completo(db, caballo_id, incluir=incluir)
     if not caballo:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -300,6 +340,52 @@ async def obtener_caballo_completo(
     return caballo
 
 
+# ========== QR ==========
+
+# Tipos de contenido por formato de QR
+_QR_MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def _respuesta_qr(caballo_id: UUID, formato: str, if_none_match: Optional[str]) -> Response:
+    """Arma la respuesta del QR con ETag y cache HTTP."""
+    etag = '"' + hashlib.sha1(
+        f"{caballo_service.url_ficha_caballo(caballo_id)}:{formato}".encode()
+    ).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=caballo_service.generar_qr_caballo(caballo_id, formato),
+        media_type=_QR_MEDIA_TYPES[formato],
+        headers=headers
+    )
+
+
+@router.get("/{caballo_id}/qr.png", response_class=Response)
+async def obtener_qr_png(
+    caballo_id: UUID,
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    QR de la ficha del caballo en PNG.
+
+    Es público (se usa directo en <img> e impresiones): solo codifica la URL de
+    la ficha, que a su vez requiere autenticación.
+    """
+    return _respuesta_qr(caballo_id, "png", if_none_match)
+
+
+@router.get("/{caballo_id}/qr.svg", response_class=Response)
+async def obtener_qr_svg(
+    caballo_id: UUID,
+    if_none_match: Optional[str] = Header(None)
+):
+    """QR de la ficha del caballo en SVG (ver qr.png)."""
+    return _respuesta_qr(caballo_id, "svg", if_none_match)
+
+
 # ========== FOTOS - ENDPOINTS ADICIONALES ==========
 
 @router.put("/fotos/{foto_id}/principal", response_model=FotoCaballoSchema)
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 from datetime import date
 
-from app.db.session import get_db
+from app.db.session import get_db, get_replica_db
 from app.core.deps import get_current_user, require_admin
+from app.core.paginacion import DESCRIPCION_CURSOR, responder_con_cursor
 from app.models.usuario import Usuario
 from app.models.comprobante import TipoComprobanteEnum, EstadoComprobanteEnum
 from app.schemas.comprobante import (
@@ -13,8 +15,11 @@ from app.schemas.comprobante import (
     ComprobanteListSchema, ComprobanteItemCreate, ComprobanteItemSchema,
     EmitirComprobanteRequest, AnularComprobanteRequest, AplicarPagoRequest,
     EstadoCuentaResponse, MovimientoCuentaSchema,
-    ReporteVentasResponse, ReporteCobranzasResponse, ReporteDeudoresResponse
+    ReporteVentasResponse, ReporteCobranzasResponse, ReporteDeudoresResponse,
+    FacturacionPensionesRequest, FacturacionPensionesSimulacion, FacturacionPensionSchema
 )
+from app.schemas.exportacion import ExportacionFiltros
+from app.services import comprobante_pdf_service, exportacion_service, facturacion_service
 from app.services.comprobante_service import get_comprobante_service
 
 router = APIRouter()
@@ -31,15 +36,21 @@ def crear_comprobante(
     """Crea un nuevo comprobante"""
     try:
         service = get_comprobante_service(db)
-        return service.crear(data, created_by=current_user.id)
+        comprobante = service.crear(data, created_by=current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    if comprobante.estado != EstadoComprobanteEnum.BORRADOR:
+        comprobante_pdf_service.encolar_generacion(comprobante.id)
+    return comprobante
+
 
 @router.get("/", response_model=List[ComprobanteConCliente])
 def listar_comprobantes(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=DESCRIPCION_CURSOR),
     cliente_id: Optional[UUID] = None,
     tipo: Optional[TipoComprobanteEnum] = None,
     estado: Optional[EstadoComprobanteEnum] = None,
@@ -49,11 +60,9 @@ def listar_comprobantes(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_user)
 ):
-    """Lista comprobantes con filtros"""
+    """Lista comprobantes con filtros (paginación offset o cursor)"""
     service = get_comprobante_service(db)
-    comprobantes = service.listar(
-        skip=skip,
-        limit=limit,
+    filtros = dict(
         cliente_id=cliente_id,
         tipo=tipo,
         estado=estado,
@@ -61,6 +70,11 @@ def listar_comprobantes(
         fecha_hasta=fecha_hasta,
         busqueda=busqueda
     )
+    if cursor is not None:
+        comprobantes, siguiente = service.listar_pagina(cursor=cursor, limit=limit, **filtros)
+        responder_con_cursor(response, siguiente)
+    else:
+        comprobantes = service.listar(skip=skip, limit=limit, **filtros)
 
     # Agregar info del cliente
     result = []
@@ -128,13 +142,16 @@ def emitir_comprobante(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_admin)
 ):
-    """Emite un comprobante en borrador"""
+    """Emite un comprobante en borrador; el PDF se genera en segundo plano"""
     try:
         service = get_comprobante_service(db)
-        return service.emitir(comprobante_id)
+        comprobante = service.emitir(comprobante_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    comprobante_pdf_service.encolar_generacion(comprobante.id)
+    return comprobante
+
 
 @router.post("/{comprobante_id}/anular", response_model=ComprobanteSchema)
 def anular_comprobante(
@@ -143,13 +160,16 @@ def anular_comprobante(
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(require_admin)
 ):
-    """Anula un comprobante"""
+    """Anula un comprobante; el PDF se regenera en segundo plano con la leyenda de anulado"""
     try:
         service = get_comprobante_service(db)
-        return service.anular(comprobante_id, data, anulado_por=current_user.id)
+        comprobante = service.anular(comprobante_id, data, anulado_por=current_user.id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+    comprobante_pdf_service.encolar_generacion(comprobante.id)
+    return comprobante
+
 
 @router.post("/{comprobante_id}/aplicar-pago", response_model=ComprobanteSchema)
 def aplicar_pago_a_comprobante(
@@ -194,9 +214,14 @@ def obtener_cuenta_corriente(
 
 @router.get("/reportes/ventas", response_model=ReporteVentasResponse)
 def reporte_ventas(
+    response: Response,
     fecha_inicio: date = Query(...),
     fecha_fin: date = Query(...),
-    db: Session = Depends(get_db),
+    agrupar_por: Optional[str] = Query(None, pattern="^(dia|semana|mes)$", description="Serie por período"),
+    detalle: bool = Query(False, description="Incluir una página de comprobantes"),
+    cursor: Optional[str] = Query(None, description=DESCRIPCION_CURSOR),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_replica_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """Genera reporte de ventas/facturación"""
@@ -204,14 +229,24 @@ def reporte_ventas(
         raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin")
 
     service = get_comprobante_service(db)
-    return service.reporte_ventas(fecha_inicio, fecha_fin)
+    reporte, siguiente = service.reporte_ventas(
+        fecha_inicio, fecha_fin,
+        agrupar_por=agrupar_por, incluir_detalle=detalle, cursor=cursor, limit=limit
+    )
+    responder_con_cursor(response, siguiente)
+    return reporte
 
 
 @router.get("/reportes/cobranzas", response_model=ReporteCobranzasResponse)
 def reporte_cobranzas(
+    response: Response,
     fecha_inicio: date = Query(...),
     fecha_fin: date = Query(...),
-    db: Session = Depends(get_db),
+    agrupar_por: Optional[str] = Query(None, pattern="^(dia|semana|mes)$", description="Serie por período"),
+    detalle: bool = Query(False, description="Incluir una página de pagos"),
+    cursor: Optional[str] = Query(None, description=DESCRIPCION_CURSOR),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_replica_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """Genera reporte de cobranzas"""
@@ -219,13 +254,18 @@ def reporte_cobranzas(
         raise HTTPException(status_code=400, detail="La fecha de inicio debe ser anterior a la fecha de fin")
 
     service = get_comprobante_service(db)
-    return service.reporte_cobranzas(fecha_inicio, fecha_fin)
+    reporte, siguiente = service.reporte_cobranzas(
+        fecha_inicio, fecha_fin,
+        agrupar_por=agrupar_por, incluir_detalle=detalle, cursor=cursor, limit=limit
+    )
+    responder_con_cursor(response, siguiente)
+    return reporte
 
 
 @router.get("/reportes/deudores", response_model=ReporteDeudoresResponse)
 def reporte_deudores(
     fecha_corte: Optional[date] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_replica_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """Genera reporte de deudores"""
@@ -233,6 +273,82 @@ def reporte_deudores(
     return service.reporte_deudores(fecha_corte)
 
 
+@router.get("/reportes/deudores/csv")
+def exportar_reporte_deudores(
+    fecha_corte: Optional[date] = None,
+    db: Session = Depends(get_replica_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """Exporta el reporte de deudores como CSV, en streaming"""
+    contenido = exportacion_service.exportar(
+        db, "deudores", "csv", ExportacionFiltros(fecha_corte=fecha_corte)
+    )
+    nombre = f"deudores_{(fecha_corte or date.today()).isoformat()}.csv"
+    return StreamingResponse(
+        contenido,
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
+
+
+# ============ FACTURACIÓN DE PENSIONES ============
+
+@router.post("/facturacion/pensiones/simular", response_model=FacturacionPensionesSimulacion)
+def simular_facturacion_pensiones(
+    data: FacturacionPensionesRequest,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """Calcula la facturación mensual de pensiones sin generar comprobantes"""
+    return facturacion_service.simular(db, data)
+
+
+@router.post(
+    "/facturacion/pensiones",
+    response_model=FacturacionPensionSchema,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def facturar_pensiones(
+    data: FacturacionPensionesRequest,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """
+    Lanza en segundo plano la facturación mensual de pensiones.
+
+    Si el período tiene una corrida sin completar, la retoma desde el último
+    lote procesado con sus parámetros originales.
+    """
+    from app.tasks.facturacion import facturar_pensiones as tarea_facturar_pensiones
+
+    facturacion = facturacion_service.iniciar(db, data, usuario_id=current_user.id)
+    try:
+        tarea = tarea_facturar_pensiones.delay(str(facturacion.id))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No se pudo encolar la facturación, intente nuevamente"
+        )
+
+    facturacion.tarea_id = tarea.id
+    db.commit()
+    db.refresh(facturacion)
+    return facturacion
+
+
+@router.get("/facturacion/pensiones/{facturacion_id}", response_model=FacturacionPensionSchema)
+def obtener_facturacion_pensiones(
+    facturacion_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """Obtiene el estado y avance de una corrida de facturación de pensiones"""
+    facturacion = facturacion_service.obtener(db, facturacion_id)
+    if not facturacion:
+        raise HTTPException(status_code=404, detail="Facturación no encontrada")
+    return facturacion
+
+
 # ============ ESTADÍSTICAS RÁPIDAS ============
 
 @router.get("/stats/resumen")
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.deps import get_db, get_current_active_user
+from app.db.session import get_async_replica_db
+from app.core.deps import get_current_active_user
 from app.models.usuario import Usuario
 from app.services import dashboard_service
 
@@ -10,7 +11,7 @@ router = APIRouter()
 
 @router.get("/")
 async def obtener_dashboard(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -23,12 +24,12 @@ async def obtener_dashboard(
     - Próximos eventos
     - Pagos críticos (más vencidos)
     """
-    return dashboard_service.obtener_dashboard_completo(db, str(current_user.id))
+    return await dashboard_service.obtener_dashboard_completo(db, current_user.id)
 
 
 @router.get("/estadisticas/generales")
 async def obtener_estadisticas_generales(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -38,12 +39,12 @@ async def obtener_estadisticas_generales(
     - Total de empleados activos
     - Total de eventos del mes
     """
-    return dashboard_service.obtener_estadisticas_generales(db)
+    return await dashboard_service.obtener_estadisticas_generales(db)
 
 
 @router.get("/estadisticas/pagos")
 async def obtener_estadisticas_pagos(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -53,12 +54,12 @@ async def obtener_estadisticas_pagos(
     - Cantidad de pagos del mes
     - Cantidad de pagos vencidos
     """
-    return dashboard_service.obtener_estadisticas_pagos(db)
+    return await dashboard_service.obtener_estadisticas_pagos(db)
 
 
 @router.get("/estadisticas/clientes")
 async def obtener_estadisticas_clientes(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -67,12 +68,12 @@ async def obtener_estadisticas_clientes(
     - Clientes morosos
     - Clientes que deben
     """
-    return dashboard_service.obtener_estadisticas_clientes(db)
+    return await dashboard_service.obtener_estadisticas_clientes(db)
 
 
 @router.get("/estadisticas/eventos")
 async def obtener_estadisticas_eventos(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -80,13 +81,13 @@ async def obtener_estadisticas_eventos(
     - Eventos hoy
     - Eventos esta semana
     """
-    return dashboard_service.obtener_estadisticas_eventos(db)
+    return await dashboard_service.obtener_estadisticas_eventos(db)
 
 
 @router.get("/proximos-eventos")
 async def obtener_proximos_eventos(
     limite: int = 5,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -95,13 +96,13 @@ async def obtener_proximos_eventos(
     Args:
         limite: Cantidad máxima de eventos a retornar (default: 5)
     """
-    return dashboard_service.obtener_proximos_eventos(db, limite)
+    return await dashboard_service.obtener_proximos_eventos(db, limite)
 
 
 @router.get("/pagos-criticos")
 async def obtener_pagos_criticos(
     limite: int = 5,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
@@ -110,4 +111,4 @@ async def obtener_pagos_criticos(
     Args:
         limite: Cantidad máxima de pagos a retornar (default: 5)
     """
-    return dashboard_service.obtener_pagos_pendientes_criticos(db, limite)
+    return await dashboard_service.obtener_pagos_pendientes_criticos(db, limite)
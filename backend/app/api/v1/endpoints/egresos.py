@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 from datetime import date
 
 from app.core.deps import get_db, get_current_active_user, require_admin
+from app.core.paginacion import DESCRIPCION_CURSOR, responder_con_cursor
 from app.models.usuario import Usuario
 from app.models.egreso import TipoEgresoEnum
 from app.schemas.egreso import EgresoSchema, EgresoCreate, EgresoUpdate
@@ -15,15 +16,29 @@ router = APIRouter()
 
 @router.get("/", response_model=List[EgresoSchema])
 async def listar_egresos(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description=DESCRIPCION_CURSOR),
     tipo: Optional[TipoEgresoEnum] = Query(None),
     fecha_desde: Optional[date] = Query(None),
     fecha_hasta: Optional[date] = Query(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    """Lista todos los egresos con paginación y filtros."""
+    """Lista todos los egresos con paginación (offset o cursor) y filtros."""
+    if cursor is not None:
+        egresos, siguiente = egreso_service.obtener_pagina(
+            db,
+            cursor=cursor,
+            limit=limit,
+            tipo=tipo,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta
+        )
+        responder_con_cursor(response, siguiente)
+        return egresos
+
     return egreso_service.obtener_todos(
         db,
         skip=skip,
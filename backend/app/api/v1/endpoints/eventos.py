@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 from datetime import date
 
 from app.core.deps import get_db, get_current_active_user, require_admin
+from app.core.paginacion import DESCRIPCION_CURSOR, responder_con_cursor
 from app.models.usuario import Usuario
 from app.schemas.evento import (
     EventoSchema,
@@ -21,14 +22,27 @@ router = APIRouter()
 
 @router.get("/", response_model=List[EventoSchema])
 async def listar_eventos(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description=DESCRIPCION_CURSOR),
     fecha_inicio: Optional[date] = Query(None),
     fecha_fin: Optional[date] = Query(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    """Lista todos los eventos con paginación."""
+    """Lista todos los eventos con paginación (offset o cursor)."""
+    if cursor is not None:
+        eventos, siguiente = evento_service.obtener_pagina(
+            db,
+            cursor=cursor,
+            limit=limit,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin
+        )
+        responder_con_cursor(response, siguiente)
+        return eventos
+
     return evento_service.obtener_todos(
         db,
         skip=skip,
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
 from datetime import date
 
+from app.db.session import get_replica_db
 from app.core.deps import get_db, get_current_active_user, require_admin
+from app.core.paginacion import DESCRIPCION_CURSOR, responder_con_cursor
 from app.models.usuario import Usuario
 from app.models.pago import EstadoPagoEnum
 from app.schemas.pago import PagoSchema, PagoCreate, PagoUpdate, RegistrarPagoRequest
@@ -17,14 +19,27 @@ router = APIRouter()
 
 @router.get("/", response_model=List[PagoSchema])
 async def listar_pagos(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description=DESCRIPCION_CURSOR),
     cliente_id: Optional[UUID] = Query(None),
     estado: Optional[EstadoPagoEnum] = Query(None),
     db: Session = Depends(get_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
-    """Lista todos los pagos con paginación."""
+    """Lista todos los pagos con paginación (offset o cursor)."""
+    if cursor is not None:
+        pagos, siguiente = pago_service.obtener_pagina(
+            db,
+            cursor=cursor,
+            limit=limit,
+            cliente_id=cliente_id,
+            estado=estado
+        )
+        responder_con_cursor(response, siguiente)
+        return pagos
+
     return pago_service.obtener_todos(
         db,
         skip=skip,
@@ -156,7 +171,7 @@ class BalanceResponse(BaseModel):
 async def obtener_balance(
     fecha_inicio: date = Query(...),
     fecha_fin: date = Query(...),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_replica_db),
     current_user: Usuario = Depends(require_admin)
 ):
     """Obtiene el balance financiero para un período."""
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.core.deps import get_db
+from app.db.session import get_async_replica_db
 from app.schemas.evento import EventoPublicoSchema
 from app.services import evento_service
 
@@ -11,7 +11,7 @@ router = APIRouter()
 
 @router.get("/eventos", response_model=List[EventoPublicoSchema])
 async def listar_eventos_publicos(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_replica_db)
 ):
     """Lista los eventos marcados como públicos para la web."""
-    return evento_service.obtener_eventos_publicos(db)
+    return await evento_service.obtener_eventos_publicos(db)
@@ -1,65 +1,118 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import date, timedelta
 
-from app.core.deps import get_db, get_current_active_user
+from app.core.celery_app import celery_app
+from app.db.session import get_async_replica_db, get_replica_db
+from app.core.deps import get_current_active_user, require_admin
 from app.models.usuario import Usuario
-from app.models.caballo import Caballo, EstadoCaballoEnum
-from app.models.cliente import Cliente
-from app.models.evento import Evento
-from app.models.pago import Pago, EstadoPagoEnum
+from app.schemas.exportacion import (
+    ExportacionEstado, ExportacionFiltros, ExportacionRequest,
+    FormatoExportacionEnum, ReporteExportableEnum
+)
+from app.services import dashboard_service, exportacion_service
 
 router = APIRouter()
 
 
 @router.get("/dashboard")
 async def obtener_dashboard(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_replica_db),
     current_user: Usuario = Depends(get_current_active_user)
 ):
     """
     Obtiene estadísticas para el dashboard principal.
     """
-    # Contar caballos activos
-    total_caballos = db.query(Caballo).filter(
-        Caballo.estado == EstadoCaballoEnum.ACTIVO
-    ).count()
-
-    # Contar clientes activos
-    total_clientes = db.query(Cliente).filter(
-        Cliente.activo == True
-    ).count()
-
-    # Eventos del mes actual
-    hoy = date.today()
-    inicio_mes = date(hoy.year, hoy.month, 1)
-    if hoy.month == 12:
-        fin_mes = date(hoy.year + 1, 1, 1) - timedelta(days=1)
-    else:
-        fin_mes = date(hoy.year, hoy.month + 1, 1) - timedelta(days=1)
-
-    eventos_mes = db.query(Evento).filter(
-        Evento.fecha_inicio >= inicio_mes,
-        Evento.fecha_inicio <= fin_mes
-    ).count()
-
-    # Pagos pendientes
-    pagos_pendientes = db.query(Pago).filter(
-        Pago.estado == EstadoPagoEnum.PENDIENTE
-    ).count()
-
-    # Ingresos del mes
-    ingresos_mes = db.query(func.sum(Pago.monto)).filter(
-        Pago.fecha_pago >= inicio_mes,
-        Pago.fecha_pago <= fin_mes,
-        Pago.estado == EstadoPagoEnum.PAGADO
-    ).scalar() or 0
-
-    return {
-        "caballos_activos": total_caballos,
-        "clientes_activos": total_clientes,
-        "eventos_mes": eventos_mes,
-        "pagos_pendientes": pagos_pendientes,
-        "ingresos_mes": float(ingresos_mes)
-    }
+    return await dashboard_service.obtener_resumen_reportes(db)
+
+
+# ============ EXPORTACIONES ============
+
+@router.get("/exportar/{reporte}")
+def exportar_reporte(
+    reporte: ReporteExportableEnum,
+    formato: FormatoExportacionEnum = FormatoExportacionEnum.CSV,
+    filtros: ExportacionFiltros = Depends(),
+    db: Session = Depends(get_replica_db),
+    current_user: Usuario = Depends(require_admin)
+):
+    """
+    Descarga un reporte como CSV o XLSX, en streaming.
+
+    Para reportes muy grandes conviene la exportación en segundo plano
+    (POST /reportes/exportaciones).
+    """
+    contenido = exportacion_service.exportar(db, reporte.value, formato.value, filtros)
+    nombre = exportacion_service.nombre_archivo(reporte.value, formato.value)
+    return StreamingResponse(
+        contenido,
+        media_type=exportacion_service.MEDIA_TYPES[formato.value],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'}
+    )
+
+
+@router.post("/exportaciones", response_model=ExportacionEstado, status_code=status.HTTP_202_ACCEPTED)
+def crear_exportacion(
+    data: ExportacionRequest,
+    current_user: Usuario = Depends(require_admin)
+):
+    """Genera un reporte en segundo plano; consultar el estado para descargarlo"""
+    from app.tasks.reportes import generar_exportacion
+
+    filtros = ExportacionFiltros(**data.model_dump(exclude={"reporte", "formato"}))
+    try:
+        tarea = generar_exportacion.delay(data.reporte.value, data.formato.value, filtros.model_dump(mode="json"))
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No se pudo encolar la exportación, intente nuevamente"
+        )
+    return ExportacionEstado(tarea_id=tarea.id, estado="PENDING")
+
+
+def _resultado_exportacion(tarea_id: str) -> ExportacionEstado:
+    """Estado de la tarea de exportación, con el error si falló."""
+    tarea = celery_app.AsyncResult(tarea_id)
+    if not tarea.ready():
+        return ExportacionEstado(tarea_id=tarea_id, estado=tarea.state)
+
+    resultado = tarea.result if tarea.successful() else {"success": False, "error": str(tarea.result)}
+    if not isinstance(resultado, dict) or "archivo" not in resultado:
+        error = resultado.get("error") if isinstance(resultado, dict) else None
+        return ExportacionEstado(
+            tarea_id=tarea_id, estado="FAILURE", error=error or "La tarea no es una exportación"
+        )
+
+    return ExportacionEstado(
+        tarea_id=tarea_id,
+        estado="SUCCESS",
+        filas=resultado["filas"],
+        url_descarga=f"/api/v1/reportes/exportaciones/{tarea_id}/archivo"
+    )
+
+
+@router.get("/exportaciones/{tarea_id}", response_model=ExportacionEstado)
+def obtener_exportacion(
+    tarea_id: str,
+    current_user: Usuario = Depends(require_admin)
+):
+    """Obtiene el estado de una exportación en segundo plano"""
+    return _resultado_exportacion(tarea_id)
+
+
+@router.get("/exportaciones/{tarea_id}/archivo")
+def descargar_exportacion(
+    tarea_id: str,
+    current_user: Usuario = Depends(require_admin)
+):
+    """Descarga el archivo de una exportación terminada"""
+    tarea = celery_app.AsyncResult(tarea_id)
+    resultado = tarea.result if tarea.successful() else None
+    archivo = resultado.get("archivo") if isinstance(resultado, dict) else None
+    ruta = exportacion_service.ruta_archivo(archivo) if archivo else None
+    if not ruta:
+        raise HTTPException(status_code=404, detail="Exportación no encontrada, vencida o todavía en curso")
+
+    formato = ruta.suffix.lstrip(".")
+    return FileResponse(ruta, media_type=exportacion_service.MEDIA_TYPES[formato], filename=resultado["nombre"])
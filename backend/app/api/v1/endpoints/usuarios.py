@@ -84,7 +84,7 @@ async def crear_usuario(
             detail="Solo un super admin puede crear otros super admins"
         )
 
-    return usuario_service.crear(db, usuario)
+    return await usuario_service.crear(db, usuario)
 
 
 @router.get("/{usuario_id}", response_model=UsuarioSchema)
@@ -168,7 +168,7 @@ async def actualizar_usuario(
                 detail="No se puede desactivar o cambiar el rol del último super admin activo"
             )
 
-    return usuario_service.actualizar(db, usuario_id, usuario_update)
+    return await usuario_service.actualizar(db, usuario_id, usuario_update)
 
 
 @router.delete("/{usuario_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,5 +1,5 @@
 """Constantes de la aplicación"""
 
-from .plan_sanitario import PLAN_SANITARIO_2026, TIPO_ACTIVIDAD_A_MODELO
+from .plan_sanitario import PLAN_SANITARIO_2026, TIPO_ACTIVIDAD_A_MODELO, CODIGOS_VACUNA
 
-__all__ = ["PLAN_SANITARIO_2026", "TIPO_ACTIVIDAD_A_MODELO"]
+__all__ = ["PLAN_SANITARIO_2026", "TIPO_ACTIVIDAD_A_MODELO", "CODIGOS_VACUNA"]
@@ -25,6 +25,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "vacuna",
+                        "codigo": "rabia",
                         "nombre": "Vacuna Antirrábica",
                         "descripcion": "Vacunación contra la rabia",
                     }
@@ -36,11 +37,13 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "analisis",
+                        "codigo": "aie",
                         "nombre": "AIE",
                         "descripcion": "Análisis de Anemia Infecciosa Equina",
                     },
                     {
                         "tipo": "desparasitacion",
+                        "codigo": "desparasitacion",
                         "nombre": "Desparasitación",
                         "descripcion": "Aplicación de antiparasitario",
                     }
@@ -52,6 +55,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "vacuna",
+                        "codigo": "influenza",
                         "nombre": "Vacuna c/ Influenza",
                         "descripcion": "Vacunación contra Influenza Equina",
                     }
@@ -63,11 +67,13 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "analisis",
+                        "codigo": "aie",
                         "nombre": "AIE",
                         "descripcion": "Análisis de Anemia Infecciosa Equina",
                     },
                     {
                         "tipo": "vacuna",
+                        "codigo": "adenitis",
                         "nombre": "Vacuna c/ Adenitis",
                         "descripcion": "Vacunación contra Adenitis Equina",
                     }
@@ -79,16 +85,19 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "analisis",
+                        "codigo": "aie",
                         "nombre": "AIE",
                         "descripcion": "Análisis de Anemia Infecciosa Equina",
                     },
                     {
                         "tipo": "desparasitacion",
+                        "codigo": "desparasitacion",
                         "nombre": "Desparasitación",
                         "descripcion": "Aplicación de antiparasitario",
                     },
                     {
                         "tipo": "vacuna",
+                        "codigo": "influenza",
                         "nombre": "Vacuna c/ Influenza",
                         "descripcion": "Vacunación contra Influenza Equina",
                     }
@@ -100,6 +109,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "analisis",
+                        "codigo": "aie",
                         "nombre": "AIE",
                         "descripcion": "Análisis de Anemia Infecciosa Equina",
                     }
@@ -111,11 +121,13 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "analisis",
+                        "codigo": "aie",
                         "nombre": "AIE",
                         "descripcion": "Análisis de Anemia Infecciosa Equina",
                     },
                     {
                         "tipo": "vacuna",
+                        "codigo": "quintuple",
                         "nombre": "Vacuna Quíntuple",
                         "descripcion": "Vacunación Quíntuple (Influenza, Tétanos, Encefalomielitis, Rinoneumonitis)",
                     }
@@ -127,6 +139,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "desparasitacion",
+                        "codigo": "desparasitacion",
                         "nombre": "Desparasitación",
                         "descripcion": "Aplicación de antiparasitario",
                     }
@@ -153,6 +166,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "vacuna",
+                        "codigo": "rabia",
                         "nombre": "Vacuna c/ Rabia",
                         "descripcion": "Vacunación contra la rabia",
                     }
@@ -164,11 +178,13 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "analisis",
+                        "codigo": "aie",
                         "nombre": "AIE",
                         "descripcion": "Análisis de Anemia Infecciosa Equina",
                     },
                     {
                         "tipo": "desparasitacion",
+                        "codigo": "desparasitacion",
                         "nombre": "Desparasitación",
                         "descripcion": "Aplicación de antiparasitario",
                     }
@@ -180,6 +196,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "vacuna",
+                        "codigo": "influenza",
                         "nombre": "Vacuna c/ Influenza",
                         "descripcion": "Vacunación contra Influenza Equina",
                     }
@@ -191,6 +208,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "vacuna",
+                        "codigo": "adenitis",
                         "nombre": "Vacuna c/ Adenitis",
                         "descripcion": "Vacunación contra Adenitis Equina",
                     }
@@ -202,6 +220,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "desparasitacion",
+                        "codigo": "desparasitacion",
                         "nombre": "Desparasitación",
                         "descripcion": "Aplicación de antiparasitario",
                     }
@@ -213,6 +232,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "vacuna",
+                        "codigo": "influenza",
                         "nombre": "Vacuna c/ Influenza",
                         "descripcion": "Vacunación contra Influenza Equina",
                     }
@@ -224,11 +244,13 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "analisis",
+                        "codigo": "aie",
                         "nombre": "AIE",
                         "descripcion": "Análisis de Anemia Infecciosa Equina",
                     },
                     {
                         "tipo": "vacuna",
+                        "codigo": "quintuple",
                         "nombre": "Quíntuple",
                         "descripcion": "Vacunación Quíntuple (Influenza, Tétanos, Encefalomielitis, Rinoneumonitis)",
                     }
@@ -240,6 +262,7 @@ PLAN_SANITARIO_2026 = {
                 "actividades": [
                     {
                         "tipo": "desparasitacion",
+                        "codigo": "desparasitacion",
                         "nombre": "Desparasitación",
                         "descripcion": "Aplicación de antiparasitario",
                     }
@@ -250,6 +273,18 @@ PLAN_SANITARIO_2026 = {
 }
 
 
+# Taxonomía de vacunas y análisis: código canónico -> palabras clave (minúsculas,
+# sin acentos) que lo identifican en el nombre cargado. Se evalúan en orden, así
+# que la quíntuple va antes que influenza.
+CODIGOS_VACUNA = {
+    "quintuple": ("quintuple",),
+    "aie": ("aie", "anemia"),
+    "adenitis": ("adenitis",),
+    "rabia": ("rabia", "rabica"),
+    "influenza": ("influenza",),
+}
+
+
 # Mapeo de tipos de actividad a tipos de registro en el sistema
 TIPO_ACTIVIDAD_A_MODELO = {
     "vacuna": "vacuna",
@@ -0,0 +1,195 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Interfaz mínima de cache clave/valor con TTL"""
+
+    def get_many(self, claves: Iterable[str]) -> Dict[str, Any]:
+        """Retorna solo las claves presentes y vigentes."""
+        raise NotImplementedError
+
+    def set_many(self, valores: Dict[str, Any], ttl: int) -> None:
+        """Guarda varias claves con el mismo TTL (en segundos)."""
+        raise NotImplementedError
+
+    def delete(self, *claves: str) -> None:
+        """Elimina las claves indicadas."""
+        raise NotImplementedError
+
+    # Variantes para código async: por defecto corren la versión sincrónica
+    # en el threadpool, para no bloquear el event loop con I/O de red.
+
+    async def aget_many(self, claves: Iterable[str]) -> Dict[str, Any]:
+        return await run_in_threadpool(self.get_many, list(claves))
+
+    async def aset_many(self, valores: Dict[str, Any], ttl: int) -> None:
+        await run_in_threadpool(self.set_many, valores, ttl)
+
+    async def adelete(self, *claves: str) -> None:
+        await run_in_threadpool(self.delete, *claves)
+
+
+class MemoryLRUCache(CacheBackend):
+    """
+    Cache en memoria del proceso con política LRU y expiración por TTL.
+
+    Cada worker de uvicorn tiene su propia instancia, por lo que las
+    invalidaciones no se propagan entre procesos: el TTL acota la
+    desactualización. Para varios workers usar el backend Redis.
+    """
+
+    def __init__(self, max_entradas: int = 256):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, claves: Iterable[str]) -> Dict[str, Any]:
+        ahora = time.monotonic()
+        resultado = {}
+        with self._lock:
+            for clave in claves:
+                entrada = self._datos.get(clave)
+                if entrada is None:
+                    continue
+                expira, valor = entrada
+                if expira <= ahora:
+                    del self._datos[clave]
+                    continue
+                self._datos.move_to_end(clave)
+                resultado[clave] = valor
+        return resultado
+
+    def set_many(self, valores: Dict[str, Any], ttl: int) -> None:
+        expira = time.monotonic() + ttl
+        with self._lock:
+            for clave, valor in valores.items():
+                self._datos[clave] = (expira, valor)
+                self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def delete(self, *claves: str) -> None:
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    # En memoria no hay I/O: las variantes async no pasan por el threadpool
+
+    async def aget_many(self, claves: Iterable[str]) -> Dict[str, Any]:
+        return self.get_many(claves)
+
+    async def aset_many(self, valores: Dict[str, Any], ttl: int) -> None:
+        self.set_many(valores, ttl)
+
+    async def adelete(self, *claves: str) -> None:
+        self.delete(*claves)
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache compartida entre procesos sobre Redis.
+
+    Los valores se serializan como JSON. Los errores de conexión se registran
+    y se tratan como un miss, para que una caída de Redis no tumbe la API.
+    Tras un error, Redis se saltea durante
+    `settings.CACHE_REDIS_PAUSA_SEGUNDOS` (circuit breaker): mientras tanto
+    todo es miss inmediato, sin esperar el timeout de conexión en cada request.
+    Las invalidaciones que caen en la pausa se pierden; el TTL acota la
+    desactualización.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._error = redis.RedisError
+        self._pausada_hasta = 0.0
+
+    def _disponible(self) -> bool:
+        return time.monotonic() >= self._pausada_hasta
+
+    def _registrar_fallo(self, operacion: str, error: Exception) -> None:
+        self._pausada_hasta = time.monotonic() + settings.CACHE_REDIS_PAUSA_SEGUNDOS
+        logger.warning(
+            f"Redis no disponible para {operacion}: {error}; "
+            f"se omite la cache por {settings.CACHE_REDIS_PAUSA_SEGUNDOS}s"
+        )
+
+    def get_many(self, claves: Iterable[str]) -> Dict[str, Any]:
+        claves = list(claves)
+        if not claves or not self._disponible():
+            return {}
+        try:
+            valores = self._redis.mget(claves)
+        except self._error as e:
+            self._registrar_fallo("lectura de cache", e)
+            return {}
+        return {
+            clave: json.loads(valor)
+            for clave, valor in zip(claves, valores)
+            if valor is not None
+        }
+
+    def set_many(self, valores: Dict[str, Any], ttl: int) -> None:
+        if not valores or not self._disponible():
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for clave, valor in valores.items():
+                pipe.set(clave, json.dumps(valor, default=str), ex=ttl)
+            pipe.execute()
+        except self._error as e:
+            self._registrar_fallo("escritura de cache", e)
+
+    def delete(self, *claves: str) -> None:
+        if not claves or not self._disponible():
+            return
+        try:
+            self._redis.delete(*claves)
+        except self._error as e:
+            self._registrar_fallo("invalidar cache", e)
+
+    # Con el circuito abierto se responde sin pasar por el threadpool
+
+    async def aget_many(self, claves: Iterable[str]) -> Dict[str, Any]:
+        if not self._disponible():
+            return {}
+        return await super().aget_many(claves)
+
+    async def aset_many(self, valores: Dict[str, Any], ttl: int) -> None:
+        if self._disponible():
+            await super().aset_many(valores, ttl)
+
+    async def adelete(self, *claves: str) -> None:
+        if self._disponible():
+            await super().adelete(*claves)
+
+
+_cache: Optional[CacheBackend] = None
+
+
+def get_cache() -> CacheBackend:
+    """
+    Retorna el backend de cache del proceso.
+
+    Usa Redis si `settings.REDIS_URL` está configurado; si no, una cache LRU
+    en memoria.
+    """
+    global _cache
+    if _cache is None:
+        if settings.REDIS_URL:
+            _cache = RedisCache(settings.REDIS_URL)
+        else:
+            _cache = MemoryLRUCache(max_entradas=settings.CACHE_MAX_ENTRIES)
+    return _cache
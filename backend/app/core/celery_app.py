@@ -12,6 +12,9 @@ celery_app = Celery(
         "app.tasks.emails",
         "app.tasks.reportes",
         "app.tasks.pagos",
+        "app.tasks.cuentas",
+        "app.tasks.facturacion",
+        "app.tasks.comprobantes",
     ]
 )
 
@@ -54,4 +57,24 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.pagos.actualizar_pagos_vencidos",
         "schedule": crontab(hour=1, minute=0),
     },
+    # Checkpoints de saldo de cuenta corriente - Cada hora
+    "checkpoints-saldo-horario": {
+        "task": "app.tasks.cuentas.generar_checkpoints_saldo",
+        "schedule": crontab(minute=15),
+    },
+    # Conciliar saldos contra el ledger - Todos los días a las 3 AM
+    "conciliar-saldos-diario": {
+        "task": "app.tasks.cuentas.conciliar_saldos_cuenta",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    # PDFs de comprobantes del mes (completa los faltantes) - Todos los días a las 4 AM
+    "pdfs-comprobantes-diario": {
+        "task": "app.tasks.comprobantes.generar_pdfs_mes",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    # Borrar exportaciones vencidas - Todos los días a las 5 AM
+    "limpiar-exportaciones-diario": {
+        "task": "app.tasks.reportes.limpiar_exportaciones",
+        "schedule": crontab(hour=5, minute=0),
+    },
 }
@@ -16,6 +16,26 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    # Réplica de lectura opcional para reportes, dashboard y web pública
+    DATABASE_REPLICA_URL: str = ""
+
+    # Pool de conexiones (por proceso y por engine: el sync y el async tienen
+    # cada uno el suyo). Conexiones máximas por worker = 2 * (size + overflow);
+    # en Railway dimensionar según workers * réplicas vs max_connections.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # segundos; -1 desactiva el reciclado
+    DB_POOL_PRE_PING: bool = True
+
+    # Contador de consultas por request (desarrollo/CI): agrega las cabeceras
+    # X-DB-Queries / X-DB-Time y marca como posible N+1 toda sentencia que se
+    # repite al menos DB_QUERY_STATS_N1_UMBRAL veces en el mismo request
+    DB_QUERY_STATS: bool = False
+    DB_QUERY_STATS_N1_UMBRAL: int = 5
+
+    # Token (Bearer) para leer /metrics; vacío = endpoint deshabilitado
+    METRICS_TOKEN: str = ""
 
     # Security
     SECRET_KEY: str
@@ -40,6 +60,42 @@ class Settings(BaseSettings):
     # Redis (opcional - si no está configurado, no se usará)
     REDIS_URL: str = ""
 
+    # Cache (Redis si REDIS_URL está configurado, LRU en memoria si no)
+    CACHE_MAX_ENTRIES: int = 256
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 1024
+    CACHE_REDIS_PAUSA_SEGUNDOS: int = 30  # Tras un error de Redis, se saltea la cache este tiempo
+
+    # Bcrypt (pool de hilos dedicado; por encima de la cola se responde 503)
+    BCRYPT_MAX_WORKERS: int = 4
+    BCRYPT_MAX_QUEUE: int = 64
+
+    # Tareas periódicas
+    PAGOS_VENCIDOS_BATCH_SIZE: int = 1000
+    TAREAS_SCAN_BATCH_SIZE: int = 500
+    FACTURACION_BATCH_SIZE: int = 200  # clientes por lote en la facturación mensual de pensiones
+    # Una corrida en_curso sin avance durante este tiempo se considera abandonada (worker caído) y puede retomarse
+    FACTURACION_CORRIDA_ABANDONADA_SEGUNDOS: int = 900
+    # Comprobantes por tarea al generar los PDFs del mes (cada lote debe entrar en el time limit de Celery)
+    COMPROBANTES_PDF_BATCH_SIZE: int = 50
+
+    # Exportaciones generadas en segundo plano (directorio privado, se descargan con autenticación)
+    EXPORTACIONES_DIR: str = "exportaciones"
+    EXPORTACIONES_RETENCION_DIAS: int = 7  # después se borran (tarea limpiar_exportaciones)
+    # Time limits (segundos) de la tarea generar_exportacion; un XLSX grande excede los globales de Celery
+    EXPORTACIONES_SOFT_TIME_LIMIT: int = 1800
+    EXPORTACIONES_TIME_LIMIT: int = 1920
+
+    # Cuenta corriente
+    CLIENTE_UMBRAL_MOROSIDAD: int = 1000  # deuda a partir de la cual el cliente pasa a moroso
+    # Los checkpoints de saldo solo incluyen movimientos más viejos que este margen,
+    # para no saltear movimientos de transacciones que todavía no hicieron commit
+    CUENTA_CHECKPOINT_MARGEN_SEGUNDOS: int = 300
+
+    # Código QR de los caballos ({caballo_id} se reemplaza por el ID)
+    QR_URL_TEMPLATE: str = "https://clubecuestre.com/caballos/{caballo_id}/ficha"
+
     # Cloudinary
     CLOUDINARY_CLOUD_NAME: str = ""
     CLOUDINARY_API_KEY: str = ""
@@ -1,10 +1,17 @@
-from typing import Generator, Callable
+import hmac
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Generator, Callable, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 from uuid import UUID
 
 from app.db.session import get_db
+from app.core.cache import MemoryLRUCache, get_cache
+from app.core.config import settings
+from app.core.permisos import bit_permiso, compilar_mascara
 from app.core.security import decode_token
 from app.models.usuario import Usuario, RolEnum
 
@@ -12,6 +19,85 @@ from app.models.usuario import Usuario, RolEnum
 security = HTTPBearer()
 
 
+# ============================================================================
+# CACHE DE AUTENTICACIÓN
+# ============================================================================
+
+# Tokens ya verificados (firma + exp) en este proceso, para no repetir el
+# decode en cada request. La clave es el token completo: solo un token
+# idéntico al ya verificado puede reutilizar el resultado.
+_tokens_verificados = MemoryLRUCache(max_entradas=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+
+# Columnas del usuario que viajan en la cache del principal. El password_hash
+# queda fuera a propósito: si un endpoint lo necesita se carga de la base.
+_CAMPOS_PRINCIPAL = ("email", "rol", "activo", "permisos", "ultimo_acceso", "created_at", "updated_at")
+
+
+# Versión del formato del principal cacheado: subirla al agregar o cambiar
+# campos, así las entradas viejas (p. ej. sin mascara_permisos) no se leen
+# después de un deploy y simplemente expiran
+_VERSION_PRINCIPAL = 2
+
+
+def _clave_principal(usuario_id) -> str:
+    return f"auth:principal:v{_VERSION_PRINCIPAL}:{usuario_id}"
+
+
+def _verificar_token(token: str) -> Optional[Dict[str, Any]]:
+    """Decodifica el token, reutilizando el payload si ya fue verificado y no expiró."""
+    cacheado = _tokens_verificados.get_many([token]).get(token)
+    if cacheado is not None:
+        return cacheado
+
+    payload = decode_token(token)
+    if payload:
+        restante = int(payload.get("exp", 0) - time.time())
+        if restante > 0:
+            _tokens_verificados.set_many({token: payload}, ttl=restante)
+    return payload
+
+
+def _serializar_principal(usuario: Usuario) -> Dict[str, Any]:
+    """Datos del usuario en formato JSON para la cache del principal."""
+    datos = {"id": str(usuario.id)}
+    for campo in _CAMPOS_PRINCIPAL:
+        valor = getattr(usuario, campo)
+        if isinstance(valor, datetime):
+            valor = valor.isoformat()
+        elif isinstance(valor, RolEnum):
+            valor = valor.value
+        datos[campo] = valor
+    return datos
+
+
+def _usuario_desde_principal(db: Session, datos: Dict[str, Any]) -> Usuario:
+    """
+    Reconstruye el usuario cacheado como instancia persistente de la sesión.
+
+    La instancia queda en el identity map como si hubiera sido leída de la
+    base: las relaciones (cliente, empleado) y el password_hash se cargan de
+    forma lazy solo si se acceden, y los cambios se persisten con normalidad.
+    """
+    usuario = Usuario(
+        id=UUID(datos["id"]),
+        email=datos["email"],
+        rol=RolEnum(datos["rol"]),
+        activo=datos["activo"],
+        permisos=datos["permisos"],
+        ultimo_acceso=datetime.fromisoformat(datos["ultimo_acceso"]) if datos["ultimo_acceso"] else None,
+        created_at=datetime.fromisoformat(datos["created_at"]),
+        updated_at=datetime.fromisoformat(datos["updated_at"]),
+    )
+    make_transient_to_detached(usuario)
+    db.add(usuario)
+    return usuario
+
+
+def invalidar_principal(usuario_id: UUID) -> None:
+    """Descarta el principal cacheado del usuario (tras cambiar rol, permisos o estado)."""
+    get_cache().delete(_clave_principal(usuario_id))
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -19,6 +105,12 @@ async def get_current_user(
     """
     Obtiene el usuario actual desde el JWT token.
 
+    El payload verificado y los datos del usuario (con sus permisos ya
+    compilados en máscara de bits) se cachean con TTL corto
+    (settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS), por lo que un request con
+    cache caliente no consulta la tabla usuarios. `usuario_service` invalida
+    la entrada al modificar permisos, rol o estado del usuario.
+
     Args:
         credentials: Bearer token de autorización
         db: Sesión de base de datos
@@ -30,7 +122,7 @@ async def get_current_user(
         HTTPException: Si el token es inválido o el usuario no existe
     """
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = _verificar_token(token)
 
     if not payload or payload.get("type") != "access":
         raise HTTPException(
@@ -46,13 +138,22 @@ async def get_current_user(
             detail="Token inválido: falta subject"
         )
 
-    user = db.query(Usuario).filter(Usuario.id == UUID(user_id)).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario no encontrado"
-        )
+    clave = _clave_principal(user_id)
+    principal = (await get_cache().aget_many([clave])).get(clave)
+    if principal is not None:
+        user = _usuario_desde_principal(db, principal)
+    else:
+        user = db.query(Usuario).filter(Usuario.id == UUID(user_id)).first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Usuario no encontrado"
+            )
+        principal = _serializar_principal(user)
+        principal["mascara_permisos"] = compilar_mascara(user.permisos)
+        await get_cache().aset_many({clave: principal}, ttl=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS)
 
+    user.mascara_permisos = principal["mascara_permisos"]
     return user
 
 
@@ -148,6 +249,35 @@ async def require_empleado_or_admin(
     return current_user
 
 
+async def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
+) -> None:
+    """
+    Protege /metrics con el token estático settings.METRICS_TOKEN.
+
+    Es un token aparte del JWT de usuarios, para que un scraper (Prometheus,
+    etc.) pueda leer las métricas sin una cuenta. Sin METRICS_TOKEN
+    configurado el endpoint no existe.
+
+    Args:
+        credentials: Bearer token de autorización (opcional)
+
+    Raises:
+        HTTPException: 404 si las métricas están deshabilitadas, 401 si el
+            token falta o no coincide
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas inválido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
 # ============================================================================
 # PERMISOS GRANULARES
 # ============================================================================
@@ -172,19 +302,29 @@ def verificar_permiso(usuario: Usuario, modulo: str, accion: str) -> bool:
     if not usuario.activo:
         return False
 
-    # Si no hay permisos configurados, denegar acceso por seguridad
-    if not usuario.permisos:
-        return False
+    try:
+        bit = bit_permiso(modulo, accion)
+    except ValueError:
+        # Fuera del catálogo (ej: secciones de caballos): se consulta el JSONB
+        return bool((usuario.permisos or {}).get(modulo, {}).get(accion, False))
 
-    # Verificar permiso en el módulo
-    permisos_modulo = usuario.permisos.get(modulo, {})
-    return permisos_modulo.get(accion, False)
+    # Máscara precompilada por get_current_user; si el usuario no viene de
+    # ahí (ej: cargado por un servicio) se compila en el momento.
+    # Sin permisos configurados la máscara es 0: se deniega por seguridad
+    mascara = getattr(usuario, "mascara_permisos", None)
+    if mascara is None:
+        mascara = compilar_mascara(usuario.permisos)
+    return bool(mascara & bit)
 
 
+@lru_cache(maxsize=None)
 def require_permission(modulo: str, accion: str) -> Callable:
     """
     Factory que crea una dependencia para verificar permisos granulares.
 
+    Retorna siempre la misma dependencia para un mismo (modulo, accion), así
+    FastAPI la resuelve una sola vez por request aunque se declare varias veces.
+
     Args:
         modulo: Nombre del módulo (ej: "caballos", "clientes")
         accion: Tipo de acción (ej: "ver", "crear", "editar", "eliminar")
@@ -192,18 +332,23 @@ def require_permission(modulo: str, accion: str) -> Callable:
     Returns:
         Callable: Función de dependencia para FastAPI
 
+    Raises:
+        ValueError: Si el permiso no está en el catálogo de app.core.permisos
+
     Example:
         @router.get("/", dependencies=[Depends(require_permission("caballos", "ver"))])
         async def listar_caballos():
             ...
     """
+    bit = bit_permiso(modulo, accion)
+
     async def permission_checker(
         current_user: Usuario = Depends(get_current_active_user)
     ) -> Usuario:
-        if not verificar_permiso(current_user, modulo, accion):
+        if current_user.rol != RolEnum.SUPER_ADMIN and not (current_user.mascara_permisos & bit):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"No tienes permiso para {accion} en el módulo {modulo}"
+                detail=f"No tienes permiso para {accion} {modulo}"
             )
         return current_user
 
@@ -211,161 +356,19 @@ def require_permission(modulo: str, accion: str) -> Callable:
 
 
 # Dependencias específicas por módulo
-def require_caballos_ver(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para ver caballos"""
-    if not verificar_permiso(current_user, "caballos", "ver"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para ver caballos"
-        )
-    return current_user
-
-
-def require_caballos_crear(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para crear caballos"""
-    if not verificar_permiso(current_user, "caballos", "crear"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para crear caballos"
-        )
-    return current_user
-
-
-def require_caballos_editar(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para editar caballos"""
-    if not verificar_permiso(current_user, "caballos", "editar"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para editar caballos"
-        )
-    return current_user
-
-
-def require_caballos_eliminar(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para eliminar caballos"""
-    if not verificar_permiso(current_user, "caballos", "eliminar"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para eliminar caballos"
-        )
-    return current_user
-
-
-def require_clientes_ver(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para ver clientes"""
-    if not verificar_permiso(current_user, "clientes", "ver"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para ver clientes"
-        )
-    return current_user
-
-
-def require_clientes_crear(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para crear clientes"""
-    if not verificar_permiso(current_user, "clientes", "crear"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para crear clientes"
-        )
-    return current_user
-
-
-def require_clientes_editar(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para editar clientes"""
-    if not verificar_permiso(current_user, "clientes", "editar"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para editar clientes"
-        )
-    return current_user
-
-
-def require_clientes_eliminar(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para eliminar clientes"""
-    if not verificar_permiso(current_user, "clientes", "eliminar"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para eliminar clientes"
-        )
-    return current_user
-
-
-def require_pagos_ver(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para ver pagos"""
-    if not verificar_permiso(current_user, "pagos", "ver"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para ver pagos"
-        )
-    return current_user
-
-
-def require_pagos_crear(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para crear pagos"""
-    if not verificar_permiso(current_user, "pagos", "crear"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para crear pagos"
-        )
-    return current_user
-
-
-def require_pagos_editar(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para editar pagos"""
-    if not verificar_permiso(current_user, "pagos", "editar"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para editar pagos"
-        )
-    return current_user
-
-
-def require_eventos_ver(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para ver eventos"""
-    if not verificar_permiso(current_user, "eventos", "ver"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para ver eventos"
-        )
-    return current_user
-
-
-def require_eventos_crear(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para crear eventos"""
-    if not verificar_permiso(current_user, "eventos", "crear"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para crear eventos"
-        )
-    return current_user
-
-
-def require_eventos_editar(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para editar eventos"""
-    if not verificar_permiso(current_user, "eventos", "editar"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para editar eventos"
-        )
-    return current_user
-
-
-def require_alertas_ver(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para ver alertas"""
-    if not verificar_permiso(current_user, "alertas", "ver"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para ver alertas"
-        )
-    return current_user
-
-
-def require_alertas_crear(current_user: Usuario = Depends(get_current_active_user)) -> Usuario:
-    """Requiere permiso para crear alertas"""
-    if not verificar_permiso(current_user, "alertas", "crear"):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="No tienes permiso para crear alertas"
-        )
-    return current_user
+require_caballos_ver = require_permission("caballos", "ver")
+require_caballos_crear = require_permission("caballos", "crear")
+require_caballos_editar = require_permission("caballos", "editar")
+require_caballos_eliminar = require_permission("caballos", "eliminar")
+require_clientes_ver = require_permission("clientes", "ver")
+require_clientes_crear = require_permission("clientes", "crear")
+require_clientes_editar = require_permission("clientes", "editar")
+require_clientes_eliminar = require_permission("clientes", "eliminar")
+require_pagos_ver = require_permission("pagos", "ver")
+require_pagos_crear = require_permission("pagos", "crear")
+require_pagos_editar = require_permission("pagos", "editar")
+require_eventos_ver = require_permission("eventos", "ver")
+require_eventos_crear = require_permission("eventos", "crear")
+require_eventos_editar = require_permission("eventos", "editar")
+require_alertas_ver = require_permission("alertas", "ver")
+require_alertas_crear = require_permission("alertas", "crear")
@@ -0,0 +1,134 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+# Cabecera con la que los listados devuelven el cursor de la página siguiente
+CABECERA_CURSOR = "X-Next-Cursor"
+
+DESCRIPCION_CURSOR = (
+    "Activa la paginación por cursor (ignora `skip`). Enviar vacío para la primera "
+    f"página y luego el valor de la cabecera {CABECERA_CURSOR}; si no viene, no hay más páginas."
+)
+
+
+def codificar_cursor(valor: Any, id: UUID) -> str:
+    """Codifica (clave de orden, id) como un cursor opaco url-safe."""
+    if isinstance(valor, (date, datetime)):
+        valor = valor.isoformat()
+    crudo = json.dumps([valor, str(id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, columna) -> Tuple[Any, UUID]:
+    """
+    Decodifica un cursor generado por `codificar_cursor`.
+
+    Args:
+        cursor: Cursor recibido del cliente
+        columna: Columna de orden, usada para restaurar el tipo del valor
+
+    Returns:
+        Tuple con el valor de la clave de orden y el id
+
+    Raises:
+        HTTPException: Si el cursor no es válido
+    """
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valor, id = json.loads(crudo)
+        tipo = columna.type.python_type
+        if tipo is datetime:
+            valor = datetime.fromisoformat(valor)
+        elif tipo is date:
+            valor = date.fromisoformat(valor)
+        return valor, UUID(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+
+def paginar_por_cursor(
+    query: Query,
+    columna,
+    columna_id,
+    cursor: Optional[str],
+    limit: int,
+    descendente: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Pagina `query` por keyset sobre (columna, id) en lugar de OFFSET.
+
+    El predicado de búsqueda compara la tupla (columna, id) contra la última
+    fila de la página anterior, por lo que el costo de cada página no depende
+    de su profundidad si existe un índice sobre (columna, id).
+
+    Args:
+        query: Consulta ya filtrada, sin ORDER BY
+        columna: Columna de orden (NOT NULL)
+        columna_id: Columna id, desempata filas con el mismo valor de orden
+        cursor: Cursor de la página anterior; vacío o None para la primera página
+        limit: Tamaño de página
+        descendente: Sentido del orden
+
+    Returns:
+        Tuple con los elementos de la página y el cursor de la siguiente (o None)
+    """
+    query = _aplicar_cursor(query, columna, columna_id, cursor, limit, descendente)
+    return _recortar_pagina(query.all(), columna, columna_id, limit)
+
+
+async def paginar_por_cursor_async(
+    db: AsyncSession,
+    stmt: Select,
+    columna,
+    columna_id,
+    cursor: Optional[str],
+    limit: int,
+    descendente: bool = True
+) -> Tuple[List[Any], Optional[str]]:
+    """Igual que `paginar_por_cursor`, para un SELECT de entidades sobre una AsyncSession."""
+    stmt = _aplicar_cursor(stmt, columna, columna_id, cursor, limit, descendente)
+    items = (await db.scalars(stmt)).all()
+    return _recortar_pagina(items, columna, columna_id, limit)
+
+
+def _aplicar_cursor(query, columna, columna_id, cursor: Optional[str], limit: int, descendente: bool):
+    """Agrega a una Query o Select el predicado del cursor, el orden y el límite."""
+    if cursor:
+        valor, id = decodificar_cursor(cursor, columna)
+        clave = tuple_(columna, columna_id)
+        query = query.filter(clave < (valor, id) if descendente else clave > (valor, id))
+
+    if descendente:
+        query = query.order_by(columna.desc(), columna_id.desc())
+    else:
+        query = query.order_by(columna.asc(), columna_id.asc())
+
+    # Se pide una fila de más para saber si hay página siguiente
+    return query.limit(limit + 1)
+
+
+def _recortar_pagina(items, columna, columna_id, limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Recorta la fila extra y arma el cursor de la página siguiente."""
+    items = list(items)
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+    ultimo = items[-1]
+    return items, codificar_cursor(getattr(ultimo, columna.key), getattr(ultimo, columna_id.key))
+
+
+def responder_con_cursor(response: Response, siguiente: Optional[str]) -> None:
+    """Agrega el cursor de la página siguiente a la respuesta, si lo hay."""
+    if siguiente:
+        response.headers[CABECERA_CURSOR] = siguiente
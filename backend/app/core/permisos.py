@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+# Catálogo de permisos granulares. El orden define la posición de cada bit:
+# agregar módulos o acciones solo al final para no mover los existentes.
+MODULOS = (
+    "dashboard",
+    "caballos",
+    "clientes",
+    "empleados",
+    "eventos",
+    "pagos",
+    "usuarios",
+    "alertas",
+    "reportes",
+)
+ACCIONES = ("ver", "crear", "editar", "eliminar")
+
+_BITS: Dict[tuple, int] = {
+    (modulo, accion): 1 << (i * len(ACCIONES) + j)
+    for i, modulo in enumerate(MODULOS)
+    for j, accion in enumerate(ACCIONES)
+}
+
+
+def bit_permiso(modulo: str, accion: str) -> int:
+    """
+    Retorna el bit que representa el permiso (modulo, accion).
+
+    Raises:
+        ValueError: Si el par no está en el catálogo
+    """
+    try:
+        return _BITS[(modulo, accion)]
+    except KeyError:
+        raise ValueError(f"Permiso desconocido: {modulo}.{accion}")
+
+
+def compilar_mascara(permisos: Optional[Dict[str, Any]]) -> int:
+    """
+    Compila el JSONB de permisos de un usuario en una máscara de bits.
+
+    Args:
+        permisos: Estructura { "modulo": { "accion": bool, ... }, ... }
+
+    Returns:
+        int: OR de los bits de cada permiso concedido; 0 si no hay permisos
+    """
+    mascara = 0
+    for modulo, acciones in (permisos or {}).items():
+        if not isinstance(acciones, dict):
+            continue
+        for accion, concedido in acciones.items():
+            bit = _BITS.get((modulo, accion))
+            if bit and concedido:
+                mascara |= bit
+    return mascara
@@ -1,5 +1,11 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -35,6 +41,108 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# ============================================================================
+# BCRYPT EN POOL ACOTADO
+# ============================================================================
+
+# bcrypt es CPU-bound y tarda decenas de ms: ejecutarlo en el event loop
+# frena todos los requests del worker. Se ejecuta en un pool propio con
+# cantidad de hilos fija y una cola acotada; si la cola se llena se rechaza
+# con 503 en lugar de acumular esperas.
+_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=settings.BCRYPT_MAX_WORKERS,
+    thread_name_prefix="bcrypt"
+)
+_bcrypt_lock = threading.Lock()
+_bcrypt_metricas = {
+    "en_cola": 0,
+    "en_ejecucion": 0,
+    "completadas": 0,
+    "rechazadas": 0,
+    "espera_total_ms": 0.0,
+    "espera_max_ms": 0.0,
+}
+
+
+async def _ejecutar_bcrypt(funcion: Callable, *args) -> Any:
+    """
+    Ejecuta `funcion` en el pool de bcrypt sin bloquear el event loop.
+
+    Raises:
+        HTTPException: 503 si la cola del pool está llena
+    """
+    with _bcrypt_lock:
+        if _bcrypt_metricas["en_cola"] >= settings.BCRYPT_MAX_QUEUE:
+            _bcrypt_metricas["rechazadas"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servidor ocupado, intente nuevamente en unos segundos",
+                headers={"Retry-After": "1"},
+            )
+        _bcrypt_metricas["en_cola"] += 1
+    encolado = time.monotonic()
+    en_cola = {"pendiente": True}
+
+    def salir_de_cola() -> None:
+        # Se llama con _bcrypt_lock tomado; descuenta la cola una sola vez
+        if en_cola["pendiente"]:
+            en_cola["pendiente"] = False
+            _bcrypt_metricas["en_cola"] -= 1
+
+    def trabajo():
+        espera_ms = (time.monotonic() - encolado) * 1000
+        with _bcrypt_lock:
+            salir_de_cola()
+            _bcrypt_metricas["en_ejecucion"] += 1
+            _bcrypt_metricas["espera_total_ms"] += espera_ms
+            _bcrypt_metricas["espera_max_ms"] = max(_bcrypt_metricas["espera_max_ms"], espera_ms)
+        try:
+            return funcion(*args)
+        finally:
+            with _bcrypt_lock:
+                _bcrypt_metricas["en_ejecucion"] -= 1
+                _bcrypt_metricas["completadas"] += 1
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_bcrypt_executor, trabajo)
+    finally:
+        # Si el request se cancela (cliente desconectado, timeout) con el trabajo
+        # todavía en cola, el future se cancela y `trabajo` nunca corre
+        with _bcrypt_lock:
+            salir_de_cola()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Igual que `verify_password`, ejecutado en el pool de bcrypt."""
+    return await _ejecutar_bcrypt(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Igual que `get_password_hash`, ejecutado en el pool de bcrypt."""
+    return await _ejecutar_bcrypt(get_password_hash, password)
+
+
+def get_bcrypt_metrics() -> Dict[str, Any]:
+    """
+    Estado del pool de bcrypt.
+
+    Returns:
+        dict: Hilos, profundidad de cola, en ejecución, completadas,
+        rechazadas y espera en cola (promedio y máxima, en ms)
+    """
+    with _bcrypt_lock:
+        metricas = dict(_bcrypt_metricas)
+    espera_total = metricas.pop("espera_total_ms")
+    iniciadas = metricas["completadas"] + metricas["en_ejecucion"]
+    return {
+        "workers": settings.BCRYPT_MAX_WORKERS,
+        "max_cola": settings.BCRYPT_MAX_QUEUE,
+        **metricas,
+        "espera_promedio_ms": round(espera_total / iniciadas, 2) if iniciadas else 0.0,
+        "espera_max_ms": round(metricas["espera_max_ms"], 2),
+    }
+
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
     Crea JWT access token.
@@ -55,7 +163,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
     to_encode.update({
         "exp": expire,
-        "type": "access"
+        "type": "access",
+        "jti": uuid.uuid4().hex
     })
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -77,7 +186,8 @@ def create_refresh_token(data: Dict[str, Any]) -> str:
 
     to_encode.update({
         "exp": expire,
-        "type": "refresh"
+        "type": "refresh",
+        "jti": uuid.uuid4().hex
     })
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
@@ -0,0 +1,115 @@
+import json
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CABECERA_CONSULTAS = "X-DB-Queries"
+CABECERA_TIEMPO = "X-DB-Time"
+CABECERA_N1 = "X-DB-N1"
+
+# Listas de parámetros expandidas (IN (...), VALUES (...)) se colapsan para que
+# la misma sentencia con distinta cantidad de valores cuente como una sola forma
+_LISTA_PARAMETROS = re.compile(r"\(\s*(?:%\(\w+\)s|\$\d+|\?)(?:\s*,\s*(?:%\(\w+\)s|\$\d+|\?))*\s*\)")
+
+
+class EstadisticasRequest:
+    """Sentencias y tiempo de base de datos acumulados durante un request."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.formas: Counter = Counter()
+
+    def repetidas(self, umbral: int):
+        """Formas de sentencia ejecutadas al menos `umbral` veces."""
+        return [(forma, veces) for forma, veces in self.formas.most_common() if veces >= umbral]
+
+
+_estadisticas: ContextVar[Optional[EstadisticasRequest]] = ContextVar("estadisticas_db", default=None)
+
+
+def _forma_sentencia(sql: str) -> str:
+    return _LISTA_PARAMETROS.sub("(?)", " ".join(sql.split()))
+
+
+def instrumentar_consultas(engine: Engine) -> None:
+    """
+    Registra en `engine` los eventos que cuentan sentencias y tiempo por request.
+
+    Solo acumula mientras hay un request activo en ContadorConsultasMiddleware;
+    fuera de él (tareas, scripts) los eventos no hacen nada. Para un
+    AsyncEngine pasar `async_engine.sync_engine`.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        if _estadisticas.get() is not None:
+            conn.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        estadisticas = _estadisticas.get()
+        if estadisticas is None or not conn.info.get("inicio_consulta"):
+            return
+        estadisticas.tiempo += time.perf_counter() - conn.info["inicio_consulta"].pop()
+        estadisticas.consultas += 1
+        estadisticas.formas[_forma_sentencia(statement)] += 1
+
+
+class ContadorConsultasMiddleware(BaseHTTPMiddleware):
+    """
+    Cuenta las sentencias SQL y el tiempo de base de datos de cada request.
+
+    Agrega las cabeceras X-DB-Queries (cantidad) y X-DB-Time (ms), y X-DB-N1
+    con la cantidad de formas de sentencia repetidas al menos
+    settings.DB_QUERY_STATS_N1_UMBRAL veces, el patrón típico de un lazy load
+    dentro de un loop. Cada request deja además una línea de log JSON; con
+    sospecha de N+1 se registra como warning e incluye las sentencias.
+
+    Se activa con settings.DB_QUERY_STATS (pensado para desarrollo y CI).
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        estadisticas = EstadisticasRequest()
+        token = _estadisticas.set(estadisticas)
+        try:
+            response = await call_next(request)
+        finally:
+            _estadisticas.reset(token)
+
+        tiempo_ms = round(estadisticas.tiempo * 1000, 2)
+        repetidas = estadisticas.repetidas(settings.DB_QUERY_STATS_N1_UMBRAL)
+
+        response.headers[CABECERA_CONSULTAS] = str(estadisticas.consultas)
+        response.headers[CABECERA_TIEMPO] = str(tiempo_ms)
+        if repetidas:
+            response.headers[CABECERA_N1] = str(len(repetidas))
+
+        registro = {
+            "evento": "db_request",
+            "metodo": request.method,
+            "ruta": request.url.path,
+            "status": response.status_code,
+            "consultas": estadisticas.consultas,
+            "tiempo_ms": tiempo_ms,
+        }
+        if repetidas:
+            registro["n1"] = [{"veces": veces, "sql": forma[:300]} for forma, veces in repetidas]
+            logger.warning(json.dumps(registro, ensure_ascii=False))
+        else:
+            logger.info(json.dumps(registro, ensure_ascii=False))
+
+        return response
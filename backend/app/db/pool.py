@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class EstadisticasPool:
+    """Contadores acumulados de un pool de conexiones."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.timeouts = 0
+        self.conexiones_nuevas = 0
+        self.fallas_pre_ping = 0
+        self.invalidaciones = 0
+        self.overflow_max = 0
+
+    def registrar_espera(self, segundos: float, timeout: bool) -> None:
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+
+    def incrementar(self, contador: str, valor: int = 1) -> None:
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + valor)
+
+    def registrar_overflow(self, overflow: int) -> None:
+        with self._lock:
+            self.overflow_max = max(self.overflow_max, overflow)
+
+
+class _MedirEspera:
+    """
+    Mixin para QueuePool que mide cuánto espera cada checkout.
+
+    SQLAlchemy no tiene un evento previo al checkout, así que la espera se
+    mide alrededor de `_do_get`, que es donde el pool bloquea cuando no hay
+    conexiones libres y el overflow está agotado (incluye también el tiempo
+    de abrir una conexión nueva cuando el pool crece).
+    """
+
+    estadisticas: EstadisticasPool
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        timeout = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timeout = True
+            raise
+        finally:
+            self.estadisticas.registrar_espera(time.perf_counter() - inicio, timeout)
+
+    def recreate(self):
+        # dispose() o una desconexión masiva recrean el pool: conservar los contadores
+        nuevo = super().recreate()
+        nuevo.estadisticas = self.estadisticas
+        return nuevo
+
+
+class QueuePoolMedido(_MedirEspera, QueuePool):
+    """QueuePool con medición de espera en checkout."""
+
+
+class AsyncAdaptedQueuePoolMedido(_MedirEspera, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool con medición de espera en checkout."""
+
+
+_engines: Dict[str, Engine] = {}
+
+
+def instrumentar_pool(nombre: str, engine: Engine) -> None:
+    """
+    Registra los eventos de telemetría sobre el pool de `engine`.
+
+    Para un AsyncEngine pasar `async_engine.sync_engine`.
+
+    Args:
+        nombre: Nombre con el que se reporta el pool en las métricas
+        engine: Engine creado con QueuePoolMedido o AsyncAdaptedQueuePoolMedido
+    """
+    estadisticas = EstadisticasPool()
+    engine.pool.estadisticas = estadisticas
+    _engines[nombre] = engine
+
+    @event.listens_for(engine.pool, "connect")
+    def _al_conectar(dbapi_connection, connection_record):
+        estadisticas.incrementar("conexiones_nuevas")
+
+    @event.listens_for(engine.pool, "checkout")
+    def _al_checkout(dbapi_connection, connection_record, connection_proxy):
+        estadisticas.registrar_overflow(max(engine.pool.overflow(), 0))
+
+    @event.listens_for(engine.pool, "invalidate")
+    def _al_invalidar(dbapi_connection, connection_record, exception):
+        # El pre-ping fallido invalida la conexión con un DisconnectionError
+        if isinstance(exception, exc.DisconnectionError):
+            estadisticas.incrementar("fallas_pre_ping")
+        else:
+            estadisticas.incrementar("invalidaciones")
+
+
+def metricas_pools() -> Dict[str, Dict[str, Any]]:
+    """
+    Estado actual y contadores acumulados de cada pool instrumentado.
+
+    Returns:
+        Dict por nombre de pool con tamaño, conexiones en uso, libres,
+        overflow (actual y máximo), checkouts, espera promedio y máxima (ms),
+        timeouts, conexiones nuevas, fallas de pre-ping e invalidaciones
+    """
+    resultado = {}
+    for nombre, engine in _engines.items():
+        pool = engine.pool
+        e = pool.estadisticas
+        with e._lock:
+            resultado[nombre] = {
+                "tamano": pool.size(),
+                "en_uso": pool.checkedout(),
+                "libres": pool.checkedin(),
+                "overflow_en_uso": max(pool.overflow(), 0),
+                "overflow_max": e.overflow_max,
+                "checkouts": e.checkouts,
+                "espera_promedio_ms": round(e.espera_total / e.checkouts * 1000, 3) if e.checkouts else 0.0,
+                "espera_max_ms": round(e.espera_max * 1000, 3),
+                "timeouts": e.timeouts,
+                "conexiones_nuevas": e.conexiones_nuevas,
+                "fallas_pre_ping": e.fallas_pre_ping,
+                "invalidaciones": e.invalidaciones,
+            }
+    return resultado
@@ -1,18 +1,136 @@
+import ssl
+from typing import Any, Dict, Tuple
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import AsyncAdaptedQueuePoolMedido, QueuePoolMedido, instrumentar_pool
+
+# Parámetros del pool, compartidos por todos los engines
+_opciones_pool = dict(
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+)
+
+# Parámetros de conexión de libpq (psycopg2) que asyncpg no acepta como kwargs
+_PARAMETROS_SOLO_LIBPQ = {
+    "sslmode", "sslrootcert", "sslcert", "sslkey", "sslcrl", "sslpassword",
+    "channel_binding", "gssencmode", "connect_timeout", "application_name",
+}
+
+
+def _url_asyncpg(url: str) -> Tuple[URL, Dict[str, Any]]:
+    """
+    URL y connect_args para asyncpg a partir de una URL de PostgreSQL de libpq.
+
+    Cambiar solo el driver no alcanza: parámetros como ?sslmode=require (el
+    formato habitual de las bases administradas) llegarían a asyncpg.connect(),
+    que los rechaza. Se quitan de la URL y se traducen a sus equivalentes de
+    asyncpg (ssl, timeout, server_settings).
+    """
+    original = make_url(url)
+    query = dict(original.query)
+    connect_args: Dict[str, Any] = {}
+
+    sslmode = query.get("sslmode")
+    if sslmode:
+        if sslmode in ("verify-ca", "verify-full") and query.get("sslrootcert"):
+            contexto = ssl.create_default_context(cafile=query["sslrootcert"])
+            contexto.check_hostname = sslmode == "verify-full"
+            if query.get("sslcert"):
+                contexto.load_cert_chain(query["sslcert"], query.get("sslkey"))
+            connect_args["ssl"] = contexto
+        else:
+            # asyncpg acepta los mismos nombres de modo que libpq
+            connect_args["ssl"] = sslmode
+    if query.get("connect_timeout"):
+        connect_args["timeout"] = float(query["connect_timeout"])
+    if query.get("application_name"):
+        connect_args["server_settings"] = {"application_name": query["application_name"]}
+
+    asyncpg_url = original.set(
+        drivername="postgresql+asyncpg",
+        query={k: v for k, v in query.items() if k not in _PARAMETROS_SOLO_LIBPQ}
+    )
+    return asyncpg_url, connect_args
+
 
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    poolclass=QueuePoolMedido,
+    **_opciones_pool,
 )
+instrumentar_pool("sync", engine)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine async (asyncpg) sobre la misma base, para endpoints que no deben
+# bloquear el event loop mientras esperan a PostgreSQL
+_async_url, _async_connect_args = _url_asyncpg(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    _async_url,
+    connect_args=_async_connect_args,
+    poolclass=AsyncAdaptedQueuePoolMedido,
+    **_opciones_pool,
+)
+instrumentar_pool("async", async_engine.sync_engine)
+
+# expire_on_commit=False: los objetos se serializan después del commit y en
+# async no se pueden recargar atributos de forma implícita
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Réplica de lectura (opcional). Sin DATABASE_REPLICA_URL las sesiones de
+# réplica usan los engines principales, así que el código no cambia.
+if settings.DATABASE_REPLICA_URL:
+    replica_engine = create_engine(
+        settings.DATABASE_REPLICA_URL,
+        poolclass=QueuePoolMedido,
+        **_opciones_pool,
+    )
+    instrumentar_pool("replica", replica_engine)
+
+    _replica_url, _replica_connect_args = _url_asyncpg(settings.DATABASE_REPLICA_URL)
+    async_replica_engine = create_async_engine(
+        _replica_url,
+        connect_args=_replica_connect_args,
+        poolclass=AsyncAdaptedQueuePoolMedido,
+        **_opciones_pool,
+    )
+    instrumentar_pool("replica_async", async_replica_engine.sync_engine)
+else:
+    replica_engine = engine
+    async_replica_engine = async_engine
+
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+AsyncReplicaSessionLocal = async_sessionmaker(
+    async_replica_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Engines sync subyacentes (sin duplicados), para registrar eventos en todos
+todos_los_engines = list({
+    id(e): e for e in (
+        engine,
+        async_engine.sync_engine,
+        replica_engine,
+        async_replica_engine.sync_engine,
+    )
+}.values())
+
 
 def get_db():
     """
@@ -24,3 +142,36 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency para obtener una sesión async de base de datos.
+    Se cierra automáticamente al terminar la request.
+
+    Las relaciones no se cargan de forma lazy: lo que se serialice debe
+    venir en la consulta (selectinload/joinedload) o ser columna propia.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_replica_db():
+    """
+    Dependency con una sesión de solo lectura sobre la réplica.
+
+    Solo para lecturas que toleran el retraso de replicación (reportes,
+    dashboard, web pública); lo que necesite leer sus propias escrituras
+    debe usar get_db.
+    """
+    db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_replica_db():
+    """Igual que get_replica_db, con una sesión async."""
+    async with AsyncReplicaSessionLocal() as db:
+        yield db
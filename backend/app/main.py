@@ -1,8 +1,20 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
+from app.core.deps import require_metrics_token
+from app.core.paginacion import CABECERA_CURSOR
+from app.core.security import get_bcrypt_metrics
 from app.api.v1.api import api_router
+from app.db.consultas import (
+    CABECERA_CONSULTAS,
+    CABECERA_N1,
+    CABECERA_TIEMPO,
+    ContadorConsultasMiddleware,
+    instrumentar_consultas,
+)
+from app.db.pool import metricas_pools
+from app.db.session import todos_los_engines
 from app.services import file_service
 
 app = FastAPI(
@@ -16,6 +28,12 @@ app = FastAPI(
 # Initialize upload directories
 file_service.init_upload_directories()
 
+# Contador de consultas por request (opt-in, desarrollo/CI)
+if settings.DB_QUERY_STATS:
+    for motor in todos_los_engines:
+        instrumentar_consultas(motor)
+    app.add_middleware(ContadorConsultasMiddleware)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[CABECERA_CURSOR, CABECERA_CONSULTAS, CABECERA_TIEMPO, CABECERA_N1],
 )
 
 # Mount static files for uploads
@@ -46,3 +65,12 @@ async def root():
 async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Telemetría del proceso: pools de conexiones a la base y pool de bcrypt (requiere METRICS_TOKEN)"""
+    return {
+        "db_pools": metricas_pools(),
+        "bcrypt": get_bcrypt_metrics(),
+    }
@@ -10,7 +10,10 @@ from app.models.evento import Evento
 from app.models.pago import Pago
 from app.models.alerta import Alerta
 from app.models.configuracion import Configuracion
-from app.models.comprobante import Comprobante, ComprobanteItem, PagoComprobante, MovimientoCuenta
+from app.models.comprobante import (
+    Comprobante, ComprobanteItem, PagoComprobante, MovimientoCuenta, SaldoCuentaCheckpoint, NumeradorComprobante,
+    FacturacionPension
+)
 
 __all__ = [
     "Base",
@@ -28,4 +31,7 @@ __all__ = [
     "ComprobanteItem",
     "PagoComprobante",
     "MovimientoCuenta",
+    "SaldoCuentaCheckpoint",
+    "NumeradorComprobante",
+    "FacturacionPension",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Integer, Text
+from sqlalchemy import Column, String, Date, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index, Integer, Text, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -57,6 +57,9 @@ class Alerta(Base):
     # Estado
     leida = Column(Boolean, default=False, nullable=False)
 
+    # Generada por una tarea periódica (deduplicada por uq_alertas_dedup)
+    periodica = Column(Boolean, default=False, server_default="false", nullable=False)
+
     # Fechas
     fecha_evento = Column(DateTime, nullable=True)  # Fecha del evento que genera la alerta
     fecha_vencimiento = Column(DateTime, nullable=True)  # Cuándo expira la alerta
@@ -77,6 +80,16 @@ class Alerta(Base):
     usuario = relationship("Usuario", back_populates="alertas")
     tipo_alerta = relationship("TipoAlertaConfig", back_populates="alertas")
 
+    __table_args__ = (
+        # Una sola alerta periódica por usuario y evento de la entidad relacionada
+        Index(
+            "uq_alertas_dedup",
+            "usuario_id", "tipo", "entidad_relacionada_tipo", "entidad_relacionada_id", "fecha_evento",
+            unique=True,
+            postgresql_where=text("periodica"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Alerta {self.tipo} - {self.prioridad} - {self.titulo}>"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Date, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Numeric, Text
+from sqlalchemy import Column, String, Integer, Date, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index, Numeric, Text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -79,9 +79,6 @@ class Caballo(Base):
     # Plan sanitario
     categoria_sanitaria = Column(SQLEnum(CategoriaSanitariaEnum), nullable=True)  # A o B según plan Haras Club 2026
 
-    # ========== QR CODE ==========
-    qr_code = Column(Text, nullable=True)  # QR code en base64 o URL
-
     # ========== ALIMENTACIÓN ==========
     grano_balanceado = Column(String(200), nullable=True)
     suplementos = Column(String(500), nullable=True)
@@ -127,6 +124,11 @@ class Caballo(Base):
     plan_alimentacion = relationship("PlanAlimentacion", back_populates="caballo", uselist=False, cascade="all, delete-orphan")
     inscripciones = relationship("InscripcionEvento", back_populates="caballo", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Paginación por cursor (keyset) del listado
+        Index("ix_caballos_nombre_id", "nombre", "id"),
+    )
+
     def __repr__(self):
         return f"<Caballo {self.nombre} - Chip: {self.numero_chip}>"
 
@@ -160,6 +162,7 @@ class VacunaRegistro(Base):
 
     # Tipo de vacuna/análisis
     tipo = Column(String(100), nullable=False)  # anemia, influenza, encéfalomielitis, etc.
+    codigo = Column(String(30), nullable=True, index=True)  # Código canónico (CODIGOS_VACUNA) derivado de tipo
 
     # Detalles
     fecha = Column(Date, nullable=False)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Date, DateTime, Enum as SQLEnum, ForeignKey, Numeric, Integer, Text, Boolean
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Date, DateTime, Enum as SQLEnum, ForeignKey, Index, Numeric, Integer, Text, Boolean
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 import uuid
@@ -86,6 +86,11 @@ class Comprobante(Base):
     pagos_asociados = relationship("PagoComprobante", back_populates="comprobante", cascade="all, delete-orphan")
     comprobante_relacionado = relationship("Comprobante", remote_side=[id], backref="comprobantes_derivados")
 
+    __table_args__ = (
+        # Paginación por cursor (keyset) del listado
+        Index("ix_comprobantes_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Comprobante {self.numero_completo} - ${self.total}>"
 
@@ -115,6 +120,18 @@ class Comprobante(Base):
             self.estado = EstadoComprobanteEnum.EMITIDO
 
 
+class NumeradorComprobante(Base):
+    """Último número entregado por tipo de comprobante y punto de venta"""
+    __tablename__ = "numeradores_comprobante"
+
+    tipo = Column(SQLEnum(TipoComprobanteEnum), primary_key=True)
+    punto_venta = Column(Integer, primary_key=True)
+    ultimo_numero = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<NumeradorComprobante {self.tipo.value}-{self.punto_venta}: {self.ultimo_numero}>"
+
+
 class ComprobanteItem(Base):
     """Items/líneas de un comprobante"""
     __tablename__ = "comprobante_items"
@@ -206,6 +223,81 @@ class MovimientoCuenta(Base):
     comprobante = relationship("Comprobante")
     pago = relationship("Pago")
 
+    __table_args__ = (
+        # Delta de movimientos posteriores a un checkpoint de saldo
+        Index("ix_movimientos_cuenta_cliente_created_at_id", "cliente_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         signo = "+" if self.tipo == "credito" else "-"
         return f"<MovimientoCuenta {signo}${self.monto} - {self.descripcion}>"
+
+
+class SaldoCuentaCheckpoint(Base):
+    """
+    Checkpoint del saldo de la cuenta corriente de un cliente
+
+    Se deriva de movimientos_cuenta: acumula los movimientos hasta
+    (hasta, hasta_movimiento_id) inclusive, en orden (created_at, id).
+    """
+    __tablename__ = "saldos_cuenta_checkpoint"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    cliente_id = Column(UUID(as_uuid=True), ForeignKey("clientes.id", ondelete="CASCADE"), nullable=False)
+
+    # Último movimiento incluido
+    hasta = Column(DateTime, nullable=False)
+    hasta_movimiento_id = Column(UUID(as_uuid=True), nullable=False)
+
+    # Acumulados hasta el último movimiento incluido
+    saldo = Column(Numeric(12, 2), nullable=False)
+    total_debitos = Column(Numeric(12, 2), nullable=False)
+    total_creditos = Column(Numeric(12, 2), nullable=False)
+    cantidad_movimientos = Column(Integer, nullable=False)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Último checkpoint de cada cliente
+        Index("ix_saldos_cuenta_checkpoint_cliente_hasta", "cliente_id", "hasta"),
+    )
+
+    def __repr__(self):
+        return f"<SaldoCuentaCheckpoint {self.cliente_id} ${self.saldo} @ {self.hasta}>"
+
+
+class FacturacionPension(Base):
+    """
+    Corrida de facturación mensual de pensiones (una por período)
+
+    Funciona como checkpoint: cada lote de clientes se commitea junto con
+    ultimo_cliente_id, así una corrida interrumpida se retoma donde quedó.
+    """
+    __tablename__ = "facturaciones_pension"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    periodo = Column(Date, nullable=False, unique=True)  # Primer día del mes facturado
+
+    # Parámetros de la corrida (se conservan para retomarla igual)
+    tarifa_mensual = Column(Numeric(12, 2), nullable=False)
+    tarifas_por_manejo = Column(JSONB, nullable=True)  # {"box": 90000, "piquete": 60000, ...}
+    iva_porcentaje = Column(Numeric(5, 2), default=0, nullable=False)
+    dias_vencimiento = Column(Integer, default=10, nullable=False)
+
+    # Estado y avance
+    estado = Column(String(20), default="pendiente", nullable=False)  # pendiente, en_curso, completada, error
+    ultimo_cliente_id = Column(UUID(as_uuid=True), nullable=True)
+    comprobantes_generados = Column(Integer, default=0, nullable=False)
+    total_facturado = Column(Numeric(14, 2), default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    tarea_id = Column(String(50), nullable=True)  # Tarea Celery de la última ejecución
+
+    # Auditoría
+    created_by = Column(UUID(as_uuid=True), ForeignKey("usuarios.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    finalizada_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<FacturacionPension {self.periodo:%m/%Y} - {self.estado}>"
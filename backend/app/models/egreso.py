@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, DateTime, Enum as SQLEnum, ForeignKey, Numeric
+from sqlalchemy import Column, String, Date, DateTime, Enum as SQLEnum, ForeignKey, Index, Numeric
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -48,5 +48,10 @@ class Egreso(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Paginación por cursor (keyset) del listado
+        Index("ix_egresos_fecha_egreso_id", "fecha_egreso", "id"),
+    )
+
     def __repr__(self):
         return f"<Egreso {self.concepto} - ${self.monto}>"
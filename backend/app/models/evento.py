@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Numeric
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Index, Numeric
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -75,6 +75,11 @@ class Evento(Base):
     instructor = relationship("Empleado", back_populates="eventos_como_instructor", foreign_keys=[instructor_id])
     inscripciones = relationship("InscripcionEvento", back_populates="evento", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Paginación por cursor (keyset) del listado
+        Index("ix_eventos_fecha_inicio_id", "fecha_inicio", "id"),
+    )
+
     def __repr__(self):
         return f"<Evento {self.titulo} - {self.tipo}>"
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, DateTime, Enum as SQLEnum, ForeignKey, Numeric, Integer
+from sqlalchemy import Column, String, Date, DateTime, Enum as SQLEnum, ForeignKey, Index, Numeric, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -79,6 +79,11 @@ class Pago(Base):
     cliente = relationship("Cliente", back_populates="pagos")
     comprobantes_asociados = relationship("PagoComprobante", back_populates="pago", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Paginación por cursor (keyset) del listado
+        Index("ix_pagos_created_at_id", "created_at", "id"),
+    )
+
     def __repr__(self):
         return f"<Pago {self.concepto} - ${self.monto}>"
 
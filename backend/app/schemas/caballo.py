@@ -113,7 +113,6 @@ class CaballoSchema(CaballoBase):
     pedigree: Optional[str] = None
     propietario_id: Optional[UUID4] = None
     estado: EstadoCaballoEnum
-    qr_code: Optional[str] = None
 
     # Alimentación
     grano_balanceado: Optional[str] = None
@@ -214,6 +213,7 @@ class VacunaRegistroSchema(VacunaRegistroBase):
     """Schema de respuesta de Vacuna"""
     id: UUID4
     caballo_id: UUID4
+    codigo: Optional[str] = None  # Código canónico para el plan sanitario
     created_at: datetime
     updated_at: datetime
 
@@ -431,3 +431,52 @@ class EstadisticasPlanSanitario(BaseModel):
     porcentaje_cumplimiento: float
     proximas_actividades: List[ActividadPendiente]
     actividades_vencidas: List[ActividadPendiente]
+
+
+# ========== MATRIZ DE CUMPLIMIENTO (TODO EL PLANTEL) ==========
+
+class ActividadMatrizSanitaria(BaseModel):
+    """Columna de la matriz: actividad programada del plan"""
+    mes: int
+    mes_nombre: str
+    tipo: str
+    nombre: str
+
+
+class CeldaMatrizSanitaria(BaseModel):
+    """Cumplimiento de una actividad por un caballo"""
+    estado: str  # realizada, vencida, pendiente
+    fecha_realizada: Optional[date] = None
+
+
+class FilaMatrizSanitaria(BaseModel):
+    """Fila de la matriz: un caballo y sus celdas, alineadas con las actividades"""
+    caballo_id: UUID4
+    nombre: str
+    actividades_realizadas: int
+    actividades_vencidas: int
+    porcentaje_cumplimiento: float
+    celdas: List[CeldaMatrizSanitaria]
+
+
+class MatrizCategoriaSanitaria(BaseModel):
+    """Matriz caballo × actividad de una categoría sanitaria"""
+    categoria: CategoriaSanitariaEnum
+    nombre_categoria: str
+    actividades: List[ActividadMatrizSanitaria]
+    caballos: List[FilaMatrizSanitaria]
+
+
+class CaballoSinCategoria(BaseModel):
+    """Caballo sin categoría sanitaria asignada"""
+    caballo_id: UUID4
+    nombre: str
+
+
+class MatrizPlanSanitarioResponse(BaseModel):
+    """Cumplimiento del plan sanitario de todo el plantel"""
+    anio: int
+    total_caballos: int
+    porcentaje_cumplimiento: float
+    categorias: List[MatrizCategoriaSanitaria]
+    sin_categoria: List[CaballoSinCategoria]
@@ -1,10 +1,13 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Dict, Optional, List
 from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 
+from app.models.caballo import ManejoEnum
+from app.schemas.pago import PagoSchema
+
 
 class TipoComprobanteEnum(str, Enum):
     FACTURA = "factura"
@@ -199,12 +202,30 @@ class EstadoCuentaResponse(BaseModel):
     saldo_actual: Decimal
     total_facturado: Decimal
     total_pagado: Decimal
+    total_debitos: Decimal  # Total de débitos de la cuenta corriente (incluye ajustes)
+    total_creditos: Decimal  # Total de créditos de la cuenta corriente (incluye anulaciones y notas de crédito)
     comprobantes_pendientes: int
     movimientos: List[MovimientoCuentaSchema]
 
 
 # ============ REPORTES ============
 
+class PeriodoVentas(BaseModel):
+    """Ventas agregadas de un período (día, semana o mes)"""
+    periodo: date  # Primer día del período
+    cantidad: int
+    total: Decimal
+    cobrado: Decimal
+    pendiente: Decimal
+
+
+class PeriodoCobranzas(BaseModel):
+    """Cobranzas agregadas de un período (día, semana o mes)"""
+    periodo: date  # Primer día del período
+    cantidad: int
+    total: Decimal
+
+
 class ReporteVentasResponse(BaseModel):
     """Reporte de ventas/facturación"""
     fecha_inicio: date
@@ -215,6 +236,9 @@ class ReporteVentasResponse(BaseModel):
     cantidad_comprobantes: int
     por_tipo: dict  # {"factura": {"cantidad": 10, "total": 1000}, ...}
     por_estado: dict
+    agrupado_por: Optional[str] = None  # "dia", "semana" o "mes"
+    por_periodo: Optional[List[PeriodoVentas]] = None
+    detalle: Optional[List[ComprobanteListSchema]] = None  # Página de comprobantes, si se pidió
 
 
 class ReporteCobranzasResponse(BaseModel):
@@ -225,6 +249,9 @@ class ReporteCobranzasResponse(BaseModel):
     cantidad_pagos: int
     por_metodo: dict  # {"efectivo": 1000, "transferencia": 500, ...}
     por_tipo: dict
+    agrupado_por: Optional[str] = None  # "dia", "semana" o "mes"
+    por_periodo: Optional[List[PeriodoCobranzas]] = None
+    detalle: Optional[List[PagoSchema]] = None  # Página de pagos, si se pidió
 
 
 class ReporteDeudoresResponse(BaseModel):
@@ -232,4 +259,51 @@ class ReporteDeudoresResponse(BaseModel):
     fecha_corte: date
     total_deuda: Decimal
     cantidad_deudores: int
-    deudores: List[dict]  # [{"cliente_id": ..., "nombre": ..., "deuda": ..., "antiguedad_dias": ...}]
+    por_antiguedad: Optional[dict] = None  # {"0-30": {"cantidad": ..., "deuda": ...}, "31-60": ..., "61-90": ..., "90+": ...}
+    deudores: List[dict]  # [{"cliente_id": ..., "nombre": ..., "deuda": ..., "antiguedad_dias": ..., "tramo": ...}]
+
+
+# ============ FACTURACIÓN DE PENSIONES ============
+
+class FacturacionPensionesRequest(BaseModel):
+    """Parámetros de la facturación mensual de pensiones"""
+    anio: int = Field(..., ge=2000, le=2100)
+    mes: int = Field(..., ge=1, le=12)
+    tarifa_mensual: Decimal = Field(..., gt=0)  # Tarifa por caballo
+    tarifas_por_manejo: Optional[Dict[ManejoEnum, Decimal]] = None  # Reemplaza la tarifa según el tipo de manejo
+    iva_porcentaje: Decimal = Field(default=0, ge=0, le=100)
+    dias_vencimiento: int = Field(default=10, ge=0, le=90)
+
+
+class FacturacionPensionesSimulacion(BaseModel):
+    """Resultado de simular la facturación de un período (no escribe nada)"""
+    periodo: date
+    clientes: int
+    caballos: int
+    por_manejo: dict  # {"box": {"caballos": ..., "tarifa": ..., "subtotal": ...}, ...}
+    subtotal: Decimal
+    iva_monto: Decimal
+    total: Decimal
+    ya_facturado: bool
+
+
+class FacturacionPensionSchema(BaseModel):
+    """Estado de una corrida de facturación de pensiones"""
+    id: UUID
+    periodo: date
+    tarifa_mensual: Decimal
+    tarifas_por_manejo: Optional[dict] = None
+    iva_porcentaje: Decimal
+    dias_vencimiento: int
+    estado: str
+    ultimo_cliente_id: Optional[UUID] = None
+    comprobantes_generados: int
+    total_facturado: Decimal
+    error: Optional[str] = None
+    tarea_id: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finalizada_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+from datetime import date
+from enum import Enum
+
+from app.models.egreso import TipoEgresoEnum
+from app.models.pago import EstadoPagoEnum
+
+
+class ReporteExportableEnum(str, Enum):
+    VENTAS = "ventas"
+    COBRANZAS = "cobranzas"
+    DEUDORES = "deudores"
+    PAGOS = "pagos"
+    EGRESOS = "egresos"
+
+
+class FormatoExportacionEnum(str, Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+
+class ExportacionFiltros(BaseModel):
+    """Filtros de una exportación; cada reporte usa los que le corresponden"""
+    fecha_inicio: Optional[date] = None  # ventas, cobranzas, egresos
+    fecha_fin: Optional[date] = None  # ventas, cobranzas, egresos
+    fecha_corte: Optional[date] = None  # deudores
+    cliente_id: Optional[UUID] = None  # pagos
+    estado_pago: Optional[EstadoPagoEnum] = None  # pagos
+    tipo_egreso: Optional[TipoEgresoEnum] = None  # egresos
+
+
+class ExportacionRequest(ExportacionFiltros):
+    """Pedido de exportación en segundo plano"""
+    reporte: ReporteExportableEnum
+    formato: FormatoExportacionEnum = FormatoExportacionEnum.XLSX
+
+
+class ExportacionEstado(BaseModel):
+    """Estado de una exportación en segundo plano"""
+    tarea_id: str
+    estado: str  # PENDING, STARTED, SUCCESS, FAILURE
+    filas: Optional[int] = None
+    url_descarga: Optional[str] = None
+    error: Optional[str] = None
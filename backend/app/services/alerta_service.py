@@ -1,24 +1,27 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from uuid import UUID
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from app.models.alerta import Alerta
 from app.models.usuario import Usuario, RolEnum
 from app.schemas.alerta import AlertaCreate, AlertaUpdate
 
 
-def obtener_por_usuario(
-    db: Session,
+async def obtener_por_usuario(
+    db: AsyncSession,
     usuario_id: UUID,
     solo_no_leidas: bool = False
 ) -> List[Alerta]:
     """Obtiene alertas de un usuario."""
-    query = db.query(Alerta).filter(Alerta.usuario_id == usuario_id)
+    stmt = select(Alerta).where(Alerta.usuario_id == usuario_id)
 
     if solo_no_leidas:
-        query = query.filter(Alerta.leida == False)
+        stmt = stmt.where(Alerta.leida == False)
 
-    return query.order_by(Alerta.created_at.desc()).all()
+    return (await db.scalars(stmt.order_by(Alerta.created_at.desc()))).all()
 
 
 def obtener_por_id(db: Session, alerta_id: UUID) -> Optional[Alerta]:
@@ -35,27 +38,143 @@ def crear(db: Session, alerta_data: AlertaCreate) -> Alerta:
     return db_alerta
 
 
-def crear_para_admins(db: Session, alerta_data: AlertaCreate) -> List[Alerta]:
-    """Crea una alerta para todos los administradores."""
-    # Obtener todos los admins
-    admins = db.query(Usuario).filter(
+def obtener_ids_admins(db: Session) -> List[UUID]:
+    """Obtiene los IDs de los administradores activos."""
+    filas = db.query(Usuario.id).filter(
         Usuario.rol.in_([RolEnum.ADMIN, RolEnum.SUPER_ADMIN]),
         Usuario.activo == True
     ).all()
+    return [fila.id for fila in filas]
 
-    alertas = []
-    for admin in admins:
-        db_alerta = Alerta(
+
+def crear_para_admins(db: Session, alerta_data: AlertaCreate) -> List[Alerta]:
+    """Crea una alerta para todos los administradores."""
+    alertas = [
+        Alerta(
             **alerta_data.model_dump(exclude={'usuario_id'}),
-            usuario_id=admin.id
+            usuario_id=admin_id
         )
-        db.add(db_alerta)
-        alertas.append(db_alerta)
+        for admin_id in obtener_ids_admins(db)
+    ]
+    db.add_all(alertas)
 
     db.commit()
     return alertas
 
 
+# ========== ALERTAS PERIÓDICAS (IDEMPOTENTES) ==========
+
+_CLAVE_DEDUP = [
+    Alerta.usuario_id,
+    Alerta.tipo,
+    Alerta.entidad_relacionada_tipo,
+    Alerta.entidad_relacionada_id,
+    Alerta.fecha_evento,
+]
+
+
+def _upsert_periodicas(db: Session, filas: List[Dict[str, Any]]) -> int:
+    """
+    Inserta alertas periódicas o actualiza la existente con la misma clave de
+    deduplicación. Las filas sin cambios en prioridad, título o mensaje no se
+    escriben; si cambia la prioridad la alerta vuelve a quedar como no leída.
+    Por eso título y mensaje no deben incluir datos que cambian a diario
+    (p. ej. días transcurridos): se derivan de fecha_evento al leer.
+    Si el lote trae varias filas con la misma clave, queda la última.
+
+    Returns:
+        int: Cantidad de filas insertadas o modificadas
+    """
+    if not filas:
+        return 0
+
+    # Un mismo INSERT ... ON CONFLICT no puede tocar dos veces la misma fila
+    unicas = {
+        tuple(fila.get(columna.key) for columna in _CLAVE_DEDUP): fila
+        for fila in filas
+    }
+
+    stmt = insert(Alerta)
+    nueva = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_CLAVE_DEDUP,
+        index_where=Alerta.periodica == True,
+        set_={
+            "prioridad": nueva.prioridad,
+            "titulo": nueva.titulo,
+            "mensaje": nueva.mensaje,
+            "leida": Alerta.leida & (Alerta.prioridad == nueva.prioridad),
+            "updated_at": nueva.updated_at,
+        },
+        where=or_(
+            Alerta.prioridad != nueva.prioridad,
+            Alerta.titulo != nueva.titulo,
+            Alerta.mensaje != nueva.mensaje,
+        )
+    ).returning(Alerta.id)
+
+    return len(db.execute(stmt, [{**fila, "periodica": True} for fila in unicas.values()]).all())
+
+
+def upsert_lote(db: Session, alertas_data: List[AlertaCreate], commit: bool = True) -> int:
+    """
+    Crea o actualiza alertas periódicas dirigidas a `usuario_id` de cada una.
+
+    Args:
+        db: Sesión de base de datos
+        alertas_data: Alertas a registrar
+        commit: Si es False, el llamador controla la transacción
+
+    Returns:
+        int: Cantidad de filas insertadas o modificadas
+    """
+    escritas = _upsert_periodicas(db, [alerta_data.model_dump() for alerta_data in alertas_data])
+    if commit:
+        db.commit()
+    return escritas
+
+
+def crear_para_admins_lote(
+    db: Session,
+    alertas_data: List[AlertaCreate],
+    admin_ids: Optional[List[UUID]] = None,
+    commit: bool = True
+) -> int:
+    """
+    Crea o actualiza N alertas periódicas para todos los administradores.
+
+    Pensado para las tareas periódicas que generan muchas alertas a la vez: los
+    destinatarios se resuelven una sola vez, no se construyen objetos ORM y las
+    alertas ya existentes (misma clave de deduplicación) no se duplican, por lo
+    que correr la tarea de nuevo solo escribe lo que cambió.
+
+    Args:
+        db: Sesión de base de datos
+        alertas_data: Alertas a replicar para cada administrador
+        admin_ids: Destinatarios ya resueltos (si es None se consultan)
+        commit: Si es False, el llamador controla la transacción
+
+    Returns:
+        int: Cantidad de filas insertadas o modificadas
+    """
+    if not alertas_data:
+        return 0
+
+    if admin_ids is None:
+        admin_ids = obtener_ids_admins(db)
+
+    filas = [
+        {**alerta_data.model_dump(exclude={'usuario_id'}), "usuario_id": admin_id}
+        for alerta_data in alertas_data
+        for admin_id in admin_ids
+    ]
+    escritas = _upsert_periodicas(db, filas)
+
+    if commit:
+        db.commit()
+    return escritas
+
+
 def marcar_como_leida(db: Session, alerta_id: UUID) -> Optional[Alerta]:
     """Marca una alerta como leída."""
     db_alerta = obtener_por_id(db, alerta_id)
@@ -85,9 +204,11 @@ def eliminar(db: Session, alerta_id: UUID) -> Optional[Alerta]:
     return db_alerta
 
 
-def contar_no_leidas(db: Session, usuario_id: UUID) -> int:
+async def contar_no_leidas(db: AsyncSession, usuario_id: UUID) -> int:
     """Cuenta las alertas no leídas de un usuario."""
-    return db.query(Alerta).filter(
-        Alerta.usuario_id == usuario_id,
-        Alerta.leida == False
-    ).count()
+    return await db.scalar(
+        select(func.count(Alerta.id)).where(
+            Alerta.usuario_id == usuario_id,
+            Alerta.leida == False
+        )
+    )
@@ -6,10 +6,15 @@ from uuid import UUID
 
 from app.models.usuario import Usuario, RolEnum
 from app.schemas.usuario import UsuarioCreate, LoginRequest
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.core.security import (
+    verify_password_async,
+    get_password_hash_async,
+    create_access_token,
+    create_refresh_token
+)
 
 
-def crear_usuario(db: Session, usuario_data: UsuarioCreate) -> Usuario:
+async def crear_usuario(db: Session, usuario_data: UsuarioCreate) -> Usuario:
     """
     Crea un nuevo usuario.
 
@@ -31,9 +36,11 @@ def crear_usuario(db: Session, usuario_data: UsuarioCreate) -> Usuario:
             detail="El email ya está registrado"
         )
 
+    # Hashear fuera del try: un 503 del pool de bcrypt no es error de integridad
+    password_hash = await get_password_hash_async(usuario_data.password)
+
     try:
         # Crear usuario
-        password_hash = get_password_hash(usuario_data.password)
         db_usuario = Usuario(
             email=usuario_data.email,
             password_hash=password_hash,
@@ -52,7 +59,7 @@ def crear_usuario(db: Session, usuario_data: UsuarioCreate) -> Usuario:
         )
 
 
-def autenticar_usuario(db: Session, login_data: LoginRequest) -> Usuario:
+async def autenticar_usuario(db: Session, login_data: LoginRequest) -> Usuario:
     """
     Autentica un usuario con email/DNI y password.
 
@@ -94,7 +101,7 @@ def autenticar_usuario(db: Session, login_data: LoginRequest) -> Usuario:
             detail="Usuario o contraseña incorrectos"
         )
 
-    if not verify_password(login_data.password, usuario.password_hash):
+    if not await verify_password_async(login_data.password, usuario.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos"
@@ -142,7 +149,7 @@ def generar_tokens(usuario: Usuario) -> dict:
     }
 
 
-def cambiar_password(db: Session, usuario: Usuario, old_password: str, new_password: str) -> Usuario:
+async def cambiar_password(db: Session, usuario: Usuario, old_password: str, new_password: str) -> Usuario:
     """
     Cambia la contraseña de un usuario.
 
@@ -158,13 +165,13 @@ def cambiar_password(db: Session, usuario: Usuario, old_password: str, new_passw
     Raises:
         HTTPException: Si la contraseña anterior es incorrecta
     """
-    if not verify_password(old_password, usuario.password_hash):
+    if not await verify_password_async(old_password, usuario.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Contraseña actual incorrecta"
         )
 
-    usuario.password_hash = get_password_hash(new_password)
+    usuario.password_hash = await get_password_hash_async(new_password)
     db.commit()
     db.refresh(usuario)
 
@@ -1,14 +1,20 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, noload, selectinload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from uuid import UUID
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import date, timedelta, datetime
 import qrcode
+from qrcode.image.svg import SvgPathImage
 from io import BytesIO
-import base64
+from functools import lru_cache
 import copy
+import unicodedata
 
+from app.core.config import settings
+from app.core.paginacion import paginar_por_cursor_async
 from app.models.caballo import (
     Caballo,
     FotoCaballo,
@@ -35,25 +41,19 @@ from app.schemas.caballo import (
     AntiparasitarioRegistroCreate,
     AntiparasitarioRegistroUpdate
 )
+from app.services import dashboard_service
 
 
 # ========== UTILIDADES ==========
 
-def generar_qr_caballo(caballo_id: UUID) -> str:
-    """
-    Genera un código QR único para el caballo.
-    Retorna el QR en formato base64 data URL para almacenar directamente.
-
-    Args:
-        caballo_id: UUID del caballo
+def url_ficha_caballo(caballo_id: UUID) -> str:
+    """URL de la ficha del caballo que codifica su QR."""
+    return settings.QR_URL_TEMPLATE.format(caballo_id=caballo_id)
 
-    Returns:
-        str: Data URL del QR en formato base64 (data:image/png;base64,...)
-    """
-    # URL que apuntará a la ficha del caballo
-    url = f"https://clubecuestre.com/caballos/{caballo_id}/ficha"
 
-    # Crear QR code
+@lru_cache(maxsize=256)
+def _renderizar_qr(url: str, formato: str) -> bytes:
+    """Renderiza el QR de `url`; cacheado por URL (id + plantilla) y formato."""
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -63,16 +63,30 @@ def generar_qr_caballo(caballo_id: UUID) -> str:
     qr.add_data(url)
     qr.make(fit=True)
 
-    # Generar imagen
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    # Convertir a base64
     buffer = BytesIO()
-    img.save(buffer, format='PNG')
-    img_base64 = base64.b64encode(buffer.getvalue()).decode()
+    if formato == "svg":
+        qr.make_image(image_factory=SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
 
-    # Retornar como data URL
-    return f"data:image/png;base64,{img_base64}"
+def generar_qr_caballo(caballo_id: UUID, formato: str = "png") -> bytes:
+    """
+    Genera el código QR de la ficha del caballo bajo demanda.
+
+    El QR depende solo del ID y de settings.QR_URL_TEMPLATE, así que no se
+    guarda en la base: se renderiza al pedirlo y queda en una cache LRU en
+    memoria del proceso.
+
+    Args:
+        caballo_id: UUID del caballo
+        formato: "png" o "svg"
+
+    Returns:
+        bytes: Imagen del QR en el formato pedido
+    """
+    return _renderizar_qr(url_ficha_caballo(caballo_id), formato)
 
 
 def calcular_proxima_fecha(fecha_aplicacion: date, frecuencia_dias: int) -> date:
@@ -91,23 +105,48 @@ def calcular_proxima_fecha(fecha_aplicacion: date, frecuencia_dias: int) -> date
 
 # ========== CABALLO CRUD ==========
 
-def obtener_todos(
-    db: Session,
+def _consulta_filtrada(activo_solo: bool, propietario_id: Optional[UUID]) -> Select:
+    """Consulta de caballos con los filtros del listado."""
+    stmt = select(Caballo)
+
+    if activo_solo:
+        stmt = stmt.where(Caballo.estado == EstadoCaballoEnum.ACTIVO)
+
+    if propietario_id:
+        stmt = stmt.where(Caballo.propietario_id == propietario_id)
+
+    return stmt
+
+
+async def obtener_todos(
+    db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
     activo_solo: bool = False,
     propietario_id: Optional[UUID] = None
 ) -> List[Caballo]:
     """Obtiene lista de caballos con paginación."""
-    query = db.query(Caballo)
+    stmt = _consulta_filtrada(activo_solo, propietario_id).offset(skip).limit(limit)
+    return (await db.scalars(stmt)).all()
 
-    if activo_solo:
-        query = query.filter(Caballo.estado == EstadoCaballoEnum.ACTIVO)
 
-    if propietario_id:
-        query = query.filter(Caballo.propietario_id == propietario_id)
+async def obtener_pagina(
+    db: AsyncSession,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    activo_solo: bool = False,
+    propietario_id: Optional[UUID] = None
+) -> Tuple[List[Caballo], Optional[str]]:
+    """Obtiene una página de caballos por cursor, ordenada por nombre."""
+    return await paginar_por_cursor_async(
+        db, _consulta_filtrada(activo_solo, propietario_id),
+        Caballo.nombre, Caballo.id, cursor, limit, descendente=False
+    )
+
 
-    return query.offset(skip).limit(limit).all()
+async def obtener_detalle(db: AsyncSession, caballo_id: UUID) -> Optional[Caballo]:
+    """Obtiene un caballo por ID para la vista de detalle (lectura async)."""
+    return await db.get(Caballo, caballo_id)
 
 
 def obtener_por_id(db: Session, caballo_id: UUID) -> Optional[Caballo]:
@@ -115,9 +154,57 @@ def obtener_por_id(db: Session, caballo_id: UUID) -> Optional[Caballo]:
     return db.query(Caballo).filter(Caballo.id == caballo_id).first()
 
 
+# Colecciones que puede incluir la vista completa del caballo
+SECCIONES_COMPLETO = {
+    "fotos": Caballo.fotos,
+    "vacunas": Caballo.vacunas,
+    "herrajes": Caballo.herrajes,
+    "antiparasitarios": Caballo.antiparasitarios,
+}
+
+
+def obtener_completo(
+    db: Session,
+    caballo_id: UUID,
+    incluir: Optional[Iterable[str]] = None
+) -> Optional[Caballo]:
+    """
+    Obtiene un caballo con sus colecciones cargadas en un número fijo de consultas.
+
+    Cada sección pedida se carga con selectinload (una consulta por sección,
+    independientemente de la cantidad de registros); las no pedidas quedan
+    vacías sin consultar la base.
+
+    Args:
+        db: Sesión de base de datos
+        caballo_id: ID del caballo
+        incluir: Secciones de SECCIONES_COMPLETO a cargar (None = todas)
+
+    Returns:
+        Caballo o None si no existe
+
+    Raises:
+        HTTPException: Si se pide una sección desconocida
+    """
+    secciones = set(SECCIONES_COMPLETO) if incluir is None else set(incluir)
+    desconocidas = secciones - set(SECCIONES_COMPLETO)
+    if desconocidas:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Secciones desconocidas: {', '.join(sorted(desconocidas))}. "
+                   f"Opciones: {', '.join(SECCIONES_COMPLETO)}"
+        )
+
+    opciones = [
+        selectinload(relacion) if nombre in secciones else noload(relacion)
+        for nombre, relacion in SECCIONES_COMPLETO.items()
+    ]
+    return db.query(Caballo).options(*opciones).filter(Caballo.id == caballo_id).first()
+
+
 def crear(db: Session, caballo_data: CaballoCreate) -> Caballo:
     """
-    Crea un nuevo caballo con generación automática de QR.
+    Crea un nuevo caballo.
 
     Args:
         db: Sesión de base de datos
@@ -152,7 +239,7 @@ def crear(db: Session, caballo_data: CaballoCreate) -> Caballo:
                 detail=f"Ya existe un caballo con el ID de fomento {caballo_data.id_fomento}"
             )
 
-    # Crear caballo (sin QR aún) - exclude_unset para no enviar campos opcionales no proporcionados
+    # Crear caballo - exclude_unset para no enviar campos opcionales no proporcionados
     db_caballo = Caballo(**caballo_data.model_dump(exclude_unset=True))
     # Asegurar que el estado sea ACTIVO por defecto
     if not hasattr(db_caballo, 'estado') or db_caballo.estado is None:
@@ -160,12 +247,8 @@ def crear(db: Session, caballo_data: CaballoCreate) -> Caballo:
 
     try:
         db.add(db_caballo)
-        db.flush()  # Flush para obtener el ID sin hacer commit
-
-        # Generar QR code con el ID del caballo
-        db_caballo.qr_code = generar_qr_caballo(db_caballo.id)
-
         db.commit()
+        dashboard_service.invalidar_cache("caballos")
         db.refresh(db_caballo)
 
         return db_caballo
@@ -235,6 +318,7 @@ def actualizar(
         setattr(db_caballo, field, value)
 
     db.commit()
+    dashboard_service.invalidar_cache("caballos")
     db.refresh(db_caballo)
     return db_caballo
 
@@ -248,6 +332,7 @@ def eliminar(db: Session, caballo_id: UUID) -> Optional[Caballo]:
     # Soft delete
     db_caballo.estado = EstadoCaballoEnum.RETIRADO
     db.commit()
+    dashboard_service.invalidar_cache("caballos")
     db.refresh(db_caballo)
     return db_caballo
 
@@ -391,6 +476,8 @@ def registrar_vacuna(db: Session, vacuna_data: VacunaRegistroCreate) -> VacunaRe
             vacuna_data.frecuencia_dias
         )
 
+    data_dict['codigo'] = codigo_vacuna(vacuna_data.tipo)
+
     vacuna = VacunaRegistro(**data_dict)
     db.add(vacuna)
     db.commit()
@@ -422,6 +509,9 @@ def actualizar_vacuna(
         nueva_frecuencia = update_data.get('frecuencia_dias', vacuna.frecuencia_dias)
         update_data['proxima_fecha'] = calcular_proxima_fecha(nueva_fecha, nueva_frecuencia)
 
+    if 'tipo' in update_data:
+        update_data['codigo'] = codigo_vacuna(update_data['tipo'])
+
     for field, value in update_data.items():
         setattr(vacuna, field, value)
 
@@ -735,6 +825,51 @@ def eliminar_estudio_medico(db: Session, estudio_id: UUID) -> None:
 
 # ========== PLAN SANITARIO ==========
 
+def _normalizar(texto: str) -> str:
+    """Minúsculas y sin acentos."""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=1024)
+def codigo_vacuna(tipo: Optional[str]) -> Optional[str]:
+    """
+    Código canónico (CODIGOS_VACUNA) del nombre de una vacuna o análisis.
+
+    Se guarda en VacunaRegistro.codigo al registrar la vacuna, así el cruce con
+    el plan sanitario es una búsqueda por (mes, código).
+    """
+    from app.constants import CODIGOS_VACUNA
+
+    normalizado = _normalizar(tipo or "")
+    for codigo, palabras in CODIGOS_VACUNA.items():
+        if any(palabra in normalizado for palabra in palabras):
+            return codigo
+    return None
+
+
+@lru_cache(maxsize=None)
+def _plan_compilado(categoria: str) -> Tuple[Tuple[dict, ...], Dict[Tuple[int, str], int]]:
+    """
+    Precompila el calendario de una categoría: la lista ordenada de actividades
+    y un índice (mes, código) -> posición de la actividad.
+    """
+    from app.constants import PLAN_SANITARIO_2026
+
+    actividades = []
+    indice = {}
+    for mes_data in PLAN_SANITARIO_2026[categoria]["calendario"]:
+        for actividad in mes_data["actividades"]:
+            indice[(mes_data["mes"], actividad["codigo"])] = len(actividades)
+            actividades.append({"mes": mes_data["mes"], "mes_nombre": mes_data["mes_nombre"], **actividad})
+    return tuple(actividades), indice
+
+
+def _codigo_registro(vacuna) -> Optional[str]:
+    """Código de un registro de vacuna (calculado si es anterior a la columna `codigo`)."""
+    return vacuna.codigo or codigo_vacuna(vacuna.tipo)
+
+
 def obtener_plan_sanitario(db: Session, caballo_id: UUID, anio: Optional[int] = None):
     """
     Obtiene el plan sanitario del caballo según su categoría.
@@ -782,81 +917,42 @@ def obtener_plan_sanitario(db: Session, caballo_id: UUID, anio: Optional[int] =
         VacunaRegistro.caballo_id == caballo_id,
         VacunaRegistro.fecha >= inicio_anio,
         VacunaRegistro.fecha <= fin_anio
-    ).all()
+    ).order_by(VacunaRegistro.fecha).all()
 
     # Antiparasitarios (desparasitación)
     antiparasitarios = db.query(AntiparasitarioRegistro).filter(
         AntiparasitarioRegistro.caballo_id == caballo_id,
         AntiparasitarioRegistro.fecha >= inicio_anio,
         AntiparasitarioRegistro.fecha <= fin_anio
-    ).all()
-
-    # Construir calendario con estado de cumplimiento
-    calendario_response = []
-
-    for mes_data in plan["calendario"]:
-        actividades_response = []
+    ).order_by(AntiparasitarioRegistro.fecha).all()
 
-        for actividad in mes_data["actividades"]:
-            # Buscar si la actividad fue realizada este año en este mes
-            realizada = False
-            fecha_realizada = None
-            proxima_fecha = None
-
-            mes_inicio = date(anio, mes_data["mes"], 1)
-            # Último día del mes
-            if mes_data["mes"] == 12:
-                mes_fin = date(anio, 12, 31)
-            else:
-                mes_fin = date(anio, mes_data["mes"] + 1, 1) - timedelta(days=1)
-
-            # Verificar según el tipo de actividad
-            if actividad["tipo"] in ["vacuna", "analisis"]:
-                # Buscar en vacunas
-                for vacuna in vacunas:
-                    if vacuna.fecha >= mes_inicio and vacuna.fecha <= mes_fin:
-                        # Coincide si el nombre de la actividad está en el tipo de vacuna (case-insensitive)
-                        nombre_act = actividad["nombre"].lower()
-                        tipo_vac = vacuna.tipo.lower()
-
-                        # Mapeo simplificado
-                        if ("aie" in nombre_act and "aie" in tipo_vac) or \
-                           ("influenza" in nombre_act and "influenza" in tipo_vac) or \
-                           ("rabia" in nombre_act or "rabica" in nombre_act) and ("rabia" in tipo_vac or "rabica" in tipo_vac) or \
-                           ("adenitis" in nombre_act and "adenitis" in tipo_vac) or \
-                           ("quintuple" in nombre_act or "quíntuple" in nombre_act) and ("quintuple" in tipo_vac or "quíntuple" in tipo_vac):
-                            realizada = True
-                            fecha_realizada = vacuna.fecha
-                            proxima_fecha = vacuna.proxima_fecha
-                            break
-
-            elif actividad["tipo"] == "desparasitacion":
-                # Buscar en antiparasitarios
-                for antipar in antiparasitarios:
-                    if antipar.fecha >= mes_inicio and antipar.fecha <= mes_fin:
-                        realizada = True
-                        fecha_realizada = antipar.fecha
-                        proxima_fecha = antipar.proxima_aplicacion
-                        break
-
-            actividades_response.append(
-                ActividadPlanSanitario(
-                    tipo=actividad["tipo"],
-                    nombre=actividad["nombre"],
-                    descripcion=actividad["descripcion"],
-                    realizada=realizada,
-                    fecha_realizada=fecha_realizada,
-                    proxima_fecha=proxima_fecha
-                )
-            )
+    # (mes, código) -> primer registro de ese mes
+    registros = {}
+    for vacuna in vacunas:
+        registros.setdefault((vacuna.fecha.month, _codigo_registro(vacuna)), (vacuna.fecha, vacuna.proxima_fecha))
+    for antipar in antiparasitarios:
+        registros.setdefault((antipar.fecha.month, "desparasitacion"), (antipar.fecha, antipar.proxima_aplicacion))
 
-        calendario_response.append(
-            MesPlanSanitario(
-                mes=mes_data["mes"],
-                mes_nombre=mes_data["mes_nombre"],
-                actividades=actividades_response
+    # Construir calendario con estado de cumplimiento
+    actividades, _ = _plan_compilado(caballo.categoria_sanitaria.value)
+    meses: Dict[int, MesPlanSanitario] = {}
+    for actividad in actividades:
+        fecha_realizada, proxima_fecha = registros.get((actividad["mes"], actividad["codigo"]), (None, None))
+        mes = meses.setdefault(
+            actividad["mes"],
+            MesPlanSanitario(mes=actividad["mes"], mes_nombre=actividad["mes_nombre"], actividades=[])
+        )
+        mes.actividades.append(
+            ActividadPlanSanitario(
+                tipo=actividad["tipo"],
+                nombre=actividad["nombre"],
+                descripcion=actividad["descripcion"],
+                realizada=fecha_realizada is not None,
+                fecha_realizada=fecha_realizada,
+                proxima_fecha=proxima_fecha
             )
         )
+    calendario_response = list(meses.values())
 
     return PlanSanitarioResponse(
         categoria=caballo.categoria_sanitaria,
@@ -1012,3 +1108,136 @@ def obtener_estadisticas_plan_sanitario(db: Session, caballo_id: UUID, anio: Opt
         proximas_actividades=proximas_actividades,
         actividades_vencidas=actividades_vencidas
     )
+
+
+# ========== MATRIZ DE CUMPLIMIENTO (TODO EL PLANTEL) ==========
+
+def obtener_matriz_plan_sanitario(
+    db: Session,
+    anio: Optional[int] = None,
+    activo_solo: bool = True
+):
+    """
+    Calcula el cumplimiento del plan sanitario de todo el plantel.
+
+    Carga los caballos, las vacunas y los antiparasitarios del año en tres
+    consultas (solo las columnas necesarias) y cruza cada registro contra las
+    tablas precompiladas de su categoría en una sola pasada.
+
+    Args:
+        db: Sesión de base de datos
+        anio: Año a evaluar (por defecto el actual)
+        activo_solo: Si solo se incluyen caballos activos
+
+    Returns:
+        MatrizPlanSanitarioResponse: Matriz caballo × actividad por categoría
+    """
+    from app.constants import PLAN_SANITARIO_2026
+    from app.schemas.caballo import (
+        MatrizPlanSanitarioResponse, MatrizCategoriaSanitaria, FilaMatrizSanitaria,
+        CeldaMatrizSanitaria, ActividadMatrizSanitaria, CaballoSinCategoria
+    )
+
+    hoy = date.today()
+    if anio is None:
+        anio = hoy.year
+    inicio_anio = date(anio, 1, 1)
+    fin_anio = date(anio, 12, 31)
+
+    query = db.query(Caballo.id, Caballo.nombre, Caballo.categoria_sanitaria)
+    if activo_solo:
+        query = query.filter(Caballo.estado == EstadoCaballoEnum.ACTIVO)
+    caballos = query.order_by(Caballo.nombre).all()
+
+    # caballo_id -> fechas de realización por columna (la primera del mes)
+    realizadas: Dict[UUID, Dict[int, date]] = {c.id: {} for c in caballos if c.categoria_sanitaria}
+    categorias = {c.id: c.categoria_sanitaria.value for c in caballos if c.categoria_sanitaria}
+
+    def registrar(caballo_id: UUID, fecha: date, codigo: Optional[str]):
+        categoria = categorias.get(caballo_id)
+        if categoria is None or codigo is None:
+            return
+        columna = _plan_compilado(categoria)[1].get((fecha.month, codigo))
+        if columna is not None:
+            realizadas[caballo_id].setdefault(columna, fecha)
+
+    vacunas = db.query(
+        VacunaRegistro.caballo_id, VacunaRegistro.codigo, VacunaRegistro.tipo, VacunaRegistro.fecha
+    ).filter(
+        VacunaRegistro.fecha >= inicio_anio,
+        VacunaRegistro.fecha <= fin_anio
+    ).order_by(VacunaRegistro.fecha)
+    for vacuna in vacunas:
+        registrar(vacuna.caballo_id, vacuna.fecha, _codigo_registro(vacuna))
+
+    antiparasitarios = db.query(AntiparasitarioRegistro.caballo_id, AntiparasitarioRegistro.fecha).filter(
+        AntiparasitarioRegistro.fecha >= inicio_anio,
+        AntiparasitarioRegistro.fecha <= fin_anio
+    ).order_by(AntiparasitarioRegistro.fecha)
+    for caballo_id, fecha in antiparasitarios:
+        registrar(caballo_id, fecha, "desparasitacion")
+
+    # Meses ya cerrados: una actividad no realizada de esos meses está vencida
+    if anio < hoy.year:
+        mes_vencido = 12
+    elif anio == hoy.year:
+        mes_vencido = hoy.month - 1
+    else:
+        mes_vencido = 0
+
+    filas_por_categoria: Dict[str, List] = {categoria: [] for categoria in PLAN_SANITARIO_2026}
+    sin_categoria = []
+    total_realizadas = 0
+    total_actividades = 0
+
+    for caballo in caballos:
+        if not caballo.categoria_sanitaria:
+            sin_categoria.append(CaballoSinCategoria(caballo_id=caballo.id, nombre=caballo.nombre))
+            continue
+
+        actividades, _ = _plan_compilado(caballo.categoria_sanitaria.value)
+        fechas = realizadas[caballo.id]
+        celdas = []
+        vencidas = 0
+        for columna, actividad in enumerate(actividades):
+            fecha = fechas.get(columna)
+            if fecha is not None:
+                estado = "realizada"
+            elif actividad["mes"] <= mes_vencido:
+                estado = "vencida"
+                vencidas += 1
+            else:
+                estado = "pendiente"
+            celdas.append(CeldaMatrizSanitaria(estado=estado, fecha_realizada=fecha))
+
+        total_realizadas += len(fechas)
+        total_actividades += len(actividades)
+        filas_por_categoria[caballo.categoria_sanitaria.value].append(
+            FilaMatrizSanitaria(
+                caballo_id=caballo.id,
+                nombre=caballo.nombre,
+                actividades_realizadas=len(fechas),
+                actividades_vencidas=vencidas,
+                porcentaje_cumplimiento=round(len(fechas) / len(actividades) * 100, 1) if actividades else 0.0,
+                celdas=celdas
+            )
+        )
+
+    return MatrizPlanSanitarioResponse(
+        anio=anio,
+        total_caballos=len(caballos),
+        porcentaje_cumplimiento=round(total_realizadas / total_actividades * 100, 1) if total_actividades else 0.0,
+        categorias=[
+            MatrizCategoriaSanitaria(
+                categoria=categoria,
+                nombre_categoria=plan["nombre"],
+                actividades=[
+                    ActividadMatrizSanitaria(mes=a["mes"], mes_nombre=a["mes_nombre"], tipo=a["tipo"], nombre=a["nombre"])
+                    for a in _plan_compilado(categoria)[0]
+                ],
+                caballos=filas_por_categoria[categoria]
+            )
+            for categoria, plan in PLAN_SANITARIO_2026.items()
+        ],
+        sin_categoria=sin_categoria
+    )
@@ -3,10 +3,14 @@ from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from uuid import UUID
 from typing import List, Optional
+from datetime import date
 from decimal import Decimal
 
+from app.core.config import settings
 from app.models.cliente import Cliente, EstadoCuentaEnum
+from app.models.comprobante import MovimientoCuenta
 from app.schemas.cliente import ClienteCreate, ClienteUpdate
+from app.services import dashboard_service
 
 
 def obtener_todos(
@@ -37,6 +41,7 @@ def crear(db: Session, cliente_data: ClienteCreate) -> Cliente:
         db_cliente = Cliente(**cliente_data.model_dump())
         db.add(db_cliente)
         db.commit()
+        dashboard_service.invalidar_cache("clientes")
         db.refresh(db_cliente)
         return db_cliente
     except IntegrityError as e:
@@ -52,16 +57,34 @@ def actualizar(
     cliente_id: UUID,
     cliente_update: ClienteUpdate
 ) -> Optional[Cliente]:
-    """Actualiza un cliente existente."""
+    """
+    Actualiza un cliente existente.
+
+    Un cambio de saldo no se escribe directo: se registra la diferencia como
+    movimiento "AJUSTE MANUAL", así el saldo sigue coincidiendo con el ledger.
+    """
     db_cliente = obtener_por_id(db, cliente_id)
     if not db_cliente:
         return None
 
     update_data = cliente_update.model_dump(exclude_unset=True)
+    nuevo_saldo = update_data.pop("saldo", None)
+    if nuevo_saldo is not None:
+        db.refresh(db_cliente, attribute_names=["saldo"], with_for_update=True)
+        diferencia = nuevo_saldo - db_cliente.saldo
+        if diferencia:
+            registrar_movimiento(
+                db, db_cliente,
+                tipo="credito" if diferencia > 0 else "debito",
+                monto=abs(diferencia),
+                descripcion="AJUSTE MANUAL"
+            )
+
     for field, value in update_data.items():
         setattr(db_cliente, field, value)
 
     db.commit()
+    dashboard_service.invalidar_cache("clientes")
     db.refresh(db_cliente)
     return db_cliente
 
@@ -75,6 +98,7 @@ def eliminar(db: Session, cliente_id: UUID) -> Optional[Cliente]:
     # Soft delete
     db_cliente.activo = False
     db.commit()
+    dashboard_service.invalidar_cache("clientes")
     db.refresh(db_cliente)
     return db_cliente
 
@@ -102,8 +126,77 @@ def obtener_morosos(db: Session) -> List[Cliente]:
     ).all()
 
 
-def actualizar_saldo(db: Session, cliente_id: UUID, monto: float) -> Cliente:
-    """Actualiza el saldo de un cliente."""
+def estado_cuenta_segun_saldo(saldo: Decimal) -> EstadoCuentaEnum:
+    """Estado de cuenta que corresponde a un saldo."""
+    if saldo < -settings.CLIENTE_UMBRAL_MOROSIDAD:
+        return EstadoCuentaEnum.MOROSO
+    if saldo < 0:
+        return EstadoCuentaEnum.DEBE
+    return EstadoCuentaEnum.AL_DIA
+
+
+def registrar_movimiento(
+    db: Session,
+    cliente: Cliente,
+    tipo: str,
+    monto: Decimal,
+    descripcion: str,
+    comprobante_id: Optional[UUID] = None,
+    pago_id: Optional[UUID] = None
+) -> MovimientoCuenta:
+    """
+    Aplica un movimiento al saldo del cliente y lo registra en la cuenta corriente.
+
+    Es el único lugar que modifica Cliente.saldo, de modo que el saldo siempre
+    coincide con la suma de movimientos_cuenta. No hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        cliente: Cliente al que se aplica el movimiento
+        tipo: "debito" (resta del saldo) o "credito" (suma al saldo)
+        monto: Monto del movimiento (positivo)
+        descripcion: Descripción del movimiento
+        comprobante_id: Comprobante que origina el movimiento, si lo hay
+        pago_id: Pago que origina el movimiento, si lo hay
+
+    Returns:
+        MovimientoCuenta: El movimiento agregado a la sesión
+    """
+    # Releer el saldo bloqueando la fila: dos movimientos concurrentes del mismo
+    # cliente se serializan en lugar de pisarse el saldo
+    db.flush()
+    db.refresh(cliente, attribute_names=["saldo"], with_for_update=True)
+
+    saldo_anterior = cliente.saldo
+    if tipo == "debito":
+        cliente.saldo -= monto
+    else:
+        cliente.saldo += monto
+    cliente.estado_cuenta = estado_cuenta_segun_saldo(cliente.saldo)
+
+    movimiento = MovimientoCuenta(
+        cliente_id=cliente.id,
+        tipo=tipo,
+        comprobante_id=comprobante_id,
+        pago_id=pago_id,
+        descripcion=descripcion,
+        monto=monto,
+        saldo_anterior=saldo_anterior,
+        saldo_posterior=cliente.saldo,
+        fecha=date.today()
+    )
+    db.add(movimiento)
+    return movimiento
+
+
+def actualizar_saldo(
+    db: Session,
+    cliente_id: UUID,
+    monto: float,
+    descripcion: str = "Ajuste de saldo",
+    pago_id: Optional[UUID] = None
+) -> Cliente:
+    """Actualiza el saldo de un cliente (monto positivo acredita, negativo debita)."""
     db_cliente = obtener_por_id(db, cliente_id)
     if not db_cliente:
         raise HTTPException(
@@ -111,14 +204,17 @@ def actualizar_saldo(db: Session, cliente_id: UUID, monto: float) -> Cliente:
             detail="Cliente no encontrado"
         )
 
-    db_cliente.saldo += Decimal(str(monto))
-
-    # Actualizar estado de cuenta según el saldo
-    if db_cliente.saldo < 0:
-        db_cliente.estado_cuenta = EstadoCuentaEnum.DEBE
-    elif db_cliente.saldo == 0:
-        db_cliente.estado_cuenta = EstadoCuentaEnum.AL_DIA
+    monto = Decimal(str(monto))
+    registrar_movimiento(
+        db,
+        db_cliente,
+        tipo="credito" if monto >= 0 else "debito",
+        monto=abs(monto),
+        descripcion=descripcion,
+        pago_id=pago_id
+    )
 
     db.commit()
+    dashboard_service.invalidar_cache("clientes")
     db.refresh(db_cliente)
     return db_cliente
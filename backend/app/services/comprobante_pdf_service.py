@@ -0,0 +1,310 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from xhtml2pdf import pisa
+
+from app.core.config import settings
+from app.models.comprobante import Comprobante, EstadoComprobanteEnum, TipoComprobanteEnum
+from app.services import file_service
+
+logger = logging.getLogger(__name__)
+
+template_dir = Path(__file__).parent.parent / "templates" / "comprobantes"
+
+jinja_env = Environment(
+    loader=FileSystemLoader(str(template_dir)),
+    autoescape=select_autoescape(['html', 'xml'])
+)
+
+TITULOS = {
+    TipoComprobanteEnum.FACTURA: "Factura",
+    TipoComprobanteEnum.RECIBO: "Recibo",
+    TipoComprobanteEnum.NOTA_CREDITO: "Nota de Crédito",
+    TipoComprobanteEnum.NOTA_DEBITO: "Nota de Débito",
+    TipoComprobanteEnum.PRESUPUESTO: "Presupuesto",
+}
+
+
+# ========== RENDERIZADO ==========
+
+def _importe(valor: Optional[Decimal]) -> str:
+    """Importe con separador de miles y coma decimal: 1.234,50"""
+    return f"{valor or 0:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _fecha(valor: Optional[date]) -> Optional[str]:
+    return valor.strftime("%d/%m/%Y") if valor else None
+
+
+def contexto_comprobante(comprobante: Comprobante) -> Dict[str, Any]:
+    """
+    Datos del comprobante que se imprimen en el PDF.
+
+    Solo incluye lo que se ve en el documento: el estado de cobro (pagos
+    parciales, vencido) no forma parte del PDF, así que cobrar un comprobante
+    no obliga a regenerarlo. Anularlo sí.
+    """
+    cliente = comprobante.cliente
+    return {
+        "club": settings.PROJECT_NAME,
+        "titulo": TITULOS[comprobante.tipo],
+        "numero_completo": comprobante.numero_completo,
+        "fecha_emision": _fecha(comprobante.fecha_emision),
+        "fecha_vencimiento": _fecha(comprobante.fecha_vencimiento),
+        "cliente": {
+            "nombre": f"{cliente.nombre} {cliente.apellido}",
+            "dni": cliente.dni,
+            "direccion": cliente.direccion,
+        },
+        "concepto_general": comprobante.concepto_general,
+        "condicion_pago": comprobante.condicion_pago,
+        "observaciones": comprobante.observaciones,
+        "items": [
+            {
+                "descripcion": item.descripcion,
+                "cantidad": item.cantidad.normalize(),
+                "precio_unitario": _importe(item.precio_unitario),
+                "descuento_porcentaje": item.descuento_porcentaje or 0,
+                "subtotal": _importe(item.subtotal),
+            }
+            for item in sorted(comprobante.items, key=lambda i: (i.orden or 0, i.descripcion))
+        ],
+        "subtotal": _importe(comprobante.subtotal),
+        "descuento_porcentaje": comprobante.descuento_porcentaje,
+        "descuento_monto": _importe(comprobante.descuento_monto) if comprobante.descuento_monto else None,
+        "iva_porcentaje": comprobante.iva_porcentaje,
+        "iva_monto": _importe(comprobante.iva_monto) if comprobante.iva_monto else None,
+        "total": _importe(comprobante.total),
+        "anulado": comprobante.estado == EstadoComprobanteEnum.ANULADO,
+        "motivo_anulacion": comprobante.motivo_anulacion,
+    }
+
+
+def renderizar_html(comprobante: Comprobante) -> str:
+    """HTML del comprobante a partir del template comprobante.html"""
+    return jinja_env.get_template("comprobante.html").render(**contexto_comprobante(comprobante))
+
+
+def renderizar_pdf(html: str) -> bytes:
+    """
+    Convierte el HTML del comprobante a PDF.
+
+    Es la parte costosa (CPU); se ejecuta solo en los workers de Celery,
+    nunca dentro de un request.
+    """
+    salida = io.BytesIO()
+    resultado = pisa.CreatePDF(html, dest=salida, encoding="utf-8")
+    if resultado.err:
+        raise ValueError(f"Error generando el PDF ({resultado.err} errores)")
+    return salida.getvalue()
+
+
+# ========== ALMACENAMIENTO ==========
+
+def ruta_relativa(html: str) -> str:
+    """
+    Ruta del PDF dentro de uploads/, direccionada por contenido.
+
+    El nombre es el SHA-256 del HTML renderizado: si el comprobante (o el
+    template) no cambió, la ruta es la misma y el PDF ya existente se reutiliza.
+    """
+    huella = hashlib.sha256(html.encode("utf-8")).hexdigest()
+    relativa = file_service.COMPROBANTES_DIR.relative_to(file_service.UPLOAD_DIR)
+    return str(relativa / huella[:2] / f"{huella}.pdf")
+
+
+def _guardar(relativa: str, contenido: bytes) -> None:
+    """Escribe el PDF de forma atómica (archivo temporal + rename)."""
+    destino = file_service.UPLOAD_DIR / relativa
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=destino.parent, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, destino)
+    except Exception:
+        Path(temporal).unlink(missing_ok=True)
+        raise
+
+
+def _relativa_de_url(url: Optional[str]) -> Optional[str]:
+    """Ruta relativa a uploads/ de un pdf_url generado por este servicio."""
+    prefijo = file_service.get_file_url("")
+    if url and url.startswith(prefijo):
+        return url[len(prefijo):]
+    return None
+
+
+# ========== GENERACIÓN ==========
+
+def consulta_comprobantes(comprobante_ids: Optional[List[UUID]] = None) -> Select:
+    """
+    Comprobantes con PDF (todo lo que no es borrador), con cliente e items.
+
+    Args:
+        comprobante_ids: Limitar a estos comprobantes (opcional)
+    """
+    consulta = select(Comprobante).options(
+        joinedload(Comprobante.cliente),
+        selectinload(Comprobante.items)
+    ).where(
+        Comprobante.estado != EstadoComprobanteEnum.BORRADOR
+    ).order_by(Comprobante.id)
+
+    if comprobante_ids is not None:
+        consulta = consulta.where(Comprobante.id.in_(comprobante_ids))
+    return consulta
+
+
+def ids_emitidos_en_mes(db: Session, anio: int, mes: int) -> List[UUID]:
+    """IDs de los comprobantes con PDF y fecha de emisión en el mes indicado, en orden."""
+    desde = date(anio, mes, 1)
+    hasta = date(anio + 1, 1, 1) if mes == 12 else date(anio, mes + 1, 1)
+    return list(db.scalars(
+        select(Comprobante.id).where(
+            Comprobante.estado != EstadoComprobanteEnum.BORRADOR,
+            Comprobante.fecha_emision >= desde,
+            Comprobante.fecha_emision < hasta
+        ).order_by(Comprobante.id)
+    ))
+
+
+def _generar_pdfs(db: Session, comprobantes: List[Comprobante]) -> Tuple[int, List[UUID]]:
+    """
+    Genera (o reutiliza) el PDF de cada comprobante y actualiza pdf_url.
+
+    Solo se convierte a PDF lo que cambió: si el archivo direccionado por el
+    contenido ya existe, se reutiliza. pdf_url se actualiza solo si el
+    comprobante no se modificó mientras se renderizaba (mismo updated_at), así
+    un render con datos viejos no pisa uno más nuevo. Los PDFs anteriores que
+    quedan sin uso se borran después del commit.
+
+    Returns:
+        Tupla con la cantidad de PDFs renderizados y los IDs de los
+        comprobantes que cambiaron durante el render (pdf_url sin actualizar)
+    """
+    renderizados = 0
+    anteriores = []
+    desactualizados = []
+
+    for comprobante in comprobantes:
+        html = renderizar_html(comprobante)
+        relativa = ruta_relativa(html)
+
+        if not (file_service.UPLOAD_DIR / relativa).is_file():
+            _guardar(relativa, renderizar_pdf(html))
+            renderizados += 1
+
+        url = file_service.get_file_url(relativa)
+        if comprobante.pdf_url == url:
+            continue
+
+        actualizado = db.execute(
+            update(Comprobante).where(
+                Comprobante.id == comprobante.id,
+                Comprobante.updated_at == comprobante.updated_at
+            ).values(
+                pdf_url=url,
+                updated_at=Comprobante.updated_at  # el PDF no es una modificación del comprobante
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        if not actualizado:
+            desactualizados.append(comprobante.id)
+            continue
+        anterior = _relativa_de_url(comprobante.pdf_url)
+        if anterior:
+            anteriores.append(anterior)
+
+    db.commit()
+
+    for anterior in anteriores:
+        file_service.delete_file(anterior)
+
+    return renderizados, desactualizados
+
+
+def generar_pdfs(db: Session, comprobantes: List[Comprobante]) -> int:
+    """
+    Genera (o reutiliza) el PDF de un lote de comprobantes y actualiza pdf_url.
+
+    Los comprobantes que se modificaron mientras se renderizaba el lote se
+    encolan de a uno para regenerarlos con los datos nuevos.
+
+    Args:
+        db: Sesión de escritura (se commitea al terminar)
+        comprobantes: Comprobantes con cliente e items cargados
+
+    Returns:
+        int: Cantidad de PDFs renderizados (sin contar los reutilizados)
+    """
+    renderizados, desactualizados = _generar_pdfs(db, comprobantes)
+    for comprobante_id in desactualizados:
+        encolar_generacion(comprobante_id)
+    return renderizados
+
+
+def generar_pdf(db: Session, comprobante_id: UUID, intentos: int = 2) -> Optional[str]:
+    """
+    Genera el PDF de un comprobante.
+
+    Si el comprobante se modifica mientras se renderiza (p. ej. se le aplica
+    un pago), se relee y se vuelve a intentar.
+
+    Args:
+        db: Sesión de base de datos
+        comprobante_id: ID del comprobante
+        intentos: Cantidad de renders antes de desistir
+
+    Returns:
+        La URL del PDF, o None si el comprobante no existe o es un borrador
+
+    Raises:
+        ValueError: Si el comprobante siguió cambiando en todos los intentos
+            (la generación se vuelve a encolar)
+    """
+    consulta = consulta_comprobantes([comprobante_id]).execution_options(populate_existing=True)
+    for _ in range(intentos):
+        comprobante = db.scalars(consulta).first()
+        if not comprobante:
+            return None
+
+        _, desactualizados = _generar_pdfs(db, [comprobante])
+        if not desactualizados:
+            db.refresh(comprobante, attribute_names=["pdf_url"])
+            return comprobante.pdf_url
+
+    encolar_generacion(comprobante_id)
+    raise ValueError(
+        f"El comprobante {comprobante_id} cambió mientras se generaba el PDF; se reintenta en una nueva tarea"
+    )
+
+
+def encolar_generacion(comprobante_id: UUID) -> bool:
+    """
+    Encola la generación del PDF de un comprobante en un worker.
+
+    Si no se puede encolar (broker caído) no falla: el comprobante queda sin
+    PDF hasta la próxima corrida de generar_pdfs_mes.
+
+    Returns:
+        bool: True si la tarea quedó encolada
+    """
+    from app.tasks.comprobantes import generar_pdf_comprobante
+
+    try:
+        generar_pdf_comprobante.delay(str(comprobante_id))
+        return True
+    except Exception as e:
+        logger.warning(f"No se pudo encolar el PDF del comprobante {comprobante_id}: {str(e)}")
+        return False
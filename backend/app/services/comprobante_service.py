@@ -1,20 +1,23 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc
-from typing import List, Optional, Tuple
+from sqlalchemy import Date, func, and_, or_, desc
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from typing import Iterator, List, Optional, Tuple
 from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
 
+from app.core.paginacion import paginar_por_cursor
 from app.models.comprobante import (
-    Comprobante, ComprobanteItem, PagoComprobante, MovimientoCuenta,
+    Comprobante, ComprobanteItem, PagoComprobante, MovimientoCuenta, NumeradorComprobante,
     TipoComprobanteEnum, EstadoComprobanteEnum
 )
 from app.models.pago import Pago, EstadoPagoEnum
-from app.models.cliente import Cliente, EstadoCuentaEnum
+from app.models.cliente import Cliente
 from app.schemas.comprobante import (
     ComprobanteCreate, ComprobanteUpdate, ComprobanteItemCreate,
     AnularComprobanteRequest, AplicarPagoRequest
 )
+from app.services import cliente_service, cuenta_corriente_service, dashboard_service
 
 
 class ComprobanteService:
@@ -32,19 +35,53 @@ class ComprobanteService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _generar_numero(self, tipo: TipoComprobanteEnum, punto_venta: int = 1) -> Tuple[int, str]:
-        """Genera el próximo número de comprobante"""
-        # Obtener el último número para este tipo y punto de venta
-        ultimo = self.db.query(func.max(Comprobante.numero)).filter(
-            Comprobante.tipo == tipo,
-            Comprobante.punto_venta == punto_venta
-        ).scalar()
+    def reservar_numeros(
+        self,
+        tipo: TipoComprobanteEnum,
+        cantidad: int,
+        punto_venta: int = 1
+    ) -> List[Tuple[int, str]]:
+        """
+        Reserva `cantidad` números consecutivos de comprobante en un solo viaje
+
+        El contador de (tipo, punto_venta) se incrementa con un único
+        INSERT ... ON CONFLICT DO UPDATE en la transacción de la sesión: si el
+        comprobante no llega a commitearse, el rollback devuelve los números y
+        la numeración no queda con huecos. La fila del contador queda bloqueada
+        hasta el commit, así que se reserva al final, con todo lo demás ya
+        validado. Quien además bloquee filas de clientes debe hacerlo antes de
+        reservar (mismo orden que facturacion_service.facturar_lote).
+
+        Args:
+            tipo: Tipo de comprobante
+            cantidad: Cantidad de números a reservar
+            punto_venta: Punto de venta
+
+        Returns:
+            Lista de (numero, numero_completo) en orden ascendente
+        """
+        if cantidad < 1:
+            raise ValueError("La cantidad de números a reservar debe ser mayor a cero")
+
+        stmt = pg_insert(NumeradorComprobante).values(
+            tipo=tipo, punto_venta=punto_venta, ultimo_numero=cantidad
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[NumeradorComprobante.tipo, NumeradorComprobante.punto_venta],
+            set_={"ultimo_numero": NumeradorComprobante.ultimo_numero + cantidad}
+        ).returning(NumeradorComprobante.ultimo_numero)
+
+        ultimo = self.db.execute(stmt).scalar_one()
 
-        nuevo_numero = (ultimo or 0) + 1
         prefijo = self.PREFIJOS.get(tipo, "X")
-        numero_completo = f"{prefijo}-{punto_venta:04d}-{nuevo_numero:08d}"
+        return [
+            (numero, f"{prefijo}-{punto_venta:04d}-{numero:08d}")
+            for numero in range(ultimo - cantidad + 1, ultimo + 1)
+        ]
 
-        return nuevo_numero, numero_completo
+    def _generar_numero(self, tipo: TipoComprobanteEnum, punto_venta: int = 1) -> Tuple[int, str]:
+        """Genera el próximo número de comprobante"""
+        return self.reservar_numeros(tipo, 1, punto_venta)[0]
 
     def crear(
         self,
@@ -52,20 +89,24 @@ class ComprobanteService:
         created_by: Optional[UUID] = None
     ) -> Comprobante:
         """Crea un nuevo comprobante"""
-        # Generar numeración
-        numero, numero_completo = self._generar_numero(data.tipo)
+        # Validar el cliente antes de numerar; si se emite, su fila se bloquea
+        # antes que el contador, como en la facturación por lotes
+        consulta_cliente = self.db.query(Cliente.id).filter(Cliente.id == data.cliente_id)
+        if data.emitir:
+            consulta_cliente = consulta_cliente.with_for_update()
+        if not consulta_cliente.first():
+            raise ValueError("Cliente no encontrado")
 
-        # Crear comprobante
+        # Armar comprobante e items en memoria
         comprobante = Comprobante(
             tipo=data.tipo,
-            numero=numero,
             punto_venta=1,
-            numero_completo=numero_completo,
             cliente_id=data.cliente_id,
             fecha_emision=data.fecha_emision or date.today(),
             fecha_vencimiento=data.fecha_vencimiento,
             descuento_porcentaje=data.descuento_porcentaje,
             iva_porcentaje=data.iva_porcentaje,
+            monto_pagado=Decimal("0"),
             concepto_general=data.concepto_general,
             observaciones=data.observaciones,
             condicion_pago=data.condicion_pago,
@@ -73,13 +114,8 @@ class ComprobanteService:
             created_by=created_by
         )
 
-        self.db.add(comprobante)
-        self.db.flush()  # Para obtener el ID
-
-        # Crear items
         for i, item_data in enumerate(data.items):
             item = ComprobanteItem(
-                comprobante_id=comprobante.id,
                 descripcion=item_data.descripcion,
                 cantidad=item_data.cantidad,
                 precio_unitario=item_data.precio_unitario,
@@ -88,18 +124,23 @@ class ComprobanteService:
                 orden=item_data.orden or i
             )
             item.calcular_subtotal()
-            self.db.add(item)
-
-        self.db.flush()
+            comprobante.items.append(item)
 
         # Calcular totales
         comprobante.calcular_totales()
 
+        # Generar numeración al final: el contador queda bloqueado hasta el commit
+        comprobante.numero, comprobante.numero_completo = self._generar_numero(data.tipo)
+
+        self.db.add(comprobante)
+        self.db.flush()  # Para obtener el ID
+
         # Si se solicita emitir inmediatamente
         if data.emitir:
             self._emitir(comprobante)
 
         self.db.commit()
+        dashboard_service.invalidar_cache("clientes")
         self.db.refresh(comprobante)
 
         return comprobante
@@ -137,6 +178,7 @@ class ComprobanteService:
 
         self._emitir(comprobante)
         self.db.commit()
+        dashboard_service.invalidar_cache("clientes")
         self.db.refresh(comprobante)
 
         return comprobante
@@ -145,18 +187,16 @@ class ComprobanteService:
         """Obtiene un comprobante por ID"""
         return self.db.query(Comprobante).filter(Comprobante.id == comprobante_id).first()
 
-    def listar(
+    def _query_listar(
         self,
-        skip: int = 0,
-        limit: int = 50,
         cliente_id: Optional[UUID] = None,
         tipo: Optional[TipoComprobanteEnum] = None,
         estado: Optional[EstadoComprobanteEnum] = None,
         fecha_desde: Optional[date] = None,
         fecha_hasta: Optional[date] = None,
         busqueda: Optional[str] = None
-    ) -> List[Comprobante]:
-        """Lista comprobantes con filtros"""
+    ):
+        """Consulta de comprobantes con los filtros del listado"""
         query = self.db.query(Comprobante)
 
         if cliente_id:
@@ -177,8 +217,45 @@ class ComprobanteService:
                 )
             )
 
+        return query
+
+    def listar(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        cliente_id: Optional[UUID] = None,
+        tipo: Optional[TipoComprobanteEnum] = None,
+        estado: Optional[EstadoComprobanteEnum] = None,
+        fecha_desde: Optional[date] = None,
+        fecha_hasta: Optional[date] = None,
+        busqueda: Optional[str] = None
+    ) -> List[Comprobante]:
+        """Lista comprobantes con filtros"""
+        query = self._query_listar(
+            cliente_id, tipo, estado, fecha_desde, fecha_hasta, busqueda
+        )
         return query.order_by(desc(Comprobante.created_at)).offset(skip).limit(limit).all()
 
+    def listar_pagina(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        cliente_id: Optional[UUID] = None,
+        tipo: Optional[TipoComprobanteEnum] = None,
+        estado: Optional[EstadoComprobanteEnum] = None,
+        fecha_desde: Optional[date] = None,
+        fecha_hasta: Optional[date] = None,
+        busqueda: Optional[str] = None
+    ) -> Tuple[List[Comprobante], Optional[str]]:
+        """Lista una página de comprobantes por cursor, del más reciente al más antiguo"""
+        query = self._query_listar(
+            cliente_id, tipo, estado, fecha_desde, fecha_hasta, busqueda
+        )
+        return paginar_por_cursor(
+            query,
+            Comprobante.created_at, Comprobante.id, cursor, limit
+        )
+
     def actualizar(self, comprobante_id: UUID, data: ComprobanteUpdate) -> Comprobante:
         """Actualiza un comprobante (solo en borrador)"""
         comprobante = self.obtener(comprobante_id)
@@ -232,6 +309,7 @@ class ComprobanteService:
         comprobante.motivo_anulacion = data.motivo
 
         self.db.commit()
+        dashboard_service.invalidar_cache("clientes")
         self.db.refresh(comprobante)
 
         return comprobante
@@ -285,6 +363,7 @@ class ComprobanteService:
         comprobante.actualizar_estado_pago()
 
         self.db.commit()
+        dashboard_service.invalidar_cache("pagos", "clientes")
         self.db.refresh(comprobante)
 
         return comprobante
@@ -303,35 +382,15 @@ class ComprobanteService:
         if not cliente:
             raise ValueError("Cliente no encontrado")
 
-        saldo_anterior = cliente.saldo
-
-        if tipo == "debito":
-            cliente.saldo -= monto
-        else:
-            cliente.saldo += monto
-
-        # Actualizar estado de cuenta
-        if cliente.saldo < 0:
-            cliente.estado_cuenta = EstadoCuentaEnum.DEBE
-        elif cliente.saldo < -1000:  # Umbral de morosidad configurable
-            cliente.estado_cuenta = EstadoCuentaEnum.MOROSO
-        else:
-            cliente.estado_cuenta = EstadoCuentaEnum.AL_DIA
-
-        movimiento = MovimientoCuenta(
-            cliente_id=cliente_id,
+        return cliente_service.registrar_movimiento(
+            self.db,
+            cliente,
             tipo=tipo,
-            comprobante_id=comprobante_id,
-            pago_id=pago_id,
-            descripcion=descripcion,
             monto=monto,
-            saldo_anterior=saldo_anterior,
-            saldo_posterior=cliente.saldo,
-            fecha=date.today()
+            descripcion=descripcion,
+            comprobante_id=comprobante_id,
+            pago_id=pago_id
         )
-        self.db.add(movimiento)
-
-        return movimiento
 
     def obtener_cuenta_corriente(
         self,
@@ -356,7 +415,9 @@ class ComprobanteService:
 
         movimientos = query.order_by(desc(MovimientoCuenta.created_at)).limit(limit).all()
 
-        # Calcular totales
+        # Saldo y totales del ledger desde el último checkpoint más los movimientos posteriores
+        saldo = cuenta_corriente_service.obtener_saldo(self.db, cliente_id)
+
         total_facturado = self.db.query(func.sum(Comprobante.total)).filter(
             Comprobante.cliente_id == cliente_id,
             Comprobante.tipo.in_([TipoComprobanteEnum.FACTURA, TipoComprobanteEnum.NOTA_DEBITO]),
@@ -376,144 +437,286 @@ class ComprobanteService:
         return {
             "cliente_id": cliente_id,
             "cliente_nombre": f"{cliente.nombre} {cliente.apellido}",
-            "saldo_actual": cliente.saldo,
+            "saldo_actual": saldo["saldo"],
             "total_facturado": total_facturado,
             "total_pagado": total_pagado,
+            "total_debitos": saldo["total_debitos"],
+            "total_creditos": saldo["total_creditos"],
             "comprobantes_pendientes": comprobantes_pendientes,
             "movimientos": movimientos
         }
 
-    def reporte_ventas(
+    # Unidades de date_trunc para agrupar los reportes por período
+    AGRUPACIONES_REPORTE = {"dia": "day", "semana": "week", "mes": "month"}
+
+    def _agregar_por_periodo(
         self,
-        fecha_inicio: date,
-        fecha_fin: date
-    ) -> dict:
-        """Genera reporte de ventas"""
-        comprobantes = self.db.query(Comprobante).filter(
+        columna_fecha,
+        filtros: list,
+        agrupar_por: str,
+        **agregados
+    ) -> List[dict]:
+        """Agrega por día/semana/mes en SQL; retorna una fila por período con datos"""
+        if agrupar_por not in self.AGRUPACIONES_REPORTE:
+            raise ValueError(f"Agrupación inválida: {agrupar_por}. Use dia, semana o mes")
+
+        periodo = func.date_trunc(self.AGRUPACIONES_REPORTE[agrupar_por], columna_fecha).cast(Date).label("periodo")
+        filas = self.db.query(
+            periodo,
+            *[expresion.label(nombre) for nombre, expresion in agregados.items()]
+        ).filter(*filtros).group_by(periodo).order_by(periodo).all()
+
+        return [dict(fila._mapping) for fila in filas]
+
+    def filtros_ventas(self, fecha_inicio: date, fecha_fin: date) -> list:
+        """Comprobantes que cuentan como venta en el período (fecha de emisión)"""
+        return [
             Comprobante.fecha_emision >= fecha_inicio,
             Comprobante.fecha_emision <= fecha_fin,
             Comprobante.estado != EstadoComprobanteEnum.ANULADO,
             Comprobante.tipo.in_([TipoComprobanteEnum.FACTURA, TipoComprobanteEnum.RECIBO])
-        ).all()
+        ]
 
-        total_facturado = sum(c.total for c in comprobantes)
-        total_cobrado = sum(c.monto_pagado for c in comprobantes)
-        total_pendiente = sum(c.saldo_pendiente for c in comprobantes)
+    def filtros_cobranzas(self, fecha_inicio: date, fecha_fin: date) -> list:
+        """Pagos cobrados en el período (fecha de pago)"""
+        return [
+            Pago.fecha_pago >= fecha_inicio,
+            Pago.fecha_pago <= fecha_fin,
+            Pago.estado == EstadoPagoEnum.PAGADO
+        ]
+
+    def reporte_ventas(
+        self,
+        fecha_inicio: date,
+        fecha_fin: date,
+        agrupar_por: Optional[str] = None,
+        incluir_detalle: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[dict, Optional[str]]:
+        """
+        Genera reporte de ventas
+
+        Los totales y desgloses se calculan con GROUP BY en la base; solo se
+        traen comprobantes si se pide el detalle, y en ese caso paginado.
+
+        Args:
+            fecha_inicio: Inicio del período (fecha de emisión, inclusive)
+            fecha_fin: Fin del período (inclusive)
+            agrupar_por: "dia", "semana" o "mes" para agregar la serie por período
+            incluir_detalle: Si se incluye una página de comprobantes
+            cursor: Cursor de la página de detalle (None para la primera)
+            limit: Tamaño de la página de detalle
+
+        Returns:
+            Tuple con el reporte y el cursor de la siguiente página de detalle
+        """
+        filtros = self.filtros_ventas(fecha_inicio, fecha_fin)
+
+        # Una fila por (tipo, estado): de ahí salen los totales y ambos desgloses
+        grupos = self.db.query(
+            Comprobante.tipo,
+            Comprobante.estado,
+            func.count(Comprobante.id).label("cantidad"),
+            func.coalesce(func.sum(Comprobante.total), 0).label("total"),
+            func.coalesce(func.sum(Comprobante.monto_pagado), 0).label("cobrado"),
+            func.coalesce(func.sum(Comprobante.saldo_pendiente), 0).label("pendiente")
+        ).filter(*filtros).group_by(Comprobante.tipo, Comprobante.estado).all()
 
         por_tipo = {}
         por_estado = {}
+        for g in grupos:
+            for desglose, clave in ((por_tipo, g.tipo.value), (por_estado, g.estado.value)):
+                acumulado = desglose.setdefault(clave, {"cantidad": 0, "total": Decimal("0")})
+                acumulado["cantidad"] += g.cantidad
+                acumulado["total"] += g.total
 
-        for c in comprobantes:
-            # Por tipo
-            tipo = c.tipo.value
-            if tipo not in por_tipo:
-                por_tipo[tipo] = {"cantidad": 0, "total": Decimal("0")}
-            por_tipo[tipo]["cantidad"] += 1
-            por_tipo[tipo]["total"] += c.total
-
-            # Por estado
-            estado = c.estado.value
-            if estado not in por_estado:
-                por_estado[estado] = {"cantidad": 0, "total": Decimal("0")}
-            por_estado[estado]["cantidad"] += 1
-            por_estado[estado]["total"] += c.total
-
-        return {
+        reporte = {
             "fecha_inicio": fecha_inicio,
             "fecha_fin": fecha_fin,
-            "total_facturado": total_facturado,
-            "total_cobrado": total_cobrado,
-            "total_pendiente": total_pendiente,
-            "cantidad_comprobantes": len(comprobantes),
+            "total_facturado": sum((g.total for g in grupos), Decimal("0")),
+            "total_cobrado": sum((g.cobrado for g in grupos), Decimal("0")),
+            "total_pendiente": sum((g.pendiente for g in grupos), Decimal("0")),
+            "cantidad_comprobantes": sum(g.cantidad for g in grupos),
             "por_tipo": por_tipo,
-            "por_estado": por_estado
+            "por_estado": por_estado,
+            "agrupado_por": agrupar_por,
+            "por_periodo": None,
+            "detalle": None,
         }
 
+        if agrupar_por:
+            reporte["por_periodo"] = self._agregar_por_periodo(
+                Comprobante.fecha_emision, filtros, agrupar_por,
+                cantidad=func.count(Comprobante.id),
+                total=func.coalesce(func.sum(Comprobante.total), 0),
+                cobrado=func.coalesce(func.sum(Comprobante.monto_pagado), 0),
+                pendiente=func.coalesce(func.sum(Comprobante.saldo_pendiente), 0)
+            )
+
+        siguiente = None
+        if incluir_detalle:
+            reporte["detalle"], siguiente = paginar_por_cursor(
+                self.db.query(Comprobante).filter(*filtros),
+                Comprobante.fecha_emision, Comprobante.id, cursor, limit, descendente=False
+            )
+
+        return reporte, siguiente
+
     def reporte_cobranzas(
         self,
         fecha_inicio: date,
-        fecha_fin: date
-    ) -> dict:
-        """Genera reporte de cobranzas"""
-        pagos = self.db.query(Pago).filter(
-            Pago.fecha_pago >= fecha_inicio,
-            Pago.fecha_pago <= fecha_fin,
-            Pago.estado == EstadoPagoEnum.PAGADO
-        ).all()
-
-        total_cobrado = sum(p.monto for p in pagos)
+        fecha_fin: date,
+        agrupar_por: Optional[str] = None,
+        incluir_detalle: bool = False,
+        cursor: Optional[str] = None,
+        limit: int = 100
+    ) -> Tuple[dict, Optional[str]]:
+        """
+        Genera reporte de cobranzas
+
+        Igual que reporte_ventas: agregados en SQL (por método de pago, por
+        tipo y opcionalmente por período) y detalle de pagos opcional paginado.
+
+        Args:
+            fecha_inicio: Inicio del período (fecha de pago, inclusive)
+            fecha_fin: Fin del período (inclusive)
+            agrupar_por: "dia", "semana" o "mes" para agregar la serie por período
+            incluir_detalle: Si se incluye una página de pagos
+            cursor: Cursor de la página de detalle (None para la primera)
+            limit: Tamaño de la página de detalle
+
+        Returns:
+            Tuple con el reporte y el cursor de la siguiente página de detalle
+        """
+        filtros = self.filtros_cobranzas(fecha_inicio, fecha_fin)
+
+        # Una fila por (método, tipo): de ahí salen el total y ambos desgloses
+        grupos = self.db.query(
+            Pago.metodo_pago,
+            Pago.tipo,
+            func.count(Pago.id).label("cantidad"),
+            func.coalesce(func.sum(Pago.monto), 0).label("total")
+        ).filter(*filtros).group_by(Pago.metodo_pago, Pago.tipo).all()
 
         por_metodo = {}
         por_tipo = {}
+        for g in grupos:
+            metodo = g.metodo_pago.value if g.metodo_pago else "sin_especificar"
+            por_metodo[metodo] = por_metodo.get(metodo, Decimal("0")) + g.total
+            por_tipo[g.tipo.value] = por_tipo.get(g.tipo.value, Decimal("0")) + g.total
 
-        for p in pagos:
-            # Por método
-            metodo = p.metodo_pago.value if p.metodo_pago else "sin_especificar"
-            if metodo not in por_metodo:
-                por_metodo[metodo] = Decimal("0")
-            por_metodo[metodo] += p.monto
-
-            # Por tipo
-            tipo = p.tipo.value
-            if tipo not in por_tipo:
-                por_tipo[tipo] = Decimal("0")
-            por_tipo[tipo] += p.monto
-
-        return {
+        reporte = {
             "fecha_inicio": fecha_inicio,
             "fecha_fin": fecha_fin,
-            "total_cobrado": total_cobrado,
-            "cantidad_pagos": len(pagos),
+            "total_cobrado": sum((g.total for g in grupos), Decimal("0")),
+            "cantidad_pagos": sum(g.cantidad for g in grupos),
             "por_metodo": por_metodo,
-            "por_tipo": por_tipo
+            "por_tipo": por_tipo,
+            "agrupado_por": agrupar_por,
+            "por_periodo": None,
+            "detalle": None,
         }
 
-    def reporte_deudores(self, fecha_corte: Optional[date] = None) -> dict:
-        """Genera reporte de deudores"""
-        if not fecha_corte:
-            fecha_corte = date.today()
+        if agrupar_por:
+            reporte["por_periodo"] = self._agregar_por_periodo(
+                Pago.fecha_pago, filtros, agrupar_por,
+                cantidad=func.count(Pago.id),
+                total=func.coalesce(func.sum(Pago.monto), 0)
+            )
+
+        siguiente = None
+        if incluir_detalle:
+            reporte["detalle"], siguiente = paginar_por_cursor(
+                self.db.query(Pago).filter(*filtros),
+                Pago.fecha_pago, Pago.id, cursor, limit, descendente=False
+            )
 
-        # Clientes con saldo negativo
-        clientes_deudores = self.db.query(Cliente).filter(
+        return reporte, siguiente
+
+    # Tramos de antigüedad de la deuda: (etiqueta, días máximos inclusive)
+    TRAMOS_ANTIGUEDAD = (("0-30", 30), ("31-60", 60), ("61-90", 90), ("90+", None))
+
+    def _tramo_antiguedad(self, dias: int) -> str:
+        """Etiqueta del tramo de antigüedad que corresponde a `dias`"""
+        for etiqueta, hasta in self.TRAMOS_ANTIGUEDAD:
+            if hasta is None or dias <= hasta:
+                return etiqueta
+
+    def iterar_deudores(self, fecha_corte: date, tamano_lote: int = 500) -> Iterator[dict]:
+        """
+        Recorre los clientes deudores con una única consulta, en streaming
+
+        La fecha del comprobante impago más antiguo de cada cliente sale de un
+        MIN(fecha_emision) agrupado por cliente unido a clientes, en lugar de
+        una consulta por deudor. Ordena por deuda descendente.
+
+        Args:
+            fecha_corte: Fecha contra la que se calcula la antigüedad
+            tamano_lote: Filas que se traen por vez del cursor del servidor
+
+        Yields:
+            dict con los datos del deudor, su deuda, antigüedad y tramo
+        """
+        mas_antiguo = self.db.query(
+            Comprobante.cliente_id,
+            func.min(Comprobante.fecha_emision).label("fecha_mas_antigua")
+        ).filter(
+            Comprobante.estado.in_([EstadoComprobanteEnum.EMITIDO, EstadoComprobanteEnum.VENCIDO, EstadoComprobanteEnum.PAGADO_PARCIAL])
+        ).group_by(Comprobante.cliente_id).subquery()
+
+        filas = self.db.query(
+            Cliente.id,
+            Cliente.nombre,
+            Cliente.apellido,
+            Cliente.dni,
+            Cliente.telefono,
+            Cliente.email,
+            Cliente.saldo,
+            Cliente.estado_cuenta,
+            mas_antiguo.c.fecha_mas_antigua
+        ).outerjoin(
+            mas_antiguo, mas_antiguo.c.cliente_id == Cliente.id
+        ).filter(
             Cliente.saldo < 0,
             Cliente.activo == True
-        ).all()
-
-        deudores = []
-        total_deuda = Decimal("0")
-
-        for cliente in clientes_deudores:
-            deuda = abs(cliente.saldo)
-            total_deuda += deuda
-
-            # Obtener comprobante más antiguo pendiente
-            comprobante_antiguo = self.db.query(Comprobante).filter(
-                Comprobante.cliente_id == cliente.id,
-                Comprobante.estado.in_([EstadoComprobanteEnum.EMITIDO, EstadoComprobanteEnum.VENCIDO, EstadoComprobanteEnum.PAGADO_PARCIAL])
-            ).order_by(Comprobante.fecha_emision).first()
-
-            antiguedad_dias = 0
-            if comprobante_antiguo:
-                antiguedad_dias = (fecha_corte - comprobante_antiguo.fecha_emision).days
-
-            deudores.append({
-                "cliente_id": str(cliente.id),
-                "nombre": f"{cliente.nombre} {cliente.apellido}",
-                "dni": cliente.dni,
-                "telefono": cliente.telefono,
-                "email": cliente.email,
-                "deuda": deuda,
+        ).order_by(Cliente.saldo, Cliente.id).yield_per(tamano_lote)
+
+        for fila in filas:
+            antiguedad_dias = (fecha_corte - fila.fecha_mas_antigua).days if fila.fecha_mas_antigua else 0
+            yield {
+                "cliente_id": str(fila.id),
+                "nombre": f"{fila.nombre} {fila.apellido}",
+                "dni": fila.dni,
+                "telefono": fila.telefono,
+                "email": fila.email,
+                "deuda": abs(fila.saldo),
                 "antiguedad_dias": antiguedad_dias,
-                "estado_cuenta": cliente.estado_cuenta.value
-            })
+                "tramo": self._tramo_antiguedad(antiguedad_dias),
+                "estado_cuenta": fila.estado_cuenta.value
+            }
 
-        # Ordenar por deuda descendente
-        deudores.sort(key=lambda x: x["deuda"], reverse=True)
+    def reporte_deudores(self, fecha_corte: Optional[date] = None) -> dict:
+        """Genera reporte de deudores, con totales por tramo de antigüedad"""
+        if not fecha_corte:
+            fecha_corte = date.today()
+
+        deudores = list(self.iterar_deudores(fecha_corte))
+
+        por_antiguedad = {
+            etiqueta: {"cantidad": 0, "deuda": Decimal("0")}
+            for etiqueta, _ in self.TRAMOS_ANTIGUEDAD
+        }
+        for deudor in deudores:
+            tramo = por_antiguedad[deudor["tramo"]]
+            tramo["cantidad"] += 1
+            tramo["deuda"] += deudor["deuda"]
 
         return {
             "fecha_corte": fecha_corte,
-            "total_deuda": total_deuda,
+            "total_deuda": sum((d["deuda"] for d in deudores), Decimal("0")),
             "cantidad_deudores": len(deudores),
+            "por_antiguedad": por_antiguedad,
             "deudores": deudores
         }
 
@@ -0,0 +1,280 @@
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import and_, case, cast, func, insert, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.cliente import Cliente, EstadoCuentaEnum
+from app.models.comprobante import MovimientoCuenta, SaldoCuentaCheckpoint
+from app.services import dashboard_service
+
+logger = logging.getLogger(__name__)
+
+
+# ========== AGREGADOS DEL LEDGER ==========
+
+def _agregados_movimientos():
+    """Columnas agregadas de movimientos_cuenta: débitos, créditos y cantidad."""
+    return (
+        func.coalesce(func.sum(case((MovimientoCuenta.tipo == "debito", MovimientoCuenta.monto))), 0).label("debitos"),
+        func.coalesce(func.sum(case((MovimientoCuenta.tipo != "debito", MovimientoCuenta.monto))), 0).label("creditos"),
+        func.count(MovimientoCuenta.id).label("cantidad"),
+    )
+
+
+def _ultimos_checkpoints():
+    """Subconsulta con el checkpoint más reciente de cada cliente."""
+    return select(SaldoCuentaCheckpoint).distinct(
+        SaldoCuentaCheckpoint.cliente_id
+    ).order_by(
+        SaldoCuentaCheckpoint.cliente_id,
+        SaldoCuentaCheckpoint.hasta.desc(),
+        SaldoCuentaCheckpoint.hasta_movimiento_id.desc()
+    ).subquery()
+
+
+def _posterior_a(checkpoint):
+    """Predicado: movimiento posterior al último incluido en `checkpoint`."""
+    return tuple_(MovimientoCuenta.created_at, MovimientoCuenta.id) > tuple_(
+        checkpoint.hasta, checkpoint.hasta_movimiento_id
+    )
+
+
+# ========== LECTURA ==========
+
+def obtener_saldo(db: Session, cliente_id: UUID) -> Dict[str, Any]:
+    """
+    Saldo de la cuenta corriente de un cliente: último checkpoint más delta.
+
+    Solo suma los movimientos posteriores al checkpoint, por lo que el costo
+    no crece con la historia del cliente.
+
+    Args:
+        db: Sesión de base de datos
+        cliente_id: ID del cliente
+
+    Returns:
+        Dict con saldo, total_debitos, total_creditos y cantidad_movimientos
+    """
+    checkpoint = db.query(SaldoCuentaCheckpoint).filter(
+        SaldoCuentaCheckpoint.cliente_id == cliente_id
+    ).order_by(
+        SaldoCuentaCheckpoint.hasta.desc(),
+        SaldoCuentaCheckpoint.hasta_movimiento_id.desc()
+    ).first()
+
+    delta = db.query(*_agregados_movimientos()).filter(MovimientoCuenta.cliente_id == cliente_id)
+    if checkpoint:
+        delta = delta.filter(_posterior_a(checkpoint))
+    delta = delta.one()
+
+    debitos = Decimal(delta.debitos) + (checkpoint.total_debitos if checkpoint else 0)
+    creditos = Decimal(delta.creditos) + (checkpoint.total_creditos if checkpoint else 0)
+    return {
+        "saldo": creditos - debitos,
+        "total_debitos": debitos,
+        "total_creditos": creditos,
+        "cantidad_movimientos": delta.cantidad + (checkpoint.cantidad_movimientos if checkpoint else 0),
+    }
+
+
+# ========== CHECKPOINTS ==========
+
+def generar_checkpoints(db: Session, margen_segundos: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Genera un checkpoint nuevo para cada cliente con movimientos desde el último.
+
+    Es incremental: cada checkpoint es el anterior más los movimientos
+    posteriores, agregados en una sola consulta para todos los clientes.
+    Solo se incluyen movimientos más viejos que el margen, así un movimiento
+    de una transacción en curso no queda detrás de un checkpoint ya escrito.
+
+    Args:
+        db: Sesión de base de datos
+        margen_segundos: Antigüedad mínima de los movimientos a incluir
+            (por defecto settings.CUENTA_CHECKPOINT_MARGEN_SEGUNDOS)
+
+    Returns:
+        Dict con la cantidad de checkpoints generados y la fecha de corte
+    """
+    if margen_segundos is None:
+        margen_segundos = settings.CUENTA_CHECKPOINT_MARGEN_SEGUNDOS
+    corte = datetime.utcnow() - timedelta(seconds=margen_segundos)
+
+    ultimo = _ultimos_checkpoints()
+    filas = db.execute(
+        select(
+            MovimientoCuenta.cliente_id,
+            *_agregados_movimientos(),
+            func.max(MovimientoCuenta.created_at).label("hasta"),
+            func.array_agg(aggregate_order_by(
+                MovimientoCuenta.id, MovimientoCuenta.created_at.desc(), MovimientoCuenta.id.desc()
+            ))[1].label("hasta_movimiento_id"),
+            ultimo.c.total_debitos,
+            ultimo.c.total_creditos,
+            ultimo.c.cantidad_movimientos,
+        ).outerjoin(
+            ultimo, ultimo.c.cliente_id == MovimientoCuenta.cliente_id
+        ).where(
+            MovimientoCuenta.created_at < corte,
+            or_(ultimo.c.id.is_(None), _posterior_a(ultimo.c))
+        ).group_by(
+            MovimientoCuenta.cliente_id,
+            ultimo.c.total_debitos,
+            ultimo.c.total_creditos,
+            ultimo.c.cantidad_movimientos
+        )
+    ).all()
+
+    checkpoints = []
+    for fila in filas:
+        debitos = fila.debitos + (fila.total_debitos or 0)
+        creditos = fila.creditos + (fila.total_creditos or 0)
+        checkpoints.append({
+            "cliente_id": fila.cliente_id,
+            "hasta": fila.hasta,
+            "hasta_movimiento_id": fila.hasta_movimiento_id,
+            "saldo": creditos - debitos,
+            "total_debitos": debitos,
+            "total_creditos": creditos,
+            "cantidad_movimientos": fila.cantidad + (fila.cantidad_movimientos or 0),
+        })
+
+    if checkpoints:
+        db.execute(insert(SaldoCuentaCheckpoint), checkpoints)
+    db.commit()
+
+    return {"checkpoints_generados": len(checkpoints), "corte": corte}
+
+
+# ========== CONCILIACIÓN ==========
+
+def _estado_cuenta_sql(saldo):
+    """Expresión SQL equivalente a cliente_service.estado_cuenta_segun_saldo."""
+    return cast(case(
+        (saldo < -settings.CLIENTE_UMBRAL_MOROSIDAD, EstadoCuentaEnum.MOROSO.name),
+        (saldo < 0, EstadoCuentaEnum.DEBE.name),
+        else_=EstadoCuentaEnum.AL_DIA.name
+    ), Cliente.estado_cuenta.type)
+
+
+def _alinear_saldos(db: Session, cliente_ids: List[UUID]) -> None:
+    """
+    Alinea Cliente.saldo con el ledger para los clientes indicados, sin commit.
+
+    Primero bloquea las filas de los clientes (como registrar_movimiento), así
+    ningún movimiento nuevo puede commitearse en el medio; después recalcula
+    el saldo desde movimientos_cuenta en el mismo UPDATE, con una lectura
+    posterior al bloqueo. Un valor leído antes nunca pisa un movimiento.
+    """
+    db.execute(
+        select(Cliente.id).where(Cliente.id.in_(cliente_ids)).order_by(Cliente.id).with_for_update()
+    ).all()
+
+    saldo_ledger = select(
+        func.coalesce(func.sum(case(
+            (MovimientoCuenta.tipo == "debito", -MovimientoCuenta.monto),
+            else_=MovimientoCuenta.monto
+        )), 0)
+    ).where(MovimientoCuenta.cliente_id == Cliente.id).scalar_subquery()
+
+    db.execute(
+        update(Cliente).where(
+            Cliente.id.in_(cliente_ids),
+            Cliente.saldo != saldo_ledger
+        ).values(
+            saldo=saldo_ledger,
+            estado_cuenta=_estado_cuenta_sql(saldo_ledger)
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def conciliar(db: Session, reparar: bool = False) -> Dict[str, Any]:
+    """
+    Verifica los checkpoints y Cliente.saldo contra el ledger completo.
+
+    Recalcula desde movimientos_cuenta los acumulados hasta el último
+    checkpoint de cada cliente y el saldo total de cada cliente, y reporta
+    las diferencias.
+
+    Args:
+        db: Sesión de base de datos
+        reparar: Si es True, borra los checkpoints de los clientes con
+            diferencias (el próximo `generar_checkpoints` los rehace desde el
+            ledger) y alinea Cliente.saldo con el ledger
+
+    Returns:
+        Dict con los clientes verificados y las diferencias encontradas
+    """
+    ultimo = _ultimos_checkpoints()
+    debitos, creditos, cantidad = _agregados_movimientos()
+    checkpoints_inconsistentes = db.execute(
+        select(
+            ultimo.c.cliente_id,
+            ultimo.c.saldo,
+            ultimo.c.cantidad_movimientos,
+            debitos,
+            creditos,
+            cantidad
+        ).outerjoin(
+            MovimientoCuenta,
+            and_(
+                MovimientoCuenta.cliente_id == ultimo.c.cliente_id,
+                tuple_(MovimientoCuenta.created_at, MovimientoCuenta.id) <= tuple_(ultimo.c.hasta, ultimo.c.hasta_movimiento_id)
+            )
+        ).group_by(
+            ultimo.c.cliente_id, ultimo.c.saldo, ultimo.c.total_debitos,
+            ultimo.c.total_creditos, ultimo.c.cantidad_movimientos
+        ).having(
+            or_(
+                ultimo.c.total_debitos != debitos,
+                ultimo.c.total_creditos != creditos,
+                ultimo.c.cantidad_movimientos != cantidad
+            )
+        )
+    ).all()
+
+    ledger = select(
+        MovimientoCuenta.cliente_id, *_agregados_movimientos()
+    ).group_by(MovimientoCuenta.cliente_id).subquery()
+    saldo_ledger = func.coalesce(ledger.c.creditos, 0) - func.coalesce(ledger.c.debitos, 0)
+    saldos_inconsistentes = db.execute(
+        select(Cliente.id, Cliente.saldo, saldo_ledger.label("saldo_ledger")).outerjoin(
+            ledger, ledger.c.cliente_id == Cliente.id
+        ).where(Cliente.saldo != saldo_ledger)
+    ).all()
+
+    for fila in checkpoints_inconsistentes:
+        logger.warning(
+            f"Checkpoint de saldo inconsistente para cliente {fila.cliente_id}: "
+            f"checkpoint ${fila.saldo} ({fila.cantidad_movimientos} movimientos), "
+            f"ledger ${fila.creditos - fila.debitos} ({fila.cantidad} movimientos)"
+        )
+    for fila in saldos_inconsistentes:
+        logger.warning(
+            f"Saldo de cliente {fila.id} no coincide con el ledger: "
+            f"${fila.saldo} vs ${fila.saldo_ledger}"
+        )
+
+    if reparar and (checkpoints_inconsistentes or saldos_inconsistentes):
+        if checkpoints_inconsistentes:
+            db.query(SaldoCuentaCheckpoint).filter(
+                SaldoCuentaCheckpoint.cliente_id.in_([f.cliente_id for f in checkpoints_inconsistentes])
+            ).delete(synchronize_session=False)
+        if saldos_inconsistentes:
+            _alinear_saldos(db, [f.id for f in saldos_inconsistentes])
+        db.commit()
+        if saldos_inconsistentes:
+            dashboard_service.invalidar_cache("clientes")
+
+    return {
+        "clientes_verificados": db.query(func.count(Cliente.id)).scalar(),
+        "checkpoints_inconsistentes": [str(f.cliente_id) for f in checkpoints_inconsistentes],
+        "saldos_inconsistentes": [str(f.id) for f in saldos_inconsistentes],
+        "reparado": reparar,
+    }
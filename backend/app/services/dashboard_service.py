@@ -1,8 +1,16 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, and_, or_, select, true
+from sqlalchemy.sql import Select
+from contextlib import asynccontextmanager
 from datetime import date, datetime, timedelta
-from typing import Dict, Any, List
+from decimal import Decimal
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List
+from uuid import UUID
 
+from app.core.cache import get_cache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
 from app.models.caballo import Caballo, EstadoCaballoEnum
 from app.models.cliente import Cliente, EstadoCuentaEnum
 from app.models.empleado import Empleado
@@ -11,134 +19,352 @@ from app.models.pago import Pago, EstadoPagoEnum
 from app.models.alerta import Alerta
 
 
-def obtener_estadisticas_generales(db: Session) -> Dict[str, Any]:
+# ========== AGREGADOS ==========
+# Cada agregado es un SELECT que devuelve una única fila con varios contadores
+# calculados mediante agregados condicionales (COUNT/SUM ... FILTER). Se
+# combinan con _ejecutar_agregados para resolver todo el dashboard en un solo
+# round-trip a la base de datos.
+#
+# Las lecturas usan AsyncSession (get_async_db) para no bloquear el event loop
+# mientras se espera a PostgreSQL.
+
+def _rango_mes(hoy: date) -> tuple:
+    """Retorna (inicio, fin) del mes de `hoy`, con fin exclusivo."""
+    inicio_mes = hoy.replace(day=1)
+    fin_mes = (inicio_mes + timedelta(days=32)).replace(day=1)
+    return inicio_mes, fin_mes
+
+
+def _agregado_caballos() -> Select:
+    """Contadores sobre caballos."""
+    return select(
+        func.count(Caballo.id).label("total_caballos"),
+    ).where(Caballo.estado == EstadoCaballoEnum.ACTIVO)
+
+
+def _agregado_empleados() -> Select:
+    """Contadores sobre empleados."""
+    return select(
+        func.count(Empleado.id).label("total_empleados"),
+    ).where(Empleado.activo == True)
+
+
+def _agregado_clientes() -> Select:
+    """Contadores sobre clientes activos, agrupados por estado de cuenta."""
+    return select(
+        func.count(Cliente.id).label("total_clientes"),
+        func.count(Cliente.id).filter(
+            Cliente.estado_cuenta == EstadoCuentaEnum.AL_DIA
+        ).label("clientes_al_dia"),
+        func.count(Cliente.id).filter(
+            Cliente.estado_cuenta == EstadoCuentaEnum.MOROSO
+        ).label("clientes_morosos"),
+        func.count(Cliente.id).filter(
+            Cliente.estado_cuenta == EstadoCuentaEnum.DEBE
+        ).label("clientes_debe"),
+    ).where(Cliente.activo == True)
+
+
+def _agregado_eventos(hoy: date) -> Select:
+    """Contadores sobre eventos del mes, de la semana y del día."""
+    inicio_mes, fin_mes = _rango_mes(hoy)
+    fin_semana = hoy + timedelta(days=7)
+
+    en_mes = and_(Evento.fecha_inicio >= inicio_mes, Evento.fecha_inicio < fin_mes)
+    en_semana = and_(
+        Evento.fecha_inicio >= hoy,
+        Evento.fecha_inicio <= fin_semana,
+        Evento.estado == EstadoEventoEnum.PROGRAMADO
+    )
+    en_hoy = and_(
+        func.date(Evento.fecha_inicio) == hoy,
+        Evento.estado == EstadoEventoEnum.PROGRAMADO
+    )
+
+    return select(
+        func.count(Evento.id).filter(en_mes).label("total_eventos_mes"),
+        func.count(Evento.id).filter(en_semana).label("eventos_semana"),
+        func.count(Evento.id).filter(en_hoy).label("eventos_hoy"),
+    ).where(or_(en_mes, en_semana))
+
+
+def _agregado_pagos(hoy: date) -> Select:
+    """Sumas y contadores sobre pagos del mes y pagos vencidos."""
+    inicio_mes, fin_mes = _rango_mes(hoy)
+
+    del_mes = and_(Pago.created_at >= inicio_mes, Pago.created_at < fin_mes)
+    vencido = and_(
+        Pago.fecha_vencimiento < hoy,
+        Pago.estado.in_([EstadoPagoEnum.PENDIENTE, EstadoPagoEnum.VENCIDO])
+    )
+
+    return select(
+        func.coalesce(
+            func.sum(Pago.monto).filter(and_(del_mes, Pago.estado == EstadoPagoEnum.PAGADO)), 0
+        ).label("total_cobrado_mes"),
+        func.coalesce(
+            func.sum(Pago.monto).filter(and_(del_mes, Pago.estado == EstadoPagoEnum.PENDIENTE)), 0
+        ).label("total_pendiente_mes"),
+        func.count(Pago.id).filter(del_mes).label("cantidad_pagos_mes"),
+        func.count(Pago.id).filter(vencido).label("cantidad_pagos_vencidos"),
+    ).where(or_(del_mes, vencido))
+
+
+def _agregado_cobranzas(hoy: date) -> Select:
+    """Pagos pendientes e ingresos cobrados en el mes (resumen de reportes)."""
+    inicio_mes, fin_mes = _rango_mes(hoy)
+
+    pendiente = Pago.estado == EstadoPagoEnum.PENDIENTE
+    cobrado_mes = and_(
+        Pago.fecha_pago >= inicio_mes,
+        Pago.fecha_pago < fin_mes,
+        Pago.estado == EstadoPagoEnum.PAGADO
+    )
+
+    return select(
+        func.count(Pago.id).filter(pendiente).label("pagos_pendientes"),
+        func.coalesce(func.sum(Pago.monto).filter(cobrado_mes), 0).label("ingresos_mes"),
+    ).where(or_(pendiente, cobrado_mes))
+
+
+async def _ejecutar_agregados(db: AsyncSession, *agregados: Select) -> Dict[str, Any]:
     """
-    Obtiene estadísticas generales del sistema.
+    Ejecuta varios agregados de una fila en una única sentencia.
+
+    Los agregados se combinan como subconsultas unidas con `ON true`, de modo
+    que la base de datos recorre cada tabla una sola vez y devuelve una fila
+    con todas las columnas.
+
+    Args:
+        db: Sesión de base de datos
+        *agregados: SELECTs que devuelven exactamente una fila
 
     Returns:
-        Dict con contadores generales
+        Dict con el valor de cada columna etiquetada
     """
-    return {
-        "total_caballos": db.query(Caballo).filter(Caballo.estado == EstadoCaballoEnum.ACTIVO).count(),
-        "total_clientes": db.query(Cliente).filter(Cliente.activo == True).count(),
-        "total_empleados": db.query(Empleado).filter(Empleado.activo == True).count(),
-        "total_eventos_mes": db.query(Evento).filter(
-            and_(
-                Evento.fecha_inicio >= date.today().replace(day=1),
-                Evento.fecha_inicio < (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
-            )
-        ).count(),
-    }
+    subconsultas = [agregado.subquery() for agregado in agregados]
+
+    stmt = select(*[columna for sq in subconsultas for columna in sq.c]).select_from(subconsultas[0])
+    for sq in subconsultas[1:]:
+        stmt = stmt.join(sq, true())
+
+    return dict((await db.execute(stmt)).mappings().one())
+
+
+# ========== SNAPSHOTS EN CACHE ==========
+# Los agregados y las listas del dashboard se guardan en cache con TTL
+# (settings.DASHBOARD_CACHE_TTL_SECONDS). Las claves incluyen la fecha para que
+# los rangos "hoy"/"mes" nunca se sirvan de un día anterior. Los servicios que
+# escriben llaman a invalidar_cache() con el dominio afectado.
+# Las lecturas van a la réplica (si está configurada): si se recalcula justo
+# después de una invalidación, el snapshot puede reflejar el retraso de
+# replicación hasta que vence el TTL.
 
+_AGREGADOS: Dict[str, Callable[[date], Select]] = {
+    "caballos": lambda hoy: _agregado_caballos(),
+    "clientes": lambda hoy: _agregado_clientes(),
+    "empleados": lambda hoy: _agregado_empleados(),
+    "eventos": _agregado_eventos,
+    "pagos": _agregado_pagos,
+    "cobranzas": _agregado_cobranzas,
+}
 
-def obtener_estadisticas_pagos(db: Session) -> Dict[str, Any]:
+# Entradas del snapshot afectadas por escrituras en cada dominio
+_DEPENDENCIAS = {
+    "caballos": ["caballos"],
+    "clientes": ["clientes", "pagos_criticos"],
+    "empleados": ["empleados"],
+    "eventos": ["eventos", "proximos_eventos"],
+    "pagos": ["pagos", "cobranzas", "pagos_criticos"],
+}
+
+# Las listas se guardan con este tamaño y se recortan al límite pedido
+_LIMITE_SNAPSHOT = 20
+
+
+def _clave_cache(hoy: date, nombre: str) -> str:
+    return f"dashboard:{hoy.isoformat()}:{nombre}"
+
+
+@asynccontextmanager
+async def _sesion_para_cache(db: AsyncSession) -> AsyncIterator[AsyncSession]:
     """
-    Obtiene estadísticas sobre pagos.
+    Sesión con la que se recalcula lo que se guarda en la cache.
 
-    Returns:
-        Dict con estadísticas de pagos
+    invalidar_cache borra las entradas después de cada commit en el primario;
+    si el recálculo leyera la réplica (que puede ir atrasada), volvería a
+    cachear datos anteriores a la escritura por todo el TTL. Por eso los
+    misses se recalculan en el primario, a lo sumo una vez por clave y TTL.
+    Sin DATABASE_REPLICA_URL, `db` ya es el primario.
     """
-    # Pagos del mes actual
-    inicio_mes = date.today().replace(day=1)
-    fin_mes = (inicio_mes + timedelta(days=32)).replace(day=1)
+    if not settings.DATABASE_REPLICA_URL:
+        yield db
+        return
+    async with AsyncSessionLocal() as primaria:
+        yield primaria
 
-    pagos_mes = db.query(Pago).filter(
-        and_(
-            Pago.created_at >= inicio_mes,
-            Pago.created_at < fin_mes
-        )
-    ).all()
 
-    # Calcular totales
-    total_mes = sum(float(p.monto) for p in pagos_mes if p.estado == EstadoPagoEnum.PAGADO)
-    pendiente_mes = sum(float(p.monto) for p in pagos_mes if p.estado == EstadoPagoEnum.PENDIENTE)
+async def _obtener_agregados(db: AsyncSession, hoy: date, *nombres: str) -> Dict[str, Any]:
+    """
+    Obtiene los agregados pedidos desde la cache.
 
-    # Pagos vencidos
-    pagos_vencidos = db.query(Pago).filter(
-        and_(
-            Pago.fecha_vencimiento < date.today(),
-            Pago.estado.in_([EstadoPagoEnum.PENDIENTE, EstadoPagoEnum.VENCIDO])
-        )
-    ).count()
+    Los que no están en cache se calculan juntos en una única sentencia (en el
+    primario, ver _sesion_para_cache) y se guardan para las siguientes lecturas.
+    """
+    cache = get_cache()
+    claves = {nombre: _clave_cache(hoy, nombre) for nombre in nombres}
+    en_cache = await cache.aget_many(claves.values())
+
+    datos: Dict[str, Any] = {}
+    faltantes = []
+    for nombre, clave in claves.items():
+        if clave in en_cache:
+            datos.update(en_cache[clave])
+        else:
+            faltantes.append(nombre)
+
+    if faltantes:
+        agregados = {nombre: _AGREGADOS[nombre](hoy) for nombre in faltantes}
+        async with _sesion_para_cache(db) as sesion:
+            calculados = await _ejecutar_agregados(sesion, *agregados.values())
+
+        nuevos = {}
+        for nombre, agregado in agregados.items():
+            valores = {
+                columna: float(calculados[columna]) if isinstance(calculados[columna], Decimal) else calculados[columna]
+                for columna in agregado.selected_columns.keys()
+            }
+            nuevos[claves[nombre]] = valores
+            datos.update(valores)
+
+        await cache.aset_many(nuevos, settings.DASHBOARD_CACHE_TTL_SECONDS)
+
+    return datos
+
+
+async def _obtener_lista(
+    db: AsyncSession,
+    hoy: date,
+    nombre: str,
+    limite: int,
+    calcular: Callable[[AsyncSession, int], Awaitable[List[Dict[str, Any]]]]
+) -> List[Dict[str, Any]]:
+    """Obtiene una lista del dashboard desde la cache, recortada a `limite`."""
+    if limite > _LIMITE_SNAPSHOT:
+        return await calcular(db, limite)
+
+    cache = get_cache()
+    clave = _clave_cache(hoy, nombre)
+    en_cache = await cache.aget_many([clave])
+    if clave in en_cache:
+        return en_cache[clave][:limite]
+
+    async with _sesion_para_cache(db) as sesion:
+        lista = await calcular(sesion, _LIMITE_SNAPSHOT)
+    await cache.aset_many({clave: lista}, settings.DASHBOARD_CACHE_TTL_SECONDS)
+    return lista[:limite]
+
+
+def invalidar_cache(*dominios: str) -> None:
+    """
+    Invalida las entradas del dashboard afectadas por escrituras en los dominios
+    indicados ("caballos", "clientes", "empleados", "eventos", "pagos").
 
-    return {
-        "total_cobrado_mes": total_mes,
-        "total_pendiente_mes": pendiente_mes,
-        "cantidad_pagos_mes": len(pagos_mes),
-        "cantidad_pagos_vencidos": pagos_vencidos,
+    Debe llamarse después del commit, para que una lectura concurrente no vuelva
+    a guardar datos anteriores a la escritura.
+    """
+    hoy = date.today()
+    claves = {
+        _clave_cache(hoy, nombre)
+        for dominio in dominios
+        for nombre in _DEPENDENCIAS.get(dominio, [])
     }
+    if claves:
+        get_cache().delete(*claves)
 
 
-def obtener_estadisticas_clientes(db: Session) -> Dict[str, Any]:
+async def obtener_estadisticas_generales(db: AsyncSession) -> Dict[str, Any]:
     """
-    Obtiene estadísticas sobre clientes.
+    Obtiene estadísticas generales del sistema.
 
     Returns:
-        Dict con estadísticas de clientes
+        Dict con contadores generales
     """
-    # Clientes por estado de cuenta
-    clientes_al_dia = db.query(Cliente).filter(
-        and_(
-            Cliente.activo == True,
-            Cliente.estado_cuenta == EstadoCuentaEnum.AL_DIA
-        )
-    ).count()
+    datos = await _obtener_agregados(db, date.today(), "caballos", "clientes", "empleados", "eventos")
+    return _armar_estadisticas_generales(datos)
 
-    clientes_morosos = db.query(Cliente).filter(
-        and_(
-            Cliente.activo == True,
-            Cliente.estado_cuenta == EstadoCuentaEnum.MOROSO
-        )
-    ).count()
 
-    clientes_debe = db.query(Cliente).filter(
-        and_(
-            Cliente.activo == True,
-            Cliente.estado_cuenta == EstadoCuentaEnum.DEBE
-        )
-    ).count()
+async def obtener_estadisticas_pagos(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Obtiene estadísticas sobre pagos.
 
-    return {
-        "clientes_al_dia": clientes_al_dia,
-        "clientes_morosos": clientes_morosos,
-        "clientes_debe": clientes_debe,
-    }
+    Returns:
+        Dict con estadísticas de pagos
+    """
+    datos = await _obtener_agregados(db, date.today(), "pagos")
+    return _armar_estadisticas_pagos(datos)
 
 
-def obtener_estadisticas_eventos(db: Session) -> Dict[str, Any]:
+async def obtener_estadisticas_clientes(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Obtiene estadísticas sobre clientes.
+
+    Returns:
+        Dict con estadísticas de clientes
+    """
+    datos = await _obtener_agregados(db, date.today(), "clientes")
+    return _armar_estadisticas_clientes(datos)
+
+
+async def obtener_estadisticas_eventos(db: AsyncSession) -> Dict[str, Any]:
     """
     Obtiene estadísticas sobre eventos.
 
     Returns:
         Dict con estadísticas de eventos
     """
-    hoy = date.today()
-    fin_semana = hoy + timedelta(days=7)
+    datos = await _obtener_agregados(db, date.today(), "eventos")
+    return _armar_estadisticas_eventos(datos)
 
-    # Eventos de esta semana
-    eventos_semana = db.query(Evento).filter(
-        and_(
-            Evento.fecha_inicio >= hoy,
-            Evento.fecha_inicio <= fin_semana,
-            Evento.estado == EstadoEventoEnum.PROGRAMADO
-        )
-    ).count()
 
-    # Eventos hoy
-    eventos_hoy = db.query(Evento).filter(
-        and_(
-            func.date(Evento.fecha_inicio) == hoy,
-            Evento.estado == EstadoEventoEnum.PROGRAMADO
-        )
-    ).count()
+def _armar_estadisticas_generales(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Da forma a los contadores generales."""
+    return {
+        "total_caballos": datos["total_caballos"],
+        "total_clientes": datos["total_clientes"],
+        "total_empleados": datos["total_empleados"],
+        "total_eventos_mes": datos["total_eventos_mes"],
+    }
+
 
+def _armar_estadisticas_pagos(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Da forma a las estadísticas de pagos."""
     return {
-        "eventos_hoy": eventos_hoy,
-        "eventos_semana": eventos_semana,
+        "total_cobrado_mes": float(datos["total_cobrado_mes"]),
+        "total_pendiente_mes": float(datos["total_pendiente_mes"]),
+        "cantidad_pagos_mes": datos["cantidad_pagos_mes"],
+        "cantidad_pagos_vencidos": datos["cantidad_pagos_vencidos"],
     }
 
 
-def obtener_alertas_recientes(db: Session, usuario_id: str, limite: int = 5) -> List[Dict[str, Any]]:
+def _armar_estadisticas_clientes(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Da forma a las estadísticas de clientes."""
+    return {
+        "clientes_al_dia": datos["clientes_al_dia"],
+        "clientes_morosos": datos["clientes_morosos"],
+        "clientes_debe": datos["clientes_debe"],
+    }
+
+
+def _armar_estadisticas_eventos(datos: Dict[str, Any]) -> Dict[str, Any]:
+    """Da forma a las estadísticas de eventos."""
+    return {
+        "eventos_hoy": datos["eventos_hoy"],
+        "eventos_semana": datos["eventos_semana"],
+    }
+
+
+async def obtener_alertas_recientes(db: AsyncSession, usuario_id: UUID, limite: int = 5) -> List[Dict[str, Any]]:
     """
     Obtiene las alertas más recientes de un usuario.
 
@@ -150,9 +376,11 @@ def obtener_alertas_recientes(db: Session, usuario_id: str, limite: int = 5) ->
     Returns:
         Lista de alertas
     """
-    alertas = db.query(Alerta).filter(
-        Alerta.usuario_id == usuario_id
-    ).order_by(Alerta.created_at.desc()).limit(limite).all()
+    alertas = (await db.scalars(
+        select(Alerta).where(
+            Alerta.usuario_id == usuario_id
+        ).order_by(Alerta.created_at.desc()).limit(limite)
+    )).all()
 
     return [
         {
@@ -169,7 +397,7 @@ def obtener_alertas_recientes(db: Session, usuario_id: str, limite: int = 5) ->
     ]
 
 
-def obtener_proximos_eventos(db: Session, limite: int = 5) -> List[Dict[str, Any]]:
+async def obtener_proximos_eventos(db: AsyncSession, limite: int = 5) -> List[Dict[str, Any]]:
     """
     Obtiene los próximos eventos programados.
 
@@ -180,12 +408,36 @@ def obtener_proximos_eventos(db: Session, limite: int = 5) -> List[Dict[str, Any
     Returns:
         Lista de eventos
     """
-    eventos = db.query(Evento).filter(
+    return await _obtener_lista(db, date.today(), "proximos_eventos", limite, _calcular_proximos_eventos)
+
+
+async def _calcular_proximos_eventos(db: AsyncSession, limite: int) -> List[Dict[str, Any]]:
+    """Calcula los próximos eventos con sus inscriptos, sin pasar por la cache."""
+    proximos = select(Evento.id).where(
         and_(
             Evento.fecha_inicio >= datetime.now(),
             Evento.estado == EstadoEventoEnum.PROGRAMADO
         )
-    ).order_by(Evento.fecha_inicio).limit(limite).all()
+    ).order_by(Evento.fecha_inicio).limit(limite).subquery()
+
+    # Inscriptos por evento, agrupados en una sola subconsulta
+    inscritos = select(
+        InscripcionEvento.evento_id,
+        func.count(InscripcionEvento.id).label("inscritos")
+    ).where(
+        InscripcionEvento.evento_id.in_(select(proximos.c.id))
+    ).group_by(InscripcionEvento.evento_id).subquery()
+
+    filas = (await db.execute(
+        select(
+            Evento,
+            func.coalesce(inscritos.c.inscritos, 0)
+        ).join(
+            proximos, proximos.c.id == Evento.id
+        ).outerjoin(
+            inscritos, inscritos.c.evento_id == Evento.id
+        ).order_by(Evento.fecha_inicio)
+    )).all()
 
     return [
         {
@@ -196,15 +448,13 @@ def obtener_proximos_eventos(db: Session, limite: int = 5) -> List[Dict[str, Any
             "fecha_fin": evento.fecha_fin.isoformat(),
             "ubicacion": evento.ubicacion,
             "capacidad_maxima": evento.capacidad_maxima,
-            "inscritos": db.query(InscripcionEvento).filter(
-                InscripcionEvento.evento_id == evento.id
-            ).count(),
+            "inscritos": cantidad_inscritos,
         }
-        for evento in eventos
+        for evento, cantidad_inscritos in filas
     ]
 
 
-def obtener_pagos_pendientes_criticos(db: Session, limite: int = 5) -> List[Dict[str, Any]]:
+async def obtener_pagos_pendientes_criticos(db: AsyncSession, limite: int = 5) -> List[Dict[str, Any]]:
     """
     Obtiene los pagos pendientes más críticos (más vencidos).
 
@@ -215,12 +465,21 @@ def obtener_pagos_pendientes_criticos(db: Session, limite: int = 5) -> List[Dict
     Returns:
         Lista de pagos
     """
-    pagos = db.query(Pago).filter(
-        and_(
-            Pago.fecha_vencimiento < date.today(),
-            Pago.estado.in_([EstadoPagoEnum.PENDIENTE, EstadoPagoEnum.VENCIDO])
-        )
-    ).order_by(Pago.fecha_vencimiento).limit(limite).all()
+    return await _obtener_lista(db, date.today(), "pagos_criticos", limite, _calcular_pagos_criticos)
+
+
+async def _calcular_pagos_criticos(db: AsyncSession, limite: int) -> List[Dict[str, Any]]:
+    """Calcula los pagos más vencidos, sin pasar por la cache."""
+    pagos = (await db.scalars(
+        select(Pago).options(
+            joinedload(Pago.cliente)
+        ).where(
+            and_(
+                Pago.fecha_vencimiento < date.today(),
+                Pago.estado.in_([EstadoPagoEnum.PENDIENTE, EstadoPagoEnum.VENCIDO])
+            )
+        ).order_by(Pago.fecha_vencimiento).limit(limite)
+    )).all()
 
     return [
         {
@@ -238,9 +497,13 @@ def obtener_pagos_pendientes_criticos(db: Session, limite: int = 5) -> List[Dict
     ]
 
 
-def obtener_dashboard_completo(db: Session, usuario_id: str) -> Dict[str, Any]:
+async def obtener_dashboard_completo(db: AsyncSession, usuario_id: UUID) -> Dict[str, Any]:
     """
-    Obtiene todos los datos del dashboard en una sola consulta.
+    Obtiene todos los datos del dashboard.
+
+    Los contadores, próximos eventos y pagos críticos se sirven desde la cache
+    de snapshots; lo que falta se calcula (todos los contadores en una única
+    sentencia) y se guarda. Las alertas del usuario se leen siempre frescas.
 
     Args:
         db: Sesión de base de datos
@@ -249,12 +512,36 @@ def obtener_dashboard_completo(db: Session, usuario_id: str) -> Dict[str, Any]:
     Returns:
         Dict con todos los datos del dashboard
     """
+    hoy = date.today()
+    datos = await _obtener_agregados(db, hoy, "caballos", "clientes", "empleados", "eventos", "pagos")
+
+    return {
+        "estadisticas_generales": _armar_estadisticas_generales(datos),
+        "estadisticas_pagos": _armar_estadisticas_pagos(datos),
+        "estadisticas_clientes": _armar_estadisticas_clientes(datos),
+        "estadisticas_eventos": _armar_estadisticas_eventos(datos),
+        "alertas_recientes": await obtener_alertas_recientes(db, usuario_id),
+        "proximos_eventos": await obtener_proximos_eventos(db),
+        "pagos_criticos": await obtener_pagos_pendientes_criticos(db),
+    }
+
+
+async def obtener_resumen_reportes(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Obtiene el resumen del dashboard de reportes.
+
+    Comparte los agregados en cache con el dashboard principal.
+
+    Returns:
+        Dict con caballos y clientes activos, eventos del mes, pagos pendientes
+        e ingresos del mes
+    """
+    datos = await _obtener_agregados(db, date.today(), "caballos", "clientes", "eventos", "cobranzas")
+
     return {
-        "estadisticas_generales": obtener_estadisticas_generales(db),
-        "estadisticas_pagos": obtener_estadisticas_pagos(db),
-        "estadisticas_clientes": obtener_estadisticas_clientes(db),
-        "estadisticas_eventos": obtener_estadisticas_eventos(db),
-        "alertas_recientes": obtener_alertas_recientes(db, usuario_id),
-        "proximos_eventos": obtener_proximos_eventos(db),
-        "pagos_criticos": obtener_pagos_pendientes_criticos(db),
+        "caballos_activos": datos["total_caballos"],
+        "clientes_activos": datos["total_clientes"],
+        "eventos_mes": datos["total_eventos_mes"],
+        "pagos_pendientes": datos["pagos_pendientes"],
+        "ingresos_mes": float(datos["ingresos_mes"]),
     }
@@ -1,23 +1,22 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from uuid import UUID
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import date
 from decimal import Decimal
 
+from app.core.paginacion import paginar_por_cursor
 from app.models.egreso import Egreso, TipoEgresoEnum
 from app.schemas.egreso import EgresoCreate, EgresoUpdate
 
 
-def obtener_todos(
+def _consulta_filtrada(
     db: Session,
-    skip: int = 0,
-    limit: int = 100,
-    tipo: Optional[TipoEgresoEnum] = None,
-    fecha_desde: Optional[date] = None,
-    fecha_hasta: Optional[date] = None
-) -> List[Egreso]:
-    """Obtiene lista de egresos con paginación y filtros."""
+    tipo: Optional[TipoEgresoEnum],
+    fecha_desde: Optional[date],
+    fecha_hasta: Optional[date]
+):
+    """Consulta de egresos con los filtros del listado."""
     query = db.query(Egreso)
 
     if tipo:
@@ -29,9 +28,37 @@ def obtener_todos(
     if fecha_hasta:
         query = query.filter(Egreso.fecha_egreso <= fecha_hasta)
 
+    return query
+
+
+def obtener_todos(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    tipo: Optional[TipoEgresoEnum] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None
+) -> List[Egreso]:
+    """Obtiene lista de egresos con paginación y filtros."""
+    query = _consulta_filtrada(db, tipo, fecha_desde, fecha_hasta)
     return query.order_by(Egreso.fecha_egreso.desc()).offset(skip).limit(limit).all()
 
 
+def obtener_pagina(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    tipo: Optional[TipoEgresoEnum] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None
+) -> Tuple[List[Egreso], Optional[str]]:
+    """Obtiene una página de egresos por cursor, ordenada por fecha descendente."""
+    return paginar_por_cursor(
+        _consulta_filtrada(db, tipo, fecha_desde, fecha_hasta),
+        Egreso.fecha_egreso, Egreso.id, cursor, limit
+    )
+
+
 def obtener_por_id(db: Session, egreso_id: UUID) -> Optional[Egreso]:
     """Obtiene un egreso por ID."""
     return db.query(Egreso).filter(Egreso.id == egreso_id).first()
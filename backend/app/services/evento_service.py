@@ -1,15 +1,31 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from uuid import UUID
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, date, timedelta
 
+from app.core.paginacion import paginar_por_cursor
 from app.models.evento import Evento, InscripcionEvento, EstadoEventoEnum, EstadoInscripcionEnum
 from app.models.cliente import Cliente
 from app.models.alerta import TipoAlertaEnum, PrioridadAlertaEnum
 from app.schemas.evento import EventoCreate, EventoUpdate, InscripcionEventoCreate, InscripcionEventoUpdate
 from app.schemas.alerta import AlertaCreate
-from app.services import alerta_service
+from app.services import alerta_service, dashboard_service
+
+
+def _consulta_filtrada(db: Session, fecha_inicio: Optional[date], fecha_fin: Optional[date]):
+    """Consulta de eventos con los filtros del listado."""
+    query = db.query(Evento)
+
+    if fecha_inicio:
+        query = query.filter(Evento.fecha_inicio >= fecha_inicio)
+
+    if fecha_fin:
+        query = query.filter(Evento.fecha_fin <= fecha_fin)
+
+    return query
 
 
 def obtener_todos(
@@ -20,15 +36,22 @@ def obtener_todos(
     fecha_fin: Optional[date] = None
 ) -> List[Evento]:
     """Obtiene lista de eventos con paginación."""
-    query = db.query(Evento)
-
-    if fecha_inicio:
-        query = query.filter(Evento.fecha_inicio >= fecha_inicio)
+    query = _consulta_filtrada(db, fecha_inicio, fecha_fin)
+    return query.order_by(Evento.fecha_inicio.desc()).offset(skip).limit(limit).all()
 
-    if fecha_fin:
-        query = query.filter(Evento.fecha_fin <= fecha_fin)
 
-    return query.order_by(Evento.fecha_inicio.desc()).offset(skip).limit(limit).all()
+def obtener_pagina(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    fecha_inicio: Optional[date] = None,
+    fecha_fin: Optional[date] = None
+) -> Tuple[List[Evento], Optional[str]]:
+    """Obtiene una página de eventos por cursor, ordenada por fecha de inicio descendente."""
+    return paginar_por_cursor(
+        _consulta_filtrada(db, fecha_inicio, fecha_fin),
+        Evento.fecha_inicio, Evento.id, cursor, limit
+    )
 
 
 def obtener_por_id(db: Session, evento_id: UUID) -> Optional[Evento]:
@@ -44,6 +67,7 @@ def crear(db: Session, evento_data: EventoCreate, usuario_id: UUID) -> Evento:
     )
     db.add(db_evento)
     db.commit()
+    dashboard_service.invalidar_cache("eventos")
     db.refresh(db_evento)
     return db_evento
 
@@ -63,6 +87,7 @@ def actualizar(
         setattr(db_evento, field, value)
 
     db.commit()
+    dashboard_service.invalidar_cache("eventos")
     db.refresh(db_evento)
     return db_evento
 
@@ -75,6 +100,7 @@ def eliminar(db: Session, evento_id: UUID) -> Optional[Evento]:
 
     db_evento.estado = EstadoEventoEnum.CANCELADO
     db.commit()
+    dashboard_service.invalidar_cache("eventos")
     db.refresh(db_evento)
     return db_evento
 
@@ -112,6 +138,7 @@ def inscribir_cliente(db: Session, inscripcion_data: InscripcionEventoCreate) ->
     db_inscripcion = InscripcionEvento(**inscripcion_data.model_dump())
     db.add(db_inscripcion)
     db.commit()
+    dashboard_service.invalidar_cache("eventos")
     db.refresh(db_inscripcion)
 
     # Crear alertas automáticas
@@ -220,6 +247,7 @@ def desinscribir_cliente(db: Session, inscripcion_id: UUID) -> Optional[Inscripc
     if db_inscripcion:
         db_inscripcion.estado = EstadoInscripcionEnum.CANCELADO
         db.commit()
+        dashboard_service.invalidar_cache("eventos")
         db.refresh(db_inscripcion)
 
     return db_inscripcion
@@ -257,13 +285,15 @@ def actualizar_asistencia(
     return db_inscripcion
 
 
-def obtener_eventos_publicos(db: Session) -> List[Evento]:
+async def obtener_eventos_publicos(db: AsyncSession) -> List[Evento]:
     """Obtiene eventos marcados como públicos para la web."""
-    return db.query(Evento).filter(
-        Evento.es_publico == True,
-        Evento.estado == EstadoEventoEnum.PROGRAMADO,
-        Evento.fecha_inicio >= datetime.now()
-    ).order_by(Evento.fecha_inicio.asc()).all()
+    return (await db.scalars(
+        select(Evento).where(
+            Evento.es_publico == True,
+            Evento.estado == EstadoEventoEnum.PROGRAMADO,
+            Evento.fecha_inicio >= datetime.now()
+        ).order_by(Evento.fecha_inicio.asc())
+    )).all()
 
 
 def toggle_publicar(db: Session, evento_id: UUID, es_publico: bool) -> Optional[Evento]:
@@ -0,0 +1,315 @@
+import csv
+import io
+import os
+import tempfile
+import time
+import uuid
+from datetime import date
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from openpyxl import Workbook
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.cliente import Cliente
+from app.models.comprobante import Comprobante
+from app.models.egreso import Egreso
+from app.models.pago import Pago
+from app.schemas.exportacion import ExportacionFiltros
+from app.services import egreso_service, pago_service
+from app.services.comprobante_service import get_comprobante_service
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Bloques en que se devuelve un XLSX ya generado
+TAMANO_BLOQUE_ARCHIVO = 64 * 1024
+
+
+# ========== FUENTES ==========
+# Cada fuente retorna (encabezados, filas). Las filas salen de un cursor del
+# servidor (yield_per), por lo que el resultado nunca se carga entero.
+
+def _leer(query) -> Iterator[tuple]:
+    """Recorre una Query de columnas con un cursor del servidor."""
+    for fila in query.yield_per(settings.TAREAS_SCAN_BATCH_SIZE):
+        yield tuple(fila)
+
+
+def _nombre_cliente():
+    """Columna con nombre y apellido del cliente."""
+    return (Cliente.nombre + " " + Cliente.apellido).label("cliente")
+
+
+def _rango(filtros: ExportacionFiltros) -> Tuple[date, date]:
+    """Rango de fechas de los filtros; sin límites si no se indican."""
+    return filtros.fecha_inicio or date.min, filtros.fecha_fin or date.max
+
+
+def _filas_ventas(db: Session, filtros: ExportacionFiltros):
+    """Comprobantes de venta del período."""
+    query = db.query(
+        Comprobante.numero_completo, Comprobante.tipo, Comprobante.estado,
+        Comprobante.fecha_emision, Comprobante.fecha_vencimiento, _nombre_cliente(),
+        Comprobante.total, Comprobante.monto_pagado, Comprobante.saldo_pendiente
+    ).join(
+        Cliente, Cliente.id == Comprobante.cliente_id
+    ).filter(
+        *get_comprobante_service(db).filtros_ventas(*_rango(filtros))
+    ).order_by(Comprobante.fecha_emision, Comprobante.id)
+
+    encabezados = ["numero", "tipo", "estado", "fecha_emision", "fecha_vencimiento",
+                   "cliente", "total", "cobrado", "pendiente"]
+    return encabezados, _leer(query)
+
+
+def _filas_cobranzas(db: Session, filtros: ExportacionFiltros):
+    """Pagos cobrados en el período."""
+    query = db.query(
+        Pago.fecha_pago, _nombre_cliente(), Pago.concepto, Pago.tipo,
+        Pago.metodo_pago, Pago.monto, Pago.referencia
+    ).join(
+        Cliente, Cliente.id == Pago.cliente_id
+    ).filter(
+        *get_comprobante_service(db).filtros_cobranzas(*_rango(filtros))
+    ).order_by(Pago.fecha_pago, Pago.id)
+
+    encabezados = ["fecha_pago", "cliente", "concepto", "tipo", "metodo_pago", "monto", "referencia"]
+    return encabezados, _leer(query)
+
+
+def _filas_deudores(db: Session, filtros: ExportacionFiltros):
+    """Clientes deudores a la fecha de corte."""
+    columnas = ["cliente_id", "nombre", "dni", "telefono", "email",
+                "deuda", "antiguedad_dias", "tramo", "estado_cuenta"]
+    deudores = get_comprobante_service(db).iterar_deudores(
+        filtros.fecha_corte or date.today(), tamano_lote=settings.TAREAS_SCAN_BATCH_SIZE
+    )
+    return columnas, (tuple(deudor[c] for c in columnas) for deudor in deudores)
+
+
+def _filas_pagos(db: Session, filtros: ExportacionFiltros):
+    """Pagos con los filtros del listado."""
+    query = pago_service._consulta_filtrada(
+        db, filtros.cliente_id, filtros.estado_pago
+    ).join(
+        Cliente, Cliente.id == Pago.cliente_id
+    ).with_entities(
+        Pago.created_at, _nombre_cliente(), Pago.concepto, Pago.tipo, Pago.estado,
+        Pago.monto, Pago.fecha_vencimiento, Pago.fecha_pago, Pago.metodo_pago
+    ).order_by(Pago.created_at, Pago.id)
+
+    encabezados = ["fecha_alta", "cliente", "concepto", "tipo", "estado",
+                   "monto", "fecha_vencimiento", "fecha_pago", "metodo_pago"]
+    return encabezados, _leer(query)
+
+
+def _filas_egresos(db: Session, filtros: ExportacionFiltros):
+    """Egresos con los filtros del listado."""
+    query = egreso_service._consulta_filtrada(
+        db, filtros.tipo_egreso, filtros.fecha_inicio, filtros.fecha_fin
+    ).with_entities(
+        Egreso.fecha_egreso, Egreso.tipo, Egreso.concepto, Egreso.proveedor,
+        Egreso.monto, Egreso.referencia
+    ).order_by(Egreso.fecha_egreso, Egreso.id)
+
+    encabezados = ["fecha_egreso", "tipo", "concepto", "proveedor", "monto", "referencia"]
+    return encabezados, _leer(query)
+
+
+FUENTES: Dict[str, Callable[[Session, ExportacionFiltros], Tuple[List[str], Iterable[tuple]]]] = {
+    "ventas": _filas_ventas,
+    "cobranzas": _filas_cobranzas,
+    "deudores": _filas_deudores,
+    "pagos": _filas_pagos,
+    "egresos": _filas_egresos,
+}
+
+
+# ========== ESCRITURA ==========
+
+def _celda(valor: Any) -> Any:
+    """Valor apto para CSV/XLSX: enums por su valor y UUID como texto."""
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, uuid.UUID):
+        return str(valor)
+    return valor
+
+
+def escribir_csv(encabezados: List[str], filas: Iterable[tuple]) -> Iterator[str]:
+    """Genera el CSV línea por línea, para StreamingResponse."""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    escritor.writerow(encabezados)
+    for fila in filas:
+        escritor.writerow([_celda(valor) for valor in fila])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def escribir_xlsx(encabezados: List[str], filas: Iterable[tuple], destino) -> int:
+    """
+    Escribe las filas en un XLSX con un workbook write-only.
+
+    En modo write-only openpyxl vuelca cada fila a disco al agregarla, así que
+    la memoria no depende de la cantidad de filas.
+
+    Args:
+        encabezados: Nombres de columna
+        filas: Filas a escribir
+        destino: Ruta o archivo binario donde guardar el libro
+
+    Returns:
+        int: Cantidad de filas escritas (sin el encabezado)
+    """
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet("Reporte")
+    hoja.append(encabezados)
+
+    cantidad = 0
+    for fila in filas:
+        hoja.append([_celda(valor) for valor in fila])
+        cantidad += 1
+
+    libro.save(destino)
+    return cantidad
+
+
+class _ContadorFilas:
+    """Iterable que cuenta las filas a medida que se consumen."""
+
+    def __init__(self, filas: Iterable[tuple]):
+        self.filas = filas
+        self.cantidad = 0
+
+    def __iter__(self):
+        for fila in self.filas:
+            self.cantidad += 1
+            yield fila
+
+
+def _leer_en_bloques(archivo) -> Iterator[bytes]:
+    """Devuelve un archivo abierto en bloques y lo cierra al terminar."""
+    try:
+        archivo.seek(0)
+        while bloque := archivo.read(TAMANO_BLOQUE_ARCHIVO):
+            yield bloque
+    finally:
+        archivo.close()
+
+
+# ========== EXPORTACIÓN ==========
+
+def nombre_archivo(reporte: str, formato: str) -> str:
+    """Nombre de descarga del reporte, con la fecha de hoy."""
+    return f"{reporte}_{date.today().isoformat()}.{formato}"
+
+
+def exportar(db: Session, reporte: str, formato: str, filtros: ExportacionFiltros) -> Iterator:
+    """
+    Exporta un reporte como contenido para StreamingResponse.
+
+    El CSV se genera a medida que se envía. El XLSX es un zip que solo puede
+    cerrarse al final, así que se escribe a un archivo temporal en disco y se
+    envía en bloques desde ahí.
+
+    Args:
+        db: Sesión de base de datos (debe seguir abierta mientras se envía)
+        reporte: ventas, cobranzas, deudores, pagos o egresos
+        formato: csv o xlsx
+        filtros: Filtros del reporte
+
+    Returns:
+        Iterador con el contenido del archivo
+    """
+    encabezados, filas = FUENTES[reporte](db, filtros)
+    if formato == "csv":
+        return escribir_csv(encabezados, filas)
+
+    archivo = tempfile.TemporaryFile()
+    try:
+        escribir_xlsx(encabezados, filas, archivo)
+    except Exception:
+        archivo.close()
+        raise
+    return _leer_en_bloques(archivo)
+
+
+def exportar_a_archivo(
+    db: Session,
+    reporte: str,
+    formato: str,
+    filtros: ExportacionFiltros
+) -> Dict[str, Any]:
+    """
+    Exporta un reporte a un archivo en settings.EXPORTACIONES_DIR.
+
+    Se escribe a un archivo temporal (.tmp) en el mismo directorio y se
+    renombra al terminar, así un archivo a medio escribir (tarea cortada por
+    el time limit) nunca queda con el nombre final. Los .tmp que deja un
+    worker matado los borra limpiar_exportaciones.
+
+    Returns:
+        Dict con el nombre del archivo generado, el nombre de descarga y la
+        cantidad de filas
+    """
+    directorio = Path(settings.EXPORTACIONES_DIR)
+    directorio.mkdir(parents=True, exist_ok=True)
+    archivo = f"{uuid.uuid4().hex}.{formato}"
+
+    encabezados, filas = FUENTES[reporte](db, filtros)
+    descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+    try:
+        if formato == "csv":
+            contador = _ContadorFilas(filas)
+            with os.fdopen(descriptor, "w", newline="", encoding="utf-8") as salida:
+                salida.writelines(escribir_csv(encabezados, contador))
+            cantidad = contador.cantidad
+        else:
+            with os.fdopen(descriptor, "wb") as salida:
+                cantidad = escribir_xlsx(encabezados, filas, salida)
+        os.replace(temporal, directorio / archivo)
+    except Exception:
+        Path(temporal).unlink(missing_ok=True)
+        raise
+
+    return {"archivo": archivo, "nombre": nombre_archivo(reporte, formato), "filas": cantidad}
+
+
+def ruta_archivo(archivo: str) -> Optional[Path]:
+    """Ruta de un archivo exportado, o None si no existe."""
+    ruta = Path(settings.EXPORTACIONES_DIR) / Path(archivo).name
+    return ruta if ruta.is_file() else None
+
+
+def limpiar_exportaciones(dias: Optional[int] = None) -> int:
+    """
+    Borra los archivos exportados con más de `dias` de antigüedad.
+
+    Args:
+        dias: Retención en días (por defecto settings.EXPORTACIONES_RETENCION_DIAS)
+
+    Returns:
+        int: Cantidad de archivos borrados
+    """
+    directorio = Path(settings.EXPORTACIONES_DIR)
+    if not directorio.is_dir():
+        return 0
+
+    limite = time.time() - (dias if dias is not None else settings.EXPORTACIONES_RETENCION_DIAS) * 86400
+    borradas = 0
+    for archivo in directorio.iterdir():
+        if archivo.is_file() and archivo.stat().st_mtime < limite:
+            archivo.unlink(missing_ok=True)
+            borradas += 1
+    return borradas
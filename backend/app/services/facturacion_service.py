@@ -0,0 +1,390 @@
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, exists, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.caballo import Caballo, EstadoCaballoEnum
+from app.models.cliente import Cliente
+from app.models.comprobante import (
+    Comprobante, ComprobanteItem, MovimientoCuenta, FacturacionPension,
+    TipoComprobanteEnum, EstadoComprobanteEnum
+)
+from app.schemas.comprobante import FacturacionPensionesRequest
+from app.services import cliente_service
+from app.services.comprobante_service import get_comprobante_service
+
+CENTAVOS = Decimal("0.01")
+
+
+class CorridaTomadaError(RuntimeError):
+    """Otra ejecución avanzó la misma corrida de facturación."""
+
+
+# ========== SELECCIÓN ==========
+
+def _caballo_facturable():
+    """Condición de caballo que paga pensión: activo, con propietario y box asignado."""
+    return (
+        Caballo.propietario_id.isnot(None),
+        Caballo.box_asignado.isnot(None),
+        Caballo.box_asignado != "",
+        Caballo.estado.in_([EstadoCaballoEnum.ACTIVO, EstadoCaballoEnum.EN_TRATAMIENTO]),
+    )
+
+
+def consulta_clientes_a_facturar(facturacion: FacturacionPension) -> Select:
+    """
+    Clientes activos con caballos a facturar, en orden de id.
+
+    Arranca después del último cliente facturado por la corrida, de modo que
+    al retomarla no se vuelve a facturar a nadie.
+    """
+    consulta = select(Cliente).where(
+        Cliente.activo == True,
+        exists().where(Caballo.propietario_id == Cliente.id, *_caballo_facturable())
+    )
+    if facturacion.ultimo_cliente_id:
+        consulta = consulta.where(Cliente.id > facturacion.ultimo_cliente_id)
+    return consulta.order_by(Cliente.id)
+
+
+def _caballos_por_cliente(db: Session, cliente_ids: List[UUID]) -> Dict[UUID, List[Any]]:
+    """Caballos facturables de los clientes indicados, agrupados por propietario."""
+    filas = db.execute(
+        select(
+            Caballo.propietario_id, Caballo.nombre, Caballo.box_asignado, Caballo.tipo_manejo
+        ).where(
+            Caballo.propietario_id.in_(cliente_ids), *_caballo_facturable()
+        ).order_by(Caballo.propietario_id, Caballo.nombre)
+    ).all()
+
+    caballos = defaultdict(list)
+    for fila in filas:
+        caballos[fila.propietario_id].append(fila)
+    return caballos
+
+
+# ========== IMPORTES ==========
+
+def _tarifa(tarifa_mensual, tarifas_por_manejo: Optional[Dict[str, Any]], tipo_manejo) -> Decimal:
+    """Tarifa mensual de un caballo según su tipo de manejo."""
+    tarifas = tarifas_por_manejo or {}
+    if tipo_manejo is not None and tipo_manejo.value in tarifas:
+        return Decimal(str(tarifas[tipo_manejo.value]))
+    return Decimal(str(tarifa_mensual))
+
+
+def _tarifas_por_manejo(data: FacturacionPensionesRequest) -> Optional[Dict[str, str]]:
+    """Tarifas por tipo de manejo del request, con el valor del enum como clave."""
+    return {
+        manejo.value: str(tarifa) for manejo, tarifa in (data.tarifas_por_manejo or {}).items()
+    } or None
+
+
+def _importes(subtotal: Decimal, iva_porcentaje: Decimal) -> Dict[str, Decimal]:
+    """Subtotal, IVA y total de un comprobante, redondeados como Comprobante.calcular_totales."""
+    iva_monto = (subtotal * Decimal(str(iva_porcentaje)) / 100).quantize(CENTAVOS, ROUND_HALF_UP)
+    return {"subtotal": subtotal, "iva_monto": iva_monto, "total": subtotal + iva_monto}
+
+
+def _etiqueta_periodo(periodo: date) -> str:
+    """Período como MM/AAAA."""
+    return f"{periodo.month:02d}/{periodo.year}"
+
+
+# ========== SIMULACIÓN ==========
+
+def simular(db: Session, data: FacturacionPensionesRequest) -> Dict[str, Any]:
+    """
+    Calcula lo que facturaría la corrida del período sin escribir nada.
+
+    Args:
+        db: Sesión de base de datos
+        data: Parámetros de la facturación
+
+    Returns:
+        Dict con clientes, caballos, detalle por tipo de manejo, importes
+        totales y si el período ya tiene una corrida
+    """
+    periodo = date(data.anio, data.mes, 1)
+    filas = db.execute(
+        select(
+            Caballo.propietario_id, Caballo.tipo_manejo, func.count(Caballo.id).label("caballos")
+        ).join(
+            Cliente, Cliente.id == Caballo.propietario_id
+        ).where(
+            Cliente.activo == True, *_caballo_facturable()
+        ).group_by(Caballo.propietario_id, Caballo.tipo_manejo)
+    ).all()
+
+    tarifas = _tarifas_por_manejo(data)
+    subtotales = defaultdict(Decimal)
+    por_manejo = {}
+    for fila in filas:
+        tarifa = _tarifa(data.tarifa_mensual, tarifas, fila.tipo_manejo)
+        subtotales[fila.propietario_id] += tarifa * fila.caballos
+        clave = fila.tipo_manejo.value if fila.tipo_manejo else "sin_manejo"
+        detalle = por_manejo.setdefault(clave, {"caballos": 0, "tarifa": tarifa, "subtotal": Decimal("0")})
+        detalle["caballos"] += fila.caballos
+        detalle["subtotal"] += tarifa * fila.caballos
+
+    importes = [_importes(subtotal, data.iva_porcentaje) for subtotal in subtotales.values()]
+    ya_facturado = db.query(
+        exists().where(FacturacionPension.periodo == periodo)
+    ).scalar()
+
+    return {
+        "periodo": periodo,
+        "clientes": len(subtotales),
+        "caballos": sum(fila.caballos for fila in filas),
+        "por_manejo": por_manejo,
+        "subtotal": sum((i["subtotal"] for i in importes), Decimal("0")),
+        "iva_monto": sum((i["iva_monto"] for i in importes), Decimal("0")),
+        "total": sum((i["total"] for i in importes), Decimal("0")),
+        "ya_facturado": ya_facturado,
+    }
+
+
+# ========== CORRIDAS ==========
+
+def iniciar(
+    db: Session,
+    data: FacturacionPensionesRequest,
+    usuario_id: Optional[UUID] = None
+) -> FacturacionPension:
+    """
+    Crea la corrida de facturación del período, o retorna la existente para retomarla.
+
+    Una corrida retomada conserva los parámetros con los que se creó.
+
+    Raises:
+        HTTPException: Si el período ya fue facturado completo o la corrida
+            está en curso
+    """
+    periodo = date(data.anio, data.mes, 1)
+    facturacion = db.query(FacturacionPension).filter(FacturacionPension.periodo == periodo).first()
+    if facturacion:
+        if facturacion.estado == "completada":
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Las pensiones de {_etiqueta_periodo(periodo)} ya fueron facturadas"
+            )
+        if not db.query(exists().where(
+            FacturacionPension.id == facturacion.id, _puede_ejecutarse()
+        )).scalar():
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"La facturación de {_etiqueta_periodo(periodo)} ya está en curso"
+            )
+        return facturacion
+
+    facturacion = FacturacionPension(
+        periodo=periodo,
+        tarifa_mensual=data.tarifa_mensual,
+        tarifas_por_manejo=_tarifas_por_manejo(data),
+        iva_porcentaje=data.iva_porcentaje,
+        dias_vencimiento=data.dias_vencimiento,
+        created_by=usuario_id
+    )
+    db.add(facturacion)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Otro request creó la corrida del mismo período en paralelo (periodo es único)
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"La facturación de {_etiqueta_periodo(periodo)} ya está en curso"
+        )
+    db.refresh(facturacion)
+    return facturacion
+
+
+def obtener(db: Session, facturacion_id: UUID) -> Optional[FacturacionPension]:
+    """Obtiene una corrida de facturación por ID."""
+    return db.query(FacturacionPension).filter(FacturacionPension.id == facturacion_id).first()
+
+
+def _puede_ejecutarse():
+    """
+    Condición de corrida que una ejecución puede tomar: pendiente, con error,
+    o en curso pero abandonada (sin avance desde hace
+    settings.FACTURACION_CORRIDA_ABANDONADA_SEGUNDOS, p. ej. por un worker caído).
+    """
+    limite = datetime.utcnow() - timedelta(seconds=settings.FACTURACION_CORRIDA_ABANDONADA_SEGUNDOS)
+    return or_(
+        FacturacionPension.estado.in_(["pendiente", "error"]),
+        and_(FacturacionPension.estado == "en_curso", FacturacionPension.updated_at < limite)
+    )
+
+
+def comenzar_ejecucion(db: Session, facturacion_id: UUID) -> Optional[FacturacionPension]:
+    """
+    Toma la corrida para esta ejecución y la marca en curso.
+
+    La toma es atómica (UPDATE condicionado al estado), así dos tareas
+    encoladas para la misma corrida no la ejecutan a la vez.
+
+    Returns:
+        La corrida, o None si no existe, ya está completada o la tiene otra ejecución
+    """
+    tomada = db.execute(
+        update(FacturacionPension).where(
+            FacturacionPension.id == facturacion_id,
+            _puede_ejecutarse()
+        ).values(
+            estado="en_curso",
+            error=None,
+            updated_at=datetime.utcnow()
+        ).execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return obtener(db, facturacion_id) if tomada else None
+
+
+def facturar_lote(
+    db: Session,
+    facturacion: FacturacionPension,
+    clientes: List[Cliente],
+    ultimo_cliente_esperado: Optional[UUID]
+) -> int:
+    """
+    Factura la pensión del período a un lote de clientes, sin commit.
+
+    Reserva los números del lote de una vez e inserta comprobantes, items y
+    movimientos de cuenta con un INSERT por tabla (executemany). Los saldos se
+    actualizan con las filas de los clientes bloqueadas, como en
+    cliente_service.registrar_movimiento. El avance de la corrida se guarda en
+    la misma transacción, condicionado a que nadie más lo haya movido.
+
+    Args:
+        db: Sesión de escritura (se commitea al terminar el lote)
+        facturacion: Corrida en curso
+        clientes: Clientes del lote, en orden de id
+        ultimo_cliente_esperado: ultimo_cliente_id de la corrida antes del lote
+
+    Returns:
+        int: Cantidad de comprobantes generados
+
+    Raises:
+        CorridaTomadaError: Si otra ejecución avanzó la misma corrida
+    """
+    cliente_ids = [cliente.id for cliente in clientes]
+    caballos = _caballos_por_cliente(db, cliente_ids)
+    saldos = dict(db.execute(
+        select(Cliente.id, Cliente.saldo).where(Cliente.id.in_(cliente_ids)).with_for_update()
+    ).all())
+
+    facturar = [cliente for cliente in clientes if caballos.get(cliente.id)]
+    numeros = get_comprobante_service(db).reservar_numeros(
+        TipoComprobanteEnum.FACTURA, len(facturar)
+    ) if facturar else []
+
+    hoy = date.today()
+    ahora = datetime.utcnow()
+    etiqueta = _etiqueta_periodo(facturacion.periodo)
+    comprobantes, items, movimientos, saldos_nuevos = [], [], [], []
+    total_lote = Decimal("0")
+
+    for cliente, (numero, numero_completo) in zip(facturar, numeros):
+        comprobante_id = uuid.uuid4()
+        subtotal = Decimal("0")
+        for orden, caballo in enumerate(caballos[cliente.id]):
+            tarifa = _tarifa(facturacion.tarifa_mensual, facturacion.tarifas_por_manejo, caballo.tipo_manejo)
+            subtotal += tarifa
+            items.append({
+                "id": uuid.uuid4(),
+                "comprobante_id": comprobante_id,
+                "descripcion": f"Pensión {caballo.nombre} - Box {caballo.box_asignado} - {etiqueta}"[:255],
+                "cantidad": 1,
+                "precio_unitario": tarifa,
+                "descuento_porcentaje": 0,
+                "subtotal": tarifa,
+                "tipo_servicio": "pension",
+                "orden": orden,
+                "created_at": ahora,
+            })
+
+        importes = _importes(subtotal, facturacion.iva_porcentaje)
+        comprobantes.append({
+            "id": comprobante_id,
+            "tipo": TipoComprobanteEnum.FACTURA,
+            "numero": numero,
+            "punto_venta": 1,
+            "numero_completo": numero_completo,
+            "cliente_id": cliente.id,
+            "fecha_emision": hoy,
+            "fecha_vencimiento": hoy + timedelta(days=facturacion.dias_vencimiento),
+            "descuento_porcentaje": 0,
+            "descuento_monto": 0,
+            "iva_porcentaje": facturacion.iva_porcentaje,
+            "monto_pagado": 0,
+            "saldo_pendiente": importes["total"],
+            "estado": EstadoComprobanteEnum.EMITIDO,
+            "concepto_general": f"Pensión {etiqueta}",
+            "created_by": facturacion.created_by,
+            "created_at": ahora,
+            "updated_at": ahora,
+            **importes,
+        })
+
+        saldo_anterior = saldos[cliente.id]
+        saldo_posterior = saldo_anterior - importes["total"]
+        movimientos.append({
+            "id": uuid.uuid4(),
+            "cliente_id": cliente.id,
+            "tipo": "debito",
+            "comprobante_id": comprobante_id,
+            "descripcion": f"FACTURA {numero_completo}",
+            "monto": importes["total"],
+            "saldo_anterior": saldo_anterior,
+            "saldo_posterior": saldo_posterior,
+            "fecha": hoy,
+            "created_at": ahora,
+        })
+        saldos_nuevos.append({
+            "id": cliente.id,
+            "saldo": saldo_posterior,
+            "estado_cuenta": cliente_service.estado_cuenta_segun_saldo(saldo_posterior),
+        })
+        total_lote += importes["total"]
+
+    if comprobantes:
+        db.execute(insert(Comprobante), comprobantes)
+        db.execute(insert(ComprobanteItem), items)
+        db.execute(insert(MovimientoCuenta), movimientos)
+        db.execute(update(Cliente), saldos_nuevos)
+
+    avance = db.execute(
+        update(FacturacionPension).where(
+            FacturacionPension.id == facturacion.id,
+            FacturacionPension.ultimo_cliente_id.is_not_distinct_from(ultimo_cliente_esperado)
+        ).values(
+            ultimo_cliente_id=cliente_ids[-1],
+            comprobantes_generados=FacturacionPension.comprobantes_generados + len(comprobantes),
+            total_facturado=FacturacionPension.total_facturado + total_lote,
+            updated_at=ahora
+        ).execution_options(synchronize_session=False)
+    )
+    if avance.rowcount != 1:
+        raise CorridaTomadaError("La corrida de facturación fue avanzada por otra ejecución")
+
+    return len(comprobantes)
+
+
+def finalizar(db: Session, facturacion_id: UUID, error: Optional[str] = None) -> None:
+    """Marca la corrida como completada, o con error para poder retomarla."""
+    db.query(FacturacionPension).filter(FacturacionPension.id == facturacion_id).update({
+        FacturacionPension.estado: "error" if error else "completada",
+        FacturacionPension.error: error,
+        FacturacionPension.finalizada_at: None if error else datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
@@ -11,6 +11,7 @@ UPLOAD_DIR = Path("uploads")
 CABALLOS_DIR = UPLOAD_DIR / "caballos"
 USUARIOS_DIR = UPLOAD_DIR / "usuarios"
 CLIENTES_DIR = UPLOAD_DIR / "clientes"
+COMPROBANTES_DIR = UPLOAD_DIR / "comprobantes"
 
 # Extensiones permitidas
 ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
@@ -24,6 +25,7 @@ def init_upload_directories():
     CABALLOS_DIR.mkdir(exist_ok=True)
     USUARIOS_DIR.mkdir(exist_ok=True)
     CLIENTES_DIR.mkdir(exist_ok=True)
+    COMPROBANTES_DIR.mkdir(exist_ok=True)
 
 
 def validate_image_file(file: UploadFile) -> None:
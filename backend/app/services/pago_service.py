@@ -1,16 +1,32 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import select, update
 from fastapi import HTTPException, status
 from uuid import UUID
-from typing import List, Optional
-from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 
+from app.core.config import settings
+from app.core.paginacion import paginar_por_cursor
 from app.models.pago import Pago, EstadoPagoEnum
 from app.models.cliente import Cliente
 from app.models.alerta import TipoAlertaEnum, PrioridadAlertaEnum
 from app.schemas.pago import PagoCreate, PagoUpdate, RegistrarPagoRequest
 from app.schemas.alerta import AlertaCreate
-from app.services import cliente_service, alerta_service
+from app.services import cliente_service, alerta_service, dashboard_service
+
+
+def _consulta_filtrada(db: Session, cliente_id: Optional[UUID], estado: Optional[EstadoPagoEnum]):
+    """Consulta de pagos con los filtros del listado."""
+    query = db.query(Pago)
+
+    if cliente_id:
+        query = query.filter(Pago.cliente_id == cliente_id)
+
+    if estado:
+        query = query.filter(Pago.estado == estado)
+
+    return query
 
 
 def obtener_todos(
@@ -21,15 +37,22 @@ def obtener_todos(
     estado: Optional[EstadoPagoEnum] = None
 ) -> List[Pago]:
     """Obtiene lista de pagos con paginación."""
-    query = db.query(Pago)
-
-    if cliente_id:
-        query = query.filter(Pago.cliente_id == cliente_id)
+    query = _consulta_filtrada(db, cliente_id, estado)
+    return query.order_by(Pago.created_at.desc()).offset(skip).limit(limit).all()
 
-    if estado:
-        query = query.filter(Pago.estado == estado)
 
-    return query.order_by(Pago.created_at.desc()).offset(skip).limit(limit).all()
+def obtener_pagina(
+    db: Session,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    cliente_id: Optional[UUID] = None,
+    estado: Optional[EstadoPagoEnum] = None
+) -> Tuple[List[Pago], Optional[str]]:
+    """Obtiene una página de pagos por cursor, del más reciente al más antiguo."""
+    return paginar_por_cursor(
+        _consulta_filtrada(db, cliente_id, estado),
+        Pago.created_at, Pago.id, cursor, limit
+    )
 
 
 def obtener_por_id(db: Session, pago_id: UUID) -> Optional[Pago]:
@@ -56,14 +79,21 @@ def crear(db: Session, pago_data: PagoCreate, usuario_id: UUID) -> Pago:
     )
     db.add(db_pago)
     db.commit()
+    dashboard_service.invalidar_cache("pagos")
     db.refresh(db_pago)
 
     # Si el pago es pendiente, actualizar saldo del cliente (restar porque debe)
     if db_pago.estado == EstadoPagoEnum.PENDIENTE:
-        cliente_service.actualizar_saldo(db, pago_data.cliente_id, -float(pago_data.monto))
+        cliente_service.actualizar_saldo(
+            db, pago_data.cliente_id, -float(pago_data.monto),
+            descripcion=f"CARGO {db_pago.concepto}"[:255], pago_id=db_pago.id
+        )
     # Si el pago ya está pagado, actualizar saldo del cliente (sumar porque pagó)
     elif db_pago.estado == EstadoPagoEnum.PAGADO:
-        cliente_service.actualizar_saldo(db, pago_data.cliente_id, float(pago_data.monto))
+        cliente_service.actualizar_saldo(
+            db, pago_data.cliente_id, float(pago_data.monto),
+            descripcion=f"PAGO {db_pago.concepto}"[:255], pago_id=db_pago.id
+        )
 
     # Crear notificaciones
     try:
@@ -143,6 +173,7 @@ def actualizar(
         setattr(db_pago, field, value)
 
     db.commit()
+    dashboard_service.invalidar_cache("pagos")
     db.refresh(db_pago)
     return db_pago
 
@@ -155,10 +186,14 @@ def eliminar(db: Session, pago_id: UUID) -> Optional[Pago]:
 
     # Si estaba pendiente, devolver el monto al saldo del cliente
     if db_pago.estado == EstadoPagoEnum.PENDIENTE:
-        cliente_service.actualizar_saldo(db, db_pago.cliente_id, float(db_pago.monto))
+        cliente_service.actualizar_saldo(
+            db, db_pago.cliente_id, float(db_pago.monto),
+            descripcion=f"CANCELACIÓN {db_pago.concepto}"[:255], pago_id=db_pago.id
+        )
 
     db_pago.estado = EstadoPagoEnum.CANCELADO
     db.commit()
+    dashboard_service.invalidar_cache("pagos")
     db.refresh(db_pago)
     return db_pago
 
@@ -190,9 +225,13 @@ def registrar_pago(
     db_pago.estado = EstadoPagoEnum.PAGADO
 
     # Actualizar saldo del cliente (devolver el monto que se había restado)
-    cliente_service.actualizar_saldo(db, db_pago.cliente_id, float(db_pago.monto))
+    cliente_service.actualizar_saldo(
+        db, db_pago.cliente_id, float(db_pago.monto),
+        descripcion=f"PAGO {db_pago.concepto}"[:255], pago_id=db_pago.id
+    )
 
     db.commit()
+    dashboard_service.invalidar_cache("pagos")
     db.refresh(db_pago)
 
     # Crear notificaciones sobre pago completado
@@ -302,7 +341,10 @@ def cambiar_estado(
     # Si cambia de PENDIENTE a PAGADO, actualizar saldo
     if estado_anterior == EstadoPagoEnum.PENDIENTE and nuevo_estado == EstadoPagoEnum.PAGADO:
         # Devolver el monto (sumar porque ya pagó)
-        cliente_service.actualizar_saldo(db, db_pago.cliente_id, float(db_pago.monto))
+        cliente_service.actualizar_saldo(
+            db, db_pago.cliente_id, float(db_pago.monto),
+            descripcion=f"PAGO {db_pago.concepto}"[:255], pago_id=db_pago.id
+        )
         # Establecer fecha de pago si no tiene
         if not db_pago.fecha_pago:
             db_pago.fecha_pago = date.today()
@@ -310,27 +352,64 @@ def cambiar_estado(
     # Si cambia de PAGADO a PENDIENTE, actualizar saldo
     elif estado_anterior == EstadoPagoEnum.PAGADO and nuevo_estado == EstadoPagoEnum.PENDIENTE:
         # Restar el monto (debe dinero)
-        cliente_service.actualizar_saldo(db, db_pago.cliente_id, -float(db_pago.monto))
+        cliente_service.actualizar_saldo(
+            db, db_pago.cliente_id, -float(db_pago.monto),
+            descripcion=f"REVERSIÓN PAGO {db_pago.concepto}"[:255], pago_id=db_pago.id
+        )
         db_pago.fecha_pago = None
 
     db.commit()
+    dashboard_service.invalidar_cache("pagos")
     db.refresh(db_pago)
     return db_pago
 
 
-def actualizar_pagos_vencidos(db: Session) -> int:
-    """Actualiza pagos pendientes que han vencido."""
-    pagos_vencidos = db.query(Pago).filter(
-        Pago.estado == EstadoPagoEnum.PENDIENTE,
-        Pago.fecha_vencimiento < date.today()
-    ).all()
+def actualizar_pagos_vencidos(db: Session, tamano_lote: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Pasa a VENCIDO los pagos pendientes cuya fecha de vencimiento ya pasó.
+
+    La transición se hace en el servidor con UPDATE ... RETURNING por lotes de
+    `tamano_lote` filas, con commit por lote, para no retener locks largos ni
+    cargar los pagos en memoria. Las filas bloqueadas por otra transacción se
+    saltean (SKIP LOCKED) y quedan para la próxima corrida.
+
+    Args:
+        db: Sesión de base de datos
+        tamano_lote: Filas por lote (por defecto settings.PAGOS_VENCIDOS_BATCH_SIZE)
+
+    Returns:
+        Dict con la cantidad de pagos actualizados y los IDs de clientes afectados
+    """
+    tamano_lote = tamano_lote or settings.PAGOS_VENCIDOS_BATCH_SIZE
+    hoy = date.today()
+
+    total = 0
+    clientes_afectados = set()
+    while True:
+        lote = select(Pago.id).where(
+            Pago.estado == EstadoPagoEnum.PENDIENTE,
+            Pago.fecha_vencimiento < hoy
+        ).limit(tamano_lote).with_for_update(skip_locked=True)
+
+        filas = db.execute(
+            update(Pago)
+            .where(Pago.id.in_(lote.scalar_subquery()))
+            .values(estado=EstadoPagoEnum.VENCIDO, updated_at=datetime.utcnow())
+            .returning(Pago.id, Pago.cliente_id),
+            execution_options={"synchronize_session": False}
+        ).all()
+        db.commit()
 
-    count = 0
-    for pago in pagos_vencidos:
-        pago.estado = EstadoPagoEnum.VENCIDO
-        count += 1
+        total += len(filas)
+        clientes_afectados.update(fila.cliente_id for fila in filas)
 
-    if count > 0:
-        db.commit()
+        if len(filas) < tamano_lote:
+            break
+
+    if total > 0:
+        dashboard_service.invalidar_cache("pagos")
 
-    return count
+    return {
+        "pagos_actualizados": total,
+        "clientes_afectados": list(clientes_afectados),
+    }
@@ -9,7 +9,8 @@ from app.models.usuario import Usuario, RolEnum
 from app.models.empleado import Empleado, FuncionEmpleadoEnum
 from app.models.cliente import Cliente
 from app.schemas.usuario import UsuarioCreate, UsuarioUpdate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.core.deps import invalidar_principal
 
 
 def _enriquecer_usuarios_con_info_relacionada(usuarios: List[Usuario]) -> List[Usuario]:
@@ -64,7 +65,7 @@ def obtener_por_email(db: Session, email: str) -> Optional[Usuario]:
     return db.query(Usuario).filter(Usuario.email == email).first()
 
 
-def crear(db: Session, usuario_data: UsuarioCreate) -> Usuario:
+async def crear(db: Session, usuario_data: UsuarioCreate) -> Usuario:
     """Crea un nuevo usuario con sus datos de empleado/cliente."""
     # Verificar si el email ya existe
     if obtener_por_email(db, usuario_data.email):
@@ -73,10 +74,10 @@ def crear(db: Session, usuario_data: UsuarioCreate) -> Usuario:
             detail="El email ya está registrado"
         )
 
-    try:
-        # Hashear la contraseña
-        password_hash = get_password_hash(usuario_data.password)
+    # Hashear la contraseña (fuera del try: un 503 del pool no debe volverse 400)
+    password_hash = await get_password_hash_async(usuario_data.password)
 
+    try:
         # Separar los campos de usuario de los campos de empleado/cliente
         usuario_fields = ['email', 'rol', 'permisos']
         usuario_dict = {k: v for k, v in usuario_data.model_dump(exclude={'password'}).items() if k in usuario_fields}
@@ -169,7 +170,7 @@ def crear(db: Session, usuario_data: UsuarioCreate) -> Usuario:
         )
 
 
-def actualizar(
+async def actualizar(
     db: Session,
     usuario_id: UUID,
     usuario_update: UsuarioUpdate
@@ -183,7 +184,7 @@ def actualizar(
 
     # Si se actualiza el password, hashearlo
     if 'password' in update_data and update_data['password']:
-        password_hash = get_password_hash(update_data['password'])
+        password_hash = await get_password_hash_async(update_data['password'])
         update_data['password_hash'] = password_hash
         del update_data['password']
 
@@ -267,6 +268,7 @@ def actualizar(
                 db.add(db_cliente)
 
     db.commit()
+    invalidar_principal(db_usuario.id)
     db.refresh(db_usuario)
 
     # Enriquecer con datos relacionados
@@ -284,6 +286,7 @@ def eliminar(db: Session, usuario_id: UUID) -> Optional[Usuario]:
     # Soft delete
     db_usuario.activo = False
     db.commit()
+    invalidar_principal(db_usuario.id)
     db.refresh(db_usuario)
     return db_usuario
 
@@ -329,6 +332,7 @@ def actualizar_permisos(
 
     db_usuario.permisos = permisos
     db.commit()
+    invalidar_principal(db_usuario.id)
     db.refresh(db_usuario)
     return db_usuario
 
@@ -5,167 +5,159 @@ from app.services import caballo_service
 from app.schemas.alerta import AlertaCreate
 from app.models.alerta import TipoAlertaEnum, PrioridadAlertaEnum
 from app.models.pago import EstadoPagoEnum
+from app.tasks.escaneo import escanear_por_lotes
 from datetime import date, datetime, timedelta
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from sqlalchemy.orm import joinedload
+import logging
 
+logger = logging.getLogger(__name__)
 
-@shared_task
-def verificar_vacunas_vencidas():
+
+def _crear_alertas_por_lotes(tarea, consulta, construir_alerta, entidad: str):
     """
-    Tarea que se ejecuta diariamente para verificar vacunas próximas a vencer
-    y crear alertas para los administradores.
+    Recorre `consulta` con el escáner por lotes y crea, por cada fila, la alerta
+    que devuelva `construir_alerta` para todos los administradores.
     """
     db = SessionLocal()
     try:
-        from app.models.caballo import VacunaRegistro
-
-        # Obtener vacunas que vencen en los próximos 7 días
-        fecha_limite = date.today() + timedelta(days=7)
-        vacunas_proximas = db.query(VacunaRegistro).filter(
-            and_(
-                VacunaRegistro.proxima_aplicacion.isnot(None),
-                VacunaRegistro.proxima_aplicacion <= fecha_limite,
-                VacunaRegistro.proxima_aplicacion >= date.today()
-            )
-        ).all()
+        admin_ids = alerta_service.obtener_ids_admins(db)
+    finally:
+        db.close()
 
-        alertas_creadas = 0
-        for vacuna in vacunas_proximas:
+    def procesar_lote(db, filas):
+        alertas_data = []
+        for fila in filas:
             try:
-                alerta_data = AlertaCreate(
-                    tipo=TipoAlertaEnum.VACUNA,
-                    prioridad=PrioridadAlertaEnum.ALTA,
-                    titulo=f"Vacuna próxima a vencer - {vacuna.caballo.nombre if vacuna.caballo else 'Caballo'}",
-                    mensaje=f"La vacuna '{vacuna.tipo or 'Vacuna'}' vence el {vacuna.proxima_aplicacion.strftime('%d/%m/%Y')}",
-                    fecha_evento=datetime.combine(vacuna.proxima_aplicacion, datetime.min.time()),
-                    entidad_relacionada_tipo="caballo",
-                    entidad_relacionada_id=vacuna.caballo_id
-                )
-
-                # Crear alerta para todos los administradores
-                alerta_service.crear_para_admins(db, alerta_data)
-                alertas_creadas += 1
+                alertas_data.append(construir_alerta(fila))
             except Exception as e:
-                print(f"Error creando alerta para vacuna {vacuna.id}: {e}")
-                continue
-
-        db.commit()
-        return f"Procesadas {len(vacunas_proximas)} vacunas, creadas {alertas_creadas} alertas"
+                logger.error(f"Error creando alerta para {entidad} {fila.id}: {e}")
+        return alerta_service.crear_para_admins_lote(
+            db, alertas_data, admin_ids=admin_ids, commit=False
+        )
 
+    try:
+        resultado = escanear_por_lotes(consulta, procesar_lote, tarea=tarea)
     except Exception as e:
-        db.rollback()
-        return f"Error: {str(e)}"
-    finally:
-        db.close()
+        logger.error(f"Error verificando {entidad}: {e}")
+        return {"success": False, "error": str(e)}
 
+    logger.info(
+        f"Verificación de {entidad}: {resultado['procesados']} procesados, "
+        f"{resultado['generados']} alertas en {resultado['lotes']} lotes "
+        f"({resultado['filas_por_segundo']} filas/s)"
+    )
+    return {"success": True, **resultado}
 
-@shared_task
-def verificar_herrajes_pendientes():
+
+@shared_task(bind=True)
+def verificar_vacunas_vencidas(self):
+    """
+    Tarea que se ejecuta diariamente para verificar vacunas próximas a vencer
+    y crear alertas para los administradores.
+    """
+    from app.models.caballo import VacunaRegistro
+
+    # Vacunas que vencen en los próximos 7 días
+    hoy = date.today()
+    consulta = select(VacunaRegistro).options(
+        joinedload(VacunaRegistro.caballo)
+    ).where(
+        VacunaRegistro.proxima_fecha.isnot(None),
+        VacunaRegistro.proxima_fecha <= hoy + timedelta(days=7),
+        VacunaRegistro.proxima_fecha >= hoy
+    )
+
+    def construir_alerta(vacuna):
+        return AlertaCreate(
+            tipo=TipoAlertaEnum.VACUNA,
+            prioridad=PrioridadAlertaEnum.ALTA,
+            titulo=f"Vacuna próxima a vencer - {vacuna.caballo.nombre if vacuna.caballo else 'Caballo'}",
+            mensaje=f"La vacuna '{vacuna.tipo or 'Vacuna'}' vence el {vacuna.proxima_fecha.strftime('%d/%m/%Y')}",
+            fecha_evento=datetime.combine(vacuna.proxima_fecha, datetime.min.time()),
+            entidad_relacionada_tipo="caballo",
+            entidad_relacionada_id=vacuna.caballo_id
+        )
+
+    return _crear_alertas_por_lotes(self, consulta, construir_alerta, "vacunas")
+
+
+@shared_task(bind=True)
+def verificar_herrajes_pendientes(self):
     """
     Tarea que se ejecuta diariamente para verificar herrajes pendientes
     y crear alertas para los administradores.
     """
-    db = SessionLocal()
-    try:
-        from app.models.caballo import HerrjeRegistro
-
-        # Obtener herrajes que vencen en los próximos 3 días
-        fecha_limite = date.today() + timedelta(days=3)
-        herrajes_proximos = db.query(HerrjeRegistro).filter(
-            and_(
-                HerrjeRegistro.proxima_fecha.isnot(None),
-                HerrjeRegistro.proxima_fecha <= fecha_limite,
-                HerrjeRegistro.proxima_fecha >= date.today()
-            )
-        ).all()
-
-        alertas_creadas = 0
-        for herraje in herrajes_proximos:
-            try:
-                alerta_data = AlertaCreate(
-                    tipo=TipoAlertaEnum.HERRAJE,
-                    prioridad=PrioridadAlertaEnum.MEDIA,
-                    titulo=f"Herraje próximo - {herraje.caballo.nombre if herraje.caballo else 'Caballo'}",
-                    mensaje=f"El herraje debe realizarse el {herraje.proxima_fecha.strftime('%d/%m/%Y')}",
-                    fecha_evento=datetime.combine(herraje.proxima_fecha, datetime.min.time()),
-                    entidad_relacionada_tipo="caballo",
-                    entidad_relacionada_id=herraje.caballo_id
-                )
-
-                alerta_service.crear_para_admins(db, alerta_data)
-                alertas_creadas += 1
-            except Exception as e:
-                print(f"Error creando alerta para herraje {herraje.id}: {e}")
-                continue
-
-        db.commit()
-        return f"Procesados {len(herrajes_proximos)} herrajes, creadas {alertas_creadas} alertas"
-
-    except Exception as e:
-        db.rollback()
-        return f"Error: {str(e)}"
-    finally:
-        db.close()
-
-
-@shared_task
-def verificar_pagos_vencidos():
+    from app.models.caballo import HerrjeRegistro
+
+    # Herrajes que vencen en los próximos 3 días
+    hoy = date.today()
+    consulta = select(HerrjeRegistro).options(
+        joinedload(HerrjeRegistro.caballo)
+    ).where(
+        HerrjeRegistro.proximo_herraje.isnot(None),
+        HerrjeRegistro.proximo_herraje <= hoy + timedelta(days=3),
+        HerrjeRegistro.proximo_herraje >= hoy
+    )
+
+    def construir_alerta(herraje):
+        return AlertaCreate(
+            tipo=TipoAlertaEnum.HERRAJE,
+            prioridad=PrioridadAlertaEnum.MEDIA,
+            titulo=f"Herraje próximo - {herraje.caballo.nombre if herraje.caballo else 'Caballo'}",
+            mensaje=f"El herraje debe realizarse el {herraje.proximo_herraje.strftime('%d/%m/%Y')}",
+            fecha_evento=datetime.combine(herraje.proximo_herraje, datetime.min.time()),
+            entidad_relacionada_tipo="caballo",
+            entidad_relacionada_id=herraje.caballo_id
+        )
+
+    return _crear_alertas_por_lotes(self, consulta, construir_alerta, "herrajes")
+
+
+@shared_task(bind=True)
+def verificar_pagos_vencidos(self):
     """
     Tarea que se ejecuta diariamente para verificar pagos vencidos
     y crear alertas para los administradores.
     """
-    db = SessionLocal()
-    try:
-        from app.models.pago import Pago
-
-        # Obtener pagos vencidos o pendientes
-        pagos_vencidos = db.query(Pago).filter(
-            and_(
-                Pago.fecha_vencimiento.isnot(None),
-                Pago.fecha_vencimiento < date.today(),
-                Pago.estado.in_([EstadoPagoEnum.PENDIENTE, EstadoPagoEnum.VENCIDO])
-            )
-        ).all()
-
-        alertas_creadas = 0
-        for pago in pagos_vencidos:
-            try:
-                dias_vencido = (date.today() - pago.fecha_vencimiento).days
-
-                # Determinar prioridad según días de vencimiento
-                if dias_vencido > 30:
-                    prioridad = PrioridadAlertaEnum.CRITICA
-                elif dias_vencido > 15:
-                    prioridad = PrioridadAlertaEnum.ALTA
-                else:
-                    prioridad = PrioridadAlertaEnum.MEDIA
-
-                cliente_nombre = f"{pago.cliente.nombre} {pago.cliente.apellido}" if pago.cliente else "Cliente"
-
-                alerta_data = AlertaCreate(
-                    tipo=TipoAlertaEnum.PAGO,
-                    prioridad=prioridad,
-                    titulo=f"Pago vencido - {cliente_nombre}",
-                    mensaje=f"Pago de '{pago.concepto}' por ${pago.monto} vencido hace {dias_vencido} días",
-                    fecha_evento=datetime.combine(pago.fecha_vencimiento, datetime.min.time()),
-                    entidad_relacionada_tipo="pago",
-                    entidad_relacionada_id=pago.id
-                )
-
-                alerta_service.crear_para_admins(db, alerta_data)
-                alertas_creadas += 1
-            except Exception as e:
-                print(f"Error creando alerta para pago {pago.id}: {e}")
-                continue
-
-        db.commit()
-        return f"Procesados {len(pagos_vencidos)} pagos vencidos, creadas {alertas_creadas} alertas"
-
-    except Exception as e:
-        db.rollback()
-        return f"Error: {str(e)}"
-    finally:
-        db.close()
+    from app.models.pago import Pago
+
+    # Pagos vencidos o pendientes con fecha de vencimiento pasada
+    hoy = date.today()
+    consulta = select(Pago).options(
+        joinedload(Pago.cliente)
+    ).where(
+        Pago.fecha_vencimiento.isnot(None),
+        Pago.fecha_vencimiento < hoy,
+        Pago.estado.in_([EstadoPagoEnum.PENDIENTE, EstadoPagoEnum.VENCIDO])
+    )
+
+    def construir_alerta(pago):
+        dias_vencido = (hoy - pago.fecha_vencimiento).days
+
+        # Determinar prioridad según días de vencimiento
+        if dias_vencido > 30:
+            prioridad = PrioridadAlertaEnum.CRITICA
+        elif dias_vencido > 15:
+            prioridad = PrioridadAlertaEnum.ALTA
+        else:
+            prioridad = PrioridadAlertaEnum.MEDIA
+
+        cliente_nombre = f"{pago.cliente.nombre} {pago.cliente.apellido}" if pago.cliente else "Cliente"
+
+        return AlertaCreate(
+            tipo=TipoAlertaEnum.PAGO,
+            prioridad=prioridad,
+            titulo=f"Pago vencido - {cliente_nombre}",
+            # Mensaje estable (fecha, no días transcurridos): la alerta solo se
+            # reescribe cuando cambia la prioridad; los días se derivan de fecha_evento
+            mensaje=f"Pago de '{pago.concepto}' por ${pago.monto} vencido el {pago.fecha_vencimiento.strftime('%d/%m/%Y')}",
+            fecha_evento=datetime.combine(pago.fecha_vencimiento, datetime.min.time()),
+            entidad_relacionada_tipo="pago",
+            entidad_relacionada_id=pago.id
+        )
+
+    return _crear_alertas_por_lotes(self, consulta, construir_alerta, "pagos vencidos")
 
 
 @shared_task
@@ -190,7 +182,7 @@ def enviar_recordatorios_eventos():
             )
         ).all()
 
-        alertas_creadas = 0
+        alertas_data = []
         for evento in eventos_proximos:
             try:
                 # Obtener inscripciones confirmadas
@@ -215,8 +207,7 @@ def enviar_recordatorios_eventos():
                                 usuario_id=inscripcion.cliente.usuario_id
                             )
 
-                            alerta_service.crear(db, alerta_data)
-                            alertas_creadas += 1
+                            alertas_data.append(alerta_data)
                     except Exception as e:
                         print(f"Error creando alerta para inscripción {inscripcion.id}: {e}")
                         continue
@@ -225,6 +216,8 @@ def enviar_recordatorios_eventos():
                 print(f"Error procesando evento {evento.id}: {e}")
                 continue
 
+        # Idempotente: un recordatorio ya enviado no se duplica si la tarea se repite
+        alertas_creadas = alerta_service.upsert_lote(db, alertas_data, commit=False)
         db.commit()
         return f"Procesados {len(eventos_proximos)} eventos, creadas {alertas_creadas} alertas"
 
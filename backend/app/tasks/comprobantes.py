@@ -0,0 +1,84 @@
+from celery import shared_task
+from datetime import date
+from typing import List
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import comprobante_pdf_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generar_pdf_comprobante(comprobante_id: str):
+    """
+    Genera el PDF de un comprobante emitido (o anulado) y actualiza pdf_url.
+
+    Se encola al emitir o anular; si el contenido no cambió se reutiliza el
+    PDF existente.
+    """
+    db = SessionLocal()
+    try:
+        pdf_url = comprobante_pdf_service.generar_pdf(db, UUID(comprobante_id))
+        return {"success": True, "pdf_url": pdf_url}
+    except Exception as e:
+        logger.error(f"Error generando PDF del comprobante {comprobante_id}: {str(e)}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task
+def generar_pdfs_lote(comprobante_ids: List[str]):
+    """
+    Genera (o reutiliza) los PDFs de un lote de comprobantes.
+
+    La encola generar_pdfs_mes, un lote por tarea, para que cada una termine
+    dentro del time limit de Celery.
+    """
+    db = SessionLocal()
+    try:
+        comprobantes = db.scalars(
+            comprobante_pdf_service.consulta_comprobantes([UUID(i) for i in comprobante_ids])
+        ).all()
+        renderizados = comprobante_pdf_service.generar_pdfs(db, comprobantes)
+        return {"success": True, "procesados": len(comprobantes), "generados": renderizados}
+    except Exception as e:
+        logger.error(f"Error generando PDFs de un lote de {len(comprobante_ids)} comprobantes: {str(e)}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task
+def generar_pdfs_mes(anio: int = None, mes: int = None):
+    """
+    Genera los PDFs de todos los comprobantes emitidos en un mes (por defecto el actual).
+
+    Reparte los comprobantes en tareas generar_pdfs_lote de
+    settings.COMPROBANTES_PDF_BATCH_SIZE, así el mes entero no depende del
+    time limit de una sola tarea y un lote fallido no frena al resto. Los PDFs
+    que ya existen para el mismo contenido se reutilizan, así que solo se
+    renderizan los nuevos o modificados. Completa también los que quedaron sin
+    PDF porque no se pudo encolar la tarea al emitirlos.
+    """
+    hoy = date.today()
+    anio, mes = anio or hoy.year, mes or hoy.month
+    tamano_lote = settings.COMPROBANTES_PDF_BATCH_SIZE
+
+    db = SessionLocal()
+    try:
+        ids = comprobante_pdf_service.ids_emitidos_en_mes(db, anio, mes)
+        lotes = [ids[i:i + tamano_lote] for i in range(0, len(ids), tamano_lote)]
+        for lote in lotes:
+            generar_pdfs_lote.delay([str(comprobante_id) for comprobante_id in lote])
+    except Exception as e:
+        logger.error(f"Error encolando PDFs de comprobantes {mes:02d}/{anio}: {str(e)}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+    logger.info(f"PDFs de comprobantes {mes:02d}/{anio}: {len(ids)} comprobantes en {len(lotes)} lotes encolados")
+    return {"success": True, "comprobantes": len(ids), "lotes": len(lotes)}
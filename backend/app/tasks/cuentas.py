@@ -0,0 +1,50 @@
+from celery import shared_task
+from app.db.session import SessionLocal
+from app.services import cuenta_corriente_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def generar_checkpoints_saldo():
+    """
+    Tarea periódica que agrega un checkpoint de saldo para cada cliente
+    con movimientos de cuenta corriente desde el último checkpoint.
+    """
+    db = SessionLocal()
+    try:
+        resultado = cuenta_corriente_service.generar_checkpoints(db)
+        logger.info(f"Checkpoints de saldo: {resultado['checkpoints_generados']} generados")
+        return {
+            "success": True,
+            "checkpoints_generados": resultado["checkpoints_generados"],
+            "corte": resultado["corte"].isoformat(),
+        }
+    except Exception as e:
+        logger.error(f"Error generando checkpoints de saldo: {str(e)}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
+
+
+@shared_task
+def conciliar_saldos_cuenta(reparar: bool = True):
+    """
+    Tarea que verifica los checkpoints de saldo y el saldo de cada cliente
+    contra el ledger de movimientos; con `reparar` corrige las diferencias.
+    """
+    db = SessionLocal()
+    try:
+        resultado = cuenta_corriente_service.conciliar(db, reparar=reparar)
+        inconsistencias = len(resultado["checkpoints_inconsistentes"]) + len(resultado["saldos_inconsistentes"])
+        if inconsistencias:
+            logger.warning(f"Conciliación de saldos: {inconsistencias} inconsistencias encontradas")
+        else:
+            logger.info(f"Conciliación de saldos: {resultado['clientes_verificados']} clientes sin diferencias")
+        return {"success": True, **resultado}
+    except Exception as e:
+        logger.error(f"Error conciliando saldos: {str(e)}")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
@@ -0,0 +1,84 @@
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def escanear_por_lotes(
+    consulta: Select,
+    procesar_lote: Callable[[Session, List[Any]], int],
+    tamano_lote: Optional[int] = None,
+    tarea=None
+) -> Dict[str, Any]:
+    """
+    Recorre el resultado de `consulta` en lotes de tamaño fijo sin cargarlo entero.
+
+    La lectura usa un cursor del servidor (yield_per) en una sesión propia; cada
+    lote se entrega a `procesar_lote` junto con una sesión de escritura que se
+    commitea al terminar el lote. Así el cursor sobrevive a los commits y la
+    memoria queda acotada por el tamaño del lote. Las relaciones que el lote
+    necesite deben venir eager-loaded en la consulta (joinedload many-to-one).
+
+    Args:
+        consulta: SELECT de entidades ORM a recorrer
+        procesar_lote: Función (db, filas) -> cantidad de elementos generados
+        tamano_lote: Filas por lote (por defecto settings.TAREAS_SCAN_BATCH_SIZE)
+        tarea: Tarea Celery (bind=True) para publicar el progreso como estado PROGRESS
+
+    Returns:
+        Dict con total, procesados, generados, lotes, duración y filas por segundo
+    """
+    tamano_lote = tamano_lote or settings.TAREAS_SCAN_BATCH_SIZE
+    lectura = SessionLocal()
+    escritura = SessionLocal()
+    inicio = time.monotonic()
+
+    progreso = {"total": 0, "procesados": 0, "generados": 0, "lotes": 0}
+    try:
+        progreso["total"] = lectura.execute(
+            select(func.count()).select_from(consulta.order_by(None).subquery())
+        ).scalar()
+
+        resultado = lectura.scalars(consulta, execution_options={"yield_per": tamano_lote})
+        for filas in resultado.partitions():
+            try:
+                progreso["generados"] += procesar_lote(escritura, filas)
+                escritura.commit()
+            except Exception:
+                escritura.rollback()
+                raise
+
+            progreso["procesados"] += len(filas)
+            progreso["lotes"] += 1
+            _publicar_progreso(tarea, progreso, inicio)
+    finally:
+        lectura.close()
+        escritura.close()
+
+    return {**progreso, **_metricas_tiempo(progreso, inicio)}
+
+
+def _metricas_tiempo(progreso: Dict[str, int], inicio: float) -> Dict[str, float]:
+    """Duración transcurrida y throughput en filas por segundo."""
+    duracion = time.monotonic() - inicio
+    return {
+        "duracion_segundos": round(duracion, 3),
+        "filas_por_segundo": round(progreso["procesados"] / duracion, 1) if duracion > 0 else 0.0,
+    }
+
+
+def _publicar_progreso(tarea, progreso: Dict[str, int], inicio: float) -> None:
+    """Publica el avance como metadata de la tarea (solo si corre en un worker)."""
+    if tarea is None or not tarea.request.id:
+        return
+    try:
+        tarea.update_state(state="PROGRESS", meta={**progreso, **_metricas_tiempo(progreso, inicio)})
+    except Exception as e:
+        logger.warning(f"No se pudo publicar el progreso de {tarea.name}: {e}")
@@ -0,0 +1,71 @@
+from celery import shared_task
+from uuid import UUID
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import dashboard_service, facturacion_service
+from app.tasks.comprobantes import generar_pdfs_mes
+from app.tasks.escaneo import escanear_por_lotes
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def facturar_pensiones(self, facturacion_id: str):
+    """
+    Factura la pensión mensual a todos los propietarios con caballos en box.
+
+    Recorre los clientes por lotes de settings.FACTURACION_BATCH_SIZE; cada
+    lote se commitea junto con el avance de la corrida, así que si la tarea se
+    interrumpe, volver a lanzarla retoma desde el último lote commiteado. El
+    progreso se publica como estado PROGRESS. Al terminar encola la generación
+    de los PDFs.
+    """
+    db = SessionLocal()
+    try:
+        facturacion = facturacion_service.comenzar_ejecucion(db, UUID(facturacion_id))
+    finally:
+        db.close()
+    if not facturacion:
+        return {"success": False, "error": "Corrida inexistente, completada o en curso en otra ejecución"}
+
+    avance = {"ultimo_cliente_id": facturacion.ultimo_cliente_id}
+
+    def procesar_lote(db, clientes):
+        generados = facturacion_service.facturar_lote(
+            db, facturacion, clientes, avance["ultimo_cliente_id"]
+        )
+        avance["ultimo_cliente_id"] = clientes[-1].id
+        return generados
+
+    db = SessionLocal()
+    try:
+        resultado = escanear_por_lotes(
+            facturacion_service.consulta_clientes_a_facturar(facturacion),
+            procesar_lote,
+            tamano_lote=settings.FACTURACION_BATCH_SIZE,
+            tarea=self
+        )
+    except facturacion_service.CorridaTomadaError as e:
+        # Otra ejecución tiene la corrida: no marcarla con error mientras sigue facturando
+        logger.warning(f"Facturación de pensiones {facturacion.periodo:%m/%Y}: {e}")
+        return {"success": False, "error": str(e)}
+    except Exception as e:
+        logger.error(f"Error facturando pensiones {facturacion.periodo:%m/%Y}: {e}")
+        facturacion_service.finalizar(db, facturacion.id, error=str(e))
+        return {"success": False, "error": str(e)}
+    else:
+        facturacion_service.finalizar(db, facturacion.id)
+    finally:
+        db.close()
+        dashboard_service.invalidar_cache("pagos", "clientes")
+
+    logger.info(
+        f"Facturación de pensiones {facturacion.periodo:%m/%Y}: {resultado['generados']} comprobantes "
+        f"para {resultado['procesados']} clientes en {resultado['lotes']} lotes "
+        f"({resultado['filas_por_segundo']} clientes/s)"
+    )
+    # Los comprobantes se emiten con fecha de hoy: sus PDFs salen con los del mes
+    generar_pdfs_mes.delay()
+    return {"success": True, **resultado}
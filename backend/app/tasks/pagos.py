@@ -14,9 +14,18 @@ def actualizar_pagos_vencidos():
     """
     db = SessionLocal()
     try:
-        count = pago_service.actualizar_pagos_vencidos(db)
-        logger.info(f"Actualizar pagos vencidos: {count} pagos actualizados")
-        return {"success": True, "pagos_actualizados": count}
+        resultado = pago_service.actualizar_pagos_vencidos(db)
+        count = resultado["pagos_actualizados"]
+        clientes = resultado["clientes_afectados"]
+        logger.info(
+            f"Actualizar pagos vencidos: {count} pagos actualizados, "
+            f"{len(clientes)} clientes afectados"
+        )
+        return {
+            "success": True,
+            "pagos_actualizados": count,
+            "clientes_afectados": [str(cliente_id) for cliente_id in clientes],
+        }
     except Exception as e:
         logger.error(f"Error actualizando pagos vencidos: {str(e)}")
         return {"success": False, "error": str(e)}
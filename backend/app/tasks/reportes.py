@@ -1,40 +1,78 @@
 from celery import shared_task
-from app.db.session import SessionLocal
+from app.core.config import settings
+from app.db.session import ReplicaSessionLocal
+from app.models.pago import EstadoPagoEnum
+from app.schemas.exportacion import ExportacionFiltros
+from app.services import exportacion_service
 from datetime import date, timedelta
-from decimal import Decimal
+import logging
 
+logger = logging.getLogger(__name__)
 
-@shared_task
-def generar_reporte_mensual():
+
+@shared_task(
+    soft_time_limit=settings.EXPORTACIONES_SOFT_TIME_LIMIT,
+    time_limit=settings.EXPORTACIONES_TIME_LIMIT
+)
+def generar_exportacion(reporte: str, formato: str, filtros: dict):
     """
-    Genera un reporte mensual de ingresos y actividades.
-    TODO: Implementar generación de PDF
+    Exporta un reporte a un archivo descargable en settings.EXPORTACIONES_DIR.
+
+    Lee de la réplica con un cursor del servidor, por lo que la memoria no
+    depende del tamaño del reporte. Tiene time limits propios, más amplios que
+    los globales; si se alcanza el soft limit se descarta el archivo parcial.
     """
-    db = SessionLocal()
+    db = ReplicaSessionLocal()
     try:
-        # Placeholder para implementación futura
-        print("Generando reporte mensual...")
-        return "Reporte mensual generado"
-
+        resultado = exportacion_service.exportar_a_archivo(
+            db, reporte, formato, ExportacionFiltros(**filtros)
+        )
+        logger.info(f"Exportación {reporte}.{formato}: {resultado['filas']} filas en {resultado['archivo']}")
+        return {"success": True, **resultado}
     except Exception as e:
-        return f"Error: {str(e)}"
+        logger.error(f"Error exportando {reporte}.{formato}: {str(e)}")
+        return {"success": False, "error": str(e)}
     finally:
         db.close()
 
 
+@shared_task
+def generar_reporte_mensual():
+    """
+    Encola los reportes de ventas y cobranzas del mes anterior en Excel.
+
+    Cada reporte es una tarea generar_exportacion propia, así su resultado
+    se consulta y descarga desde /reportes/exportaciones/{tarea_id}.
+    """
+    fin = date.today().replace(day=1) - timedelta(days=1)
+    filtros = ExportacionFiltros(fecha_inicio=fin.replace(day=1), fecha_fin=fin).model_dump(mode="json")
+    tareas = {
+        reporte: generar_exportacion.delay(reporte, "xlsx", filtros).id
+        for reporte in ("ventas", "cobranzas")
+    }
+    logger.info(f"Reportes mensuales {fin:%m/%Y} encolados: {tareas}")
+    return {"success": True, "tareas": tareas}
+
+
 @shared_task
 def generar_reporte_pagos_pendientes():
     """
-    Genera un reporte de pagos pendientes.
-    TODO: Implementar generación de Excel
+    Encola un reporte de pagos pendientes en Excel.
     """
-    db = SessionLocal()
-    try:
-        # Placeholder para implementación futura
-        print("Generando reporte de pagos pendientes...")
-        return "Reporte de pagos generado"
+    filtros = ExportacionFiltros(estado_pago=EstadoPagoEnum.PENDIENTE).model_dump(mode="json")
+    tarea_id = generar_exportacion.delay("pagos", "xlsx", filtros).id
+    return {"success": True, "tarea_id": tarea_id}
 
+
+@shared_task
+def limpiar_exportaciones():
+    """
+    Borra las exportaciones más viejas que settings.EXPORTACIONES_RETENCION_DIAS.
+    """
+    try:
+        borradas = exportacion_service.limpiar_exportaciones()
+        logger.info(f"Limpieza de exportaciones: {borradas} archivos borrados")
+        return {"success": True, "borradas": borradas}
     except Exception as e:
-        return f"Error: {str(e)}"
-    finally:
-        db.close()
+        logger.error(f"Error limpiando exportaciones: {str(e)}")
+        return {"success": False, "error": str(e)}
@@ -10,6 +10,7 @@ import {
   useEstudiosMedicos,
 } from '@/hooks/useCaballos';
 import { PlanSanitarioTab } from '@/components/caballos/PlanSanitarioTab';
+import { caballoService } from '@/services/caballoService';
 import { useAuthStore } from '@/stores/authStore';
 import { PermisosCaballoSecciones, SECCIONES_CABALLO_FULL, SeccionCaballo } from '@/types/usuario';
 import { Button } from '@/components/ui/button';
@@ -925,15 +926,11 @@ export function CaballoDetailPage() {
               <CardDescription>Código QR único del caballo para acceso rápido</CardDescription>
             </CardHeader>
             <CardContent className="flex flex-col items-center justify-center py-8">
-              {caballo.qr_code ? (
-                <div className="text-center space-y-4">
-                  <img src={caballo.qr_code} alt={`QR Code de ${caballo.nombre}`} className="w-64 h-64 border-4 border-gray-200 rounded-lg" />
-                  <p className="text-sm text-gray-500">Escanea este código para acceder a la ficha del caballo</p>
-                  <Button variant="outline" onClick={() => window.print()}>Imprimir QR</Button>
-                </div>
-              ) : (
-                <p className="text-gray-500">No hay código QR disponible</p>
-              )}
+              <div className="text-center space-y-4">
+                <img src={caballoService.getQrUrl(caballo.id)} alt={`QR Code de ${caballo.nombre}`} className="w-64 h-64 border-4 border-gray-200 rounded-lg" />
+                <p className="text-sm text-gray-500">Escanea este código para acceder a la ficha del caballo</p>
+                <Button variant="outline" onClick={() => window.print()}>Imprimir QR</Button>
+              </div>
             </CardContent>
           </Card>
         </TabsContent>
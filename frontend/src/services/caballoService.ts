@@ -1,4 +1,5 @@
 import api from './api';
+import { API_URL } from '@/constants';
 import {
   Caballo,
   CaballoCreate,
@@ -52,6 +53,10 @@ export const caballoService = {
     return data;
   },
 
+  // URL pública del QR (se usa directo en <img>, no requiere token)
+  getQrUrl: (id: string, formato: 'png' | 'svg' = 'png'): string =>
+    `${API_URL}/caballos/${id}/qr.${formato}`,
+
   create: async (caballo: CaballoCreate): Promise<Caballo> => {
     const { data } = await api.post('/caballos/', caballo);
     return data;
@@ -42,9 +42,6 @@ export interface Caballo {
   box_asignado?: string;
   estado: EstadoCaballo;
 
-  // QR Code
-  qr_code?: string;
-
   // Alimentación
   grano_balanceado?: string;
   suplementos?: string;
@@ -123,6 +123,8 @@ export interface EstadoCuentaResponse {
   saldo_actual: number;
   total_facturado: number;
   total_pagado: number;
+  total_debitos: number;
+  total_creditos: number;
   comprobantes_pendientes: number;
   movimientos: MovimientoCuenta[];
 }